@@ -1,6 +1,30 @@
-from calculator.infrastructure.api.recruitment_order_views import create_order
+from calculator.infrastructure.api.catalog_views import (
+    recommend_enclosure,
+    search_enclosures,
+    select_glands,
+    select_terminals,
+)
+from calculator.infrastructure.api.recruitment_order_views import (
+    create_order,
+    duplicate_order,
+    duplicate_orders_bulk,
+    export_orders,
+    list_orders,
+    order_cnc_program,
+    validate_order_layout,
+)
 from django.urls import path
 
 urlpatterns = [
+    path('recruitment/orders/', list_orders),
     path('recruitment/orders/create/', create_order),
+    path('recruitment/orders/validate/', validate_order_layout),
+    path('recruitment/orders/duplicate/', duplicate_orders_bulk),
+    path('recruitment/orders/export/', export_orders),
+    path('recruitment/orders/<uuid:order_id>/duplicate/', duplicate_order),
+    path('recruitment/orders/<uuid:order_id>/cnc/', order_cnc_program),
+    path('recruitment/enclosures/', search_enclosures),
+    path('recruitment/enclosures/recommend/', recommend_enclosure),
+    path('recruitment/glands/select/', select_glands),
+    path('recruitment/terminals/select/', select_terminals),
 ]
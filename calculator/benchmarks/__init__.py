@@ -0,0 +1,65 @@
+"""
+Benchmarki wydajności kalkulatora.
+
+Uruchomienie: python manage.py run_benchmark <nazwa> [opcje]
+
+Każdy moduł z BENCHMARKS udostępnia funkcję ``run(**options) -> BenchmarkReport``
+oraz opcjonalnie ``add_arguments(parser)`` z własnymi opcjami. Benchmark, który
+zgłosi ``failures`` (np. przekroczony budżet czasu), kończy komendę błędem.
+"""
+
+import statistics
+from dataclasses import dataclass, field
+from importlib import import_module
+from types import ModuleType
+from typing import Any, Sequence
+
+
+BENCHMARKS = {
+    "gland_layout": "calculator.benchmarks.gland_layout",
+    "geometry_pool": "calculator.benchmarks.geometry_pool",
+    "order_memory": "calculator.benchmarks.order_memory",
+    "catalog_load": "calculator.benchmarks.catalog_load",
+    "startup": "calculator.benchmarks.startup",
+    "db_concurrency": "calculator.benchmarks.db_concurrency",
+    "order_writer": "calculator.benchmarks.order_writer",
+    "json_codec": "calculator.benchmarks.json_codec",
+    "order_export": "calculator.benchmarks.order_export",
+    "order_item_index": "calculator.benchmarks.order_item_index",
+    "catalog_import": "calculator.benchmarks.catalog_import",
+}
+
+
+@dataclass
+class BenchmarkReport:
+    """
+    Wynik benchmarku w postaci tabeli.
+    """
+    title: str
+    columns: list[str]
+    rows: list[list[Any]] = field(default_factory=list)
+    notes: list[str] = field(default_factory=list)
+    failures: list[str] = field(default_factory=list)
+
+
+def get_benchmark(name: str) -> ModuleType:
+    """
+    Zwraca moduł benchmarku o podanej nazwie (KeyError, jeśli nie istnieje).
+    """
+    return import_module(BENCHMARKS[name])
+
+
+def timing_stats(durations: Sequence[float]) -> dict[str, float]:
+    """
+    Zwraca statystyki czasów (w sekundach) przeliczone na milisekundy.
+    """
+    if not durations:
+        return {"mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+
+    ordered = sorted(durations)
+    return {
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
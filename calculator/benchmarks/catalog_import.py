@@ -0,0 +1,133 @@
+"""
+Benchmark ponownego importu katalogu: update_or_create vs porównanie skrótów.
+
+Tabela dławików w tymczasowej bazie SQLite jest wypełniana ``--rows``
+rekordami, a następnie ten sam plik jest importowany ponownie: bez zmian
+oraz ze zmienioną ceną ``--changed-percent`` procent rekordów. Import ze
+skrótami powinien wykonać jedno zapytanie odczytu i tylko zapisy zmienionych
+wierszy. Dla porównania mierzony jest dawny import wiersz po wierszu
+(update_or_create) na pierwszych ``--baseline-rows`` rekordach.
+"""
+
+import copy
+import os
+import tempfile
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.test.utils import CaptureQueriesContext
+
+from calculator.benchmarks import BenchmarkReport
+from calculator.benchmarks.db_concurrency import temporary_database
+from calculator.models import Gland
+from calculator.services.catalog_import import apply_catalog_import, plan_catalog_import
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--rows", type=int, default=50000, help="Liczba dławików w katalogu (domyślnie 50000)"
+    )
+    parser.add_argument(
+        "--changed-percent",
+        type=float,
+        default=1.0,
+        help="Procent rekordów ze zmienioną ceną (domyślnie 1)",
+    )
+    parser.add_argument(
+        "--baseline-rows",
+        type=int,
+        default=2000,
+        help="Liczba rekordów importowanych przez update_or_create (domyślnie 2000)",
+    )
+
+
+def _records(rows: int, changed: int = 0) -> list[dict]:
+    return [
+        {
+            "catalog_number": f"GLD-{index:06d}",
+            "size": f"M{12 + index % 52}",
+            "diameter_mm": 12 + index % 52,
+            "physical_diameter_mm": 16 + index % 52,
+            "cable_range_min": 3,
+            "cable_range_max": 6.5,
+            "material": "PA" if index % 2 else "Brass",
+            "price": str(Decimal("2.50") + index % 100 + (1 if index < changed else 0)),
+        }
+        for index in range(rows)
+    ]
+
+
+def _import(records: list[dict], using: str) -> tuple[float, int, int, str]:
+    """
+    Zwraca (czas, liczba zapytań, liczba zapisów, podsumowanie planu) importu ze skrótami.
+    """
+    with CaptureQueriesContext(connections[using]) as queries:
+        started = time.perf_counter()
+        plan = plan_catalog_import(Gland, "catalog_number", records, using=using)
+        if plan.has_changes:
+            apply_catalog_import(plan)
+        elapsed = time.perf_counter() - started
+
+    writes = sum(
+        1 for query in queries.captured_queries
+        if query["sql"].lstrip().upper().startswith(("INSERT", "UPDATE"))
+    )
+    return elapsed, len(queries.captured_queries), writes, plan.summary()
+
+
+def _import_row_by_row(records: list[dict], using: str) -> tuple[float, int]:
+    with CaptureQueriesContext(connections[using]) as queries:
+        started = time.perf_counter()
+        with transaction.atomic(using=using):
+            for record in records:
+                Gland.objects.using(using).update_or_create(
+                    catalog_number=record["catalog_number"],
+                    defaults={key: value for key, value in record.items()
+                              if key != "catalog_number"},
+                )
+        elapsed = time.perf_counter() - started
+    return elapsed, len(queries.captured_queries)
+
+
+def run(rows=50000, changed_percent=1.0, baseline_rows=2000, **options) -> BenchmarkReport:
+    changed = int(rows * changed_percent / 100)
+    report = BenchmarkReport(
+        title=f"Ponowny import katalogu ({rows} dławików)",
+        columns=["import", "czas ms", "zapytania", "zapisy", "wynik"],
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_settings = copy.deepcopy(settings.DATABASES["default"])
+        db_settings["NAME"] = os.path.join(directory, "catalog_import.sqlite3")
+        with temporary_database(db_settings) as using:
+            with connections[using].schema_editor() as editor:
+                editor.create_model(Gland)
+
+            scenarios = [
+                ("pierwszy import", _records(rows)),
+                ("ponowny, bez zmian", _records(rows)),
+                (f"ponowny, {changed} zmienionych cen", _records(rows, changed)),
+            ]
+            for name, records in scenarios:
+                elapsed, queries, writes, summary = _import(records, using)
+                report.rows.append([name, f"{elapsed * 1000:.1f}", queries, writes, summary])
+
+                if name == "ponowny, bez zmian" and (queries != 1 or writes):
+                    report.failures.append(
+                        f"{name}: {queries} zapytań i {writes} zapisów (oczekiwano 1 i 0)"
+                    )
+
+            baseline = _records(min(baseline_rows, rows), changed)
+            elapsed, queries = _import_row_by_row(baseline, using)
+            report.rows.append([
+                f"update_or_create, {len(baseline)} rekordów", f"{elapsed * 1000:.1f}", queries,
+                "-", f"~{elapsed * rows / len(baseline):.1f} s dla {rows} rekordów",
+            ])
+
+    report.notes.append(
+        "Import ze skrótami czyta tabelę jednym zapytaniem; zapisy to paczki bulk_create "
+        "i bulk_update tylko dla nowych i zmienionych wierszy."
+    )
+    return report
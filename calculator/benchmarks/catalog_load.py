@@ -0,0 +1,52 @@
+"""
+Benchmark wczytania katalogu: zapytania do bazy vs binarny plik migawki (mmap).
+"""
+
+import os
+import tempfile
+import time
+
+from calculator.benchmarks import BenchmarkReport, timing_stats
+from calculator.services.catalog_file import load_catalog_file, write_catalog_file
+from calculator.services.catalog_snapshot import load_catalog_snapshot
+
+
+def add_arguments(parser):
+    parser.add_argument("--repeat", type=int, default=50, help="Liczba powtórzeń (domyślnie 50)")
+
+
+def run(repeat=50, **options) -> BenchmarkReport:
+    catalog = load_catalog_snapshot()
+    report = BenchmarkReport(
+        title=(
+            f"Wczytanie katalogu {catalog.version} (obudowy={len(catalog.enclosures)}, "
+            f"dławiki={len(catalog.glands)}, terminale={len(catalog.terminals)})"
+        ),
+        columns=["źródło", "mediana µs", "p95 µs", "max µs"],
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.bin")
+        size = write_catalog_file(catalog, path)
+
+        sources = (
+            ("baza danych", load_catalog_snapshot),
+            ("plik (mmap)", lambda: load_catalog_file(path)),
+        )
+        for name, load in sources:
+            durations = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                load()
+                durations.append(time.perf_counter() - started)
+
+            stats = timing_stats(durations)
+            report.rows.append([
+                name,
+                f"{stats['p50_ms'] * 1000:.0f}",
+                f"{stats['p95_ms'] * 1000:.0f}",
+                f"{stats['max_ms'] * 1000:.0f}",
+            ])
+
+    report.notes.append(f"Rozmiar pliku: {size} B")
+    return report
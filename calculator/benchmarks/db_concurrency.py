@@ -0,0 +1,156 @@
+"""
+Benchmark równoległych zapisów zamówień do SQLite: domyślna konfiguracja vs profil produkcyjny.
+
+Każdy wątek zapisuje zamówienia tak jak create_order (zamówienie i email
+w kolejce w jednej transakcji), a po każdym "żądaniu" zamyka połączenie
+zgodnie z CONN_MAX_AGE. Profil domyślny to sama ścieżka do pliku bazy
+(dziennik rollback, transakcje DEFERRED, bez PRAGMA i bez trwałych
+połączeń); profil produkcyjny to DATABASES['default'] z ustawieniami
+CALCULATOR_SQLITE. Każdy profil pisze do własnej, tymczasowej bazy.
+"""
+
+import copy
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from django.conf import settings
+from django.db import OperationalError, connections, transaction
+from django.test.utils import override_settings
+
+from calculator.benchmarks import BenchmarkReport, timing_stats
+from calculator.models import OrderEmailOutbox, OrderItemIndex, SimpleOrder
+
+
+BENCHMARK_ALIAS = "benchmark_concurrency"
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--threads", type=int, default=16, help="Liczba wątków zapisujących (domyślnie 16)"
+    )
+    parser.add_argument(
+        "--orders", type=int, default=50, help="Liczba zamówień na wątek (domyślnie 50)"
+    )
+
+
+@contextmanager
+def temporary_database(db_settings: dict) -> Iterator[str]:
+    """
+    Rejestruje tymczasowy alias bazy z tabelami zamówień, indeksu pozycji i kolejki
+    emaili; zwraca alias.
+    """
+    databases = {
+        "default": copy.deepcopy(settings.DATABASES["default"]),
+        BENCHMARK_ALIAS: db_settings,
+    }
+    configured = connections.configure_settings(databases)
+    connections.settings[BENCHMARK_ALIAS] = configured[BENCHMARK_ALIAS]
+    try:
+        with connections[BENCHMARK_ALIAS].schema_editor() as editor:
+            editor.create_model(SimpleOrder)
+            editor.create_model(OrderEmailOutbox)
+            editor.create_model(OrderItemIndex)
+        yield BENCHMARK_ALIAS
+    finally:
+        connections[BENCHMARK_ALIAS].close()
+        del connections[BENCHMARK_ALIAS]
+        del connections.settings[BENCHMARK_ALIAS]
+
+
+def _write_orders(thread_index: int, orders: int, durations: list, errors: list) -> None:
+    connection = connections[BENCHMARK_ALIAS]
+    try:
+        for order_index in range(orders):
+            started = time.perf_counter()
+            try:
+                with transaction.atomic(using=BENCHMARK_ALIAS):
+                    order = SimpleOrder.objects.using(BENCHMARK_ALIAS).create(
+                        customer_name=f"Benchmark {thread_index}",
+                        customer_email=f"benchmark-{thread_index}@example.com",
+                        order_data={"saveBox": [], "thread": thread_index, "order": order_index},
+                    )
+                    OrderEmailOutbox.objects.using(BENCHMARK_ALIAS).create(
+                        order=order,
+                        kind=OrderEmailOutbox.Kind.ORDER_CONFIRMATION,
+                        recipient=order.customer_email,
+                    )
+            except OperationalError as e:
+                errors.append(str(e))
+            else:
+                durations.append(time.perf_counter() - started)
+            # Koniec "żądania" - jak sygnał request_finished.
+            connection.close_if_unusable_or_obsolete()
+    finally:
+        connection.close()
+
+
+def run_profile(
+    db_settings: dict, threads: int, orders: int
+) -> tuple[float, list[float], list[str]]:
+    """
+    Zapisuje threads * orders zamówień równolegle; zwraca (czas, czasy zapisów, błędy).
+    """
+    durations: list[float] = []
+    errors: list[str] = []
+    workers = [
+        threading.Thread(target=_write_orders, args=(index, orders, durations, errors))
+        for index in range(threads)
+    ]
+    with temporary_database(db_settings):
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return time.perf_counter() - started, durations, errors
+
+
+def run(threads=16, orders=50, **options) -> BenchmarkReport:
+    report = BenchmarkReport(
+        title=f"Równoległe zapisy zamówień do SQLite ({threads} wątków x {orders} zamówień)",
+        columns=["profil", "zamówienia/s", "p50 ms", "p95 ms", "max ms", "błędy blokady"],
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        production = copy.deepcopy(settings.DATABASES["default"])
+        production["NAME"] = os.path.join(directory, "production.sqlite3")
+        profiles = [
+            (
+                "domyślny",
+                {
+                    "ENGINE": "django.db.backends.sqlite3",
+                    "NAME": os.path.join(directory, "default.sqlite3"),
+                },
+                {"ENABLED": False},
+            ),
+            ("produkcyjny", production, getattr(settings, "CALCULATOR_SQLITE", {})),
+        ]
+
+        for name, db_settings, sqlite_settings in profiles:
+            with override_settings(CALCULATOR_SQLITE=sqlite_settings):
+                elapsed, durations, errors = run_profile(db_settings, threads, orders)
+
+            stats = timing_stats(durations)
+            report.rows.append([
+                name,
+                f"{len(durations) / elapsed:.0f}",
+                f"{stats['p50_ms']:.1f}",
+                f"{stats['p95_ms']:.1f}",
+                f"{stats['max_ms']:.1f}",
+                sum("locked" in error for error in errors),
+            ])
+            other_errors = [error for error in errors if "locked" not in error]
+            if other_errors:
+                report.notes.append(
+                    f"{name}: inne błędy bazy ({len(other_errors)}): {other_errors[0]}"
+                )
+
+    report.notes.append(
+        f"Profil produkcyjny: CONN_MAX_AGE={production.get('CONN_MAX_AGE', 0)}, "
+        f"transaction_mode={production.get('OPTIONS', {}).get('transaction_mode', 'DEFERRED')}"
+    )
+    return report
@@ -0,0 +1,111 @@
+"""
+Benchmark walidacji geometrycznej zamówień w bieżącym procesie i w puli procesów.
+
+Zamówienia składają się z losowych obudów z katalogu z dławikami na kilku
+ściankach (wypełnienie bliskie granicy zmieszczenia). Pula jest rozgrzewana
+przed pomiarem, tak jak w działającej aplikacji.
+"""
+
+import random
+import time
+
+from calculator.benchmarks import BenchmarkReport
+from calculator.benchmarks.gland_layout import generate_configurations
+from calculator.domain.order import SaveBox
+from calculator.services.catalog_snapshot import get_catalog_snapshot
+from calculator.services.geometry import (
+    gland_layout_validator,
+    glands_data_from_catalog,
+    validate_box_geometry,
+)
+from calculator.services.geometry_pool import (
+    get_geometry_pool,
+    get_geometry_pool_settings,
+    pool_worker_count,
+    validate_boxes_in_pool,
+)
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[8, 32, 64, 128, 512],
+        help="Liczby obudów w zamówieniu (domyślnie 8 32 64 128 512)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Liczba powtórzeń (domyślnie 3)")
+    parser.add_argument("--seed", type=int, default=0, help="Ziarno generatora (domyślnie 0)")
+
+
+def generate_boxes(catalog, glands_data, count, seed):
+    """
+    Losuje obudowy z katalogu z dławikami na ich ściankach.
+    """
+    rng = random.Random(seed)
+    enclosures = sorted(catalog.enclosures.values(), key=lambda enclosure: enclosure.code)
+    boxes = []
+
+    for index in range(count):
+        enclosure = rng.choice(enclosures)
+        sides = rng.sample(
+            sorted(enclosure.mounting_areas), k=rng.randint(1, len(enclosure.mounting_areas))
+        )
+        glands = []
+        for side in sides:
+            configurations = generate_configurations(
+                glands_data, [enclosure.mounting_areas[side]], 1, rng.random(), 0.3, 0.7
+            )
+            items = [dict(item, material="PA") for item in configurations[0][0]]
+            glands.append({"side": side, "items": items})
+
+        boxes.append((index, SaveBox.from_dict({
+            "code": enclosure.code,
+            "quantity": 1,
+            "currentConfig": {"glands": glands, "terminals": []},
+        })))
+
+    return boxes
+
+
+def run(sizes=(8, 32, 64, 128, 512), repeat=3, seed=0, **options) -> BenchmarkReport:
+    catalog = get_catalog_snapshot()
+    glands_data = glands_data_from_catalog(catalog)
+    validator = gland_layout_validator()
+    pool_settings = get_geometry_pool_settings()
+    workers = pool_worker_count(pool_settings)
+
+    started = time.perf_counter()
+    get_geometry_pool(catalog)
+    warm_up = time.perf_counter() - started
+
+    report = BenchmarkReport(
+        title=(
+            f"Walidacja geometryczna: bieżący proces vs pula {workers} procesów "
+            f"(CHUNK_SIZE={pool_settings['CHUNK_SIZE']}, MIN_BOXES={pool_settings['MIN_BOXES']})"
+        ),
+        columns=["obudowy", "inline ms", "pula ms", "przyspieszenie"],
+    )
+
+    for size in sizes:
+        boxes = generate_boxes(catalog, glands_data, size, seed)
+        inline = []
+        pooled = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for box_index, box in boxes:
+                validate_box_geometry(
+                    box_index, box, catalog.enclosures[box.code], glands_data, validator
+                )
+            inline.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            validate_boxes_in_pool(boxes, catalog)
+            pooled.append(time.perf_counter() - started)
+
+        inline_ms = min(inline) * 1000
+        pooled_ms = min(pooled) * 1000
+        report.rows.append(
+            [size, f"{inline_ms:.2f}", f"{pooled_ms:.2f}", f"{inline_ms / pooled_ms:.2f}x"]
+        )
+
+    report.notes.append(f"Uruchomienie i rozgrzanie puli: {warm_up * 1000:.1f} ms (jednorazowo)")
+    report.notes.append("Czasy to najlepszy wynik z powtórzeń")
+    return report
@@ -0,0 +1,121 @@
+"""
+Benchmark rozmieszczenia dławików: skuteczność (odsetek mieszczących się układów)
+i czas dla trybów GlandLayoutValidator.
+
+Konfiguracje są losowane na obszarach montażowych obudów z katalogu: dławiki
+dobierane są do osiągnięcia losowego wypełnienia powierzchni użytkowej, tak aby
+większość przypadków leżała blisko granicy zmieszczenia.
+"""
+
+import math
+import random
+import time
+from collections import Counter
+
+from calculator.benchmarks import BenchmarkReport, timing_stats
+from calculator.domain.services.gland_layout_validator import GlandLayoutValidator, MountingArea
+from calculator.services.catalog_snapshot import get_catalog_snapshot
+from calculator.services.geometry import glands_data_from_catalog
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--samples", type=int, default=500, help="Liczba konfiguracji (domyślnie 500)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Ziarno generatora (domyślnie 0)")
+    parser.add_argument(
+        "--budget-ms", type=float, default=50,
+        help="Limit czasu przeszukiwania na ściankę w trybie optimal (domyślnie 50 ms)",
+    )
+    parser.add_argument(
+        "--min-fill",
+        type=float,
+        default=0.3,
+        help="Minimalne wypełnienie powierzchni (domyślnie 0.3)",
+    )
+    parser.add_argument(
+        "--max-fill",
+        type=float,
+        default=0.75,
+        help="Maksymalne wypełnienie powierzchni (domyślnie 0.75)",
+    )
+
+
+def generate_configurations(glands_data, areas, samples, seed, min_fill, max_fill):
+    """
+    Losuje konfiguracje (dławiki, obszar montażowy) o zadanym wypełnieniu powierzchni.
+    """
+    rng = random.Random(seed)
+    margin = 2 * GlandLayoutValidator.EDGE_MARGIN
+    configurations = []
+
+    while len(configurations) < samples:
+        width, height = rng.choice(areas)
+        usable = min(width, height) - margin
+        sizes = [
+            size for size, data in glands_data.items() if data["physical_diameter_mm"] <= usable
+        ]
+        if not sizes:
+            continue
+
+        target = rng.uniform(min_fill, max_fill) * (width - margin) * (height - margin)
+        quantities: Counter = Counter()
+        filled = 0.0
+        while filled < target:
+            size = rng.choice(sizes)
+            quantities[size] += 1
+            filled += math.pi / 4 * glands_data[size]["physical_diameter_mm"] ** 2
+
+        configurations.append((
+            [{"size": size, "quantity": quantity} for size, quantity in quantities.items()],
+            MountingArea(width=width, height=height, side="top"),
+        ))
+
+    return configurations
+
+
+def run(
+    samples=500, seed=0, budget_ms=50, min_fill=0.3, max_fill=0.75, **options
+) -> BenchmarkReport:
+    catalog = get_catalog_snapshot()
+    glands_data = glands_data_from_catalog(catalog)
+    areas = sorted({
+        area
+        for enclosure in catalog.enclosures.values()
+        for area in enclosure.mounting_areas.values()
+    })
+    configurations = generate_configurations(glands_data, areas, samples, seed, min_fill, max_fill)
+
+    report = BenchmarkReport(
+        title=f"Rozmieszczenie dławików ({len(configurations)} konfiguracji, seed={seed})",
+        columns=["tryb", "mieści się", "%", "średnio ms", "p95 ms", "max ms", "algorytmy"],
+    )
+
+    for mode in GlandLayoutValidator.MODES:
+        validator = GlandLayoutValidator(mode=mode, time_budget=budget_ms / 1000)
+        durations = []
+        fits = 0
+        algorithms: Counter = Counter()
+
+        for glands, area in configurations:
+            started = time.perf_counter()
+            layout = validator.compute_layout(glands, area, glands_data)
+            durations.append(time.perf_counter() - started)
+            fits += layout.is_valid
+            algorithms[layout.algorithm] += 1
+
+        stats = timing_stats(durations)
+        report.rows.append([
+            mode,
+            fits,
+            f"{100 * fits / len(configurations):.1f}",
+            f"{stats['mean_ms']:.3f}",
+            f"{stats['p95_ms']:.3f}",
+            f"{stats['max_ms']:.3f}",
+            ", ".join(f"{name}={count}" for name, count in sorted(algorithms.items())),
+        ])
+
+    report.notes.append(
+        "ffd_timeout - przeszukiwanie przerwane po limicie czasu, zwrócono wynik FFD"
+    )
+    return report
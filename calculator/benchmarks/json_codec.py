@@ -0,0 +1,106 @@
+"""
+Benchmark kodowania JSON: parsowanie dużego zamówienia i renderowanie listy zamówień.
+
+Porównuje JSONParser/JSONRenderer z DRF (stdlib json) z FastJSONParser/
+FastJSONRenderer (orjson, jeśli jest zainstalowany). Lista zamówień zawiera
+UUID, ceny Decimal i daty - tak jak dane zwracane dla SimpleOrder.
+"""
+
+import io
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from calculator.benchmarks import BenchmarkReport, timing_stats
+from calculator.benchmarks.order_memory import generate_order
+from calculator.infrastructure.api import fast_json
+from calculator.services.catalog_snapshot import get_catalog_snapshot
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--boxes", type=int, default=500, help="Liczba obudów w zamówieniu (domyślnie 500)"
+    )
+    parser.add_argument(
+        "--orders", type=int, default=1000, help="Liczba zamówień na liście (domyślnie 1000)"
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="Liczba powtórzeń (domyślnie 20)")
+    parser.add_argument("--seed", type=int, default=0, help="Ziarno generatora (domyślnie 0)")
+
+
+def generate_order_listing(order_data, orders, seed):
+    """
+    Zwraca listę zamówień w kształcie odpowiedzi API (UUID, Decimal, datetime).
+    """
+    rng = random.Random(seed)
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "customer_name": f"Klient {index}",
+            "customer_email": f"klient{index}@example.com",
+            "total_price": Decimal(rng.randint(1000, 10_000_000)) / 100,
+            "created_at": created_at + timedelta(minutes=index),
+            "order_data": order_data,
+        }
+        for index in range(orders)
+    ]
+
+
+def _measure(function, repeat):
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - started)
+    return result, timing_stats(durations)
+
+
+def run(boxes=500, orders=1000, repeat=20, seed=0, **options) -> BenchmarkReport:
+    catalog = get_catalog_snapshot()
+    order_data = generate_order(catalog, boxes, seed)
+    body = json.dumps(order_data).encode()
+    # Lista z mniejszymi zamówieniami - tak jak listing w API.
+    listing = generate_order_listing(generate_order(catalog, 5, seed), orders, seed)
+
+    implementation = "orjson" if fast_json.orjson is not None else "stdlib (brak orjson)"
+    report = BenchmarkReport(
+        title=(
+            f"JSON: zamówienie {boxes} obudów ({len(body) // 1024} KiB), "
+            f"lista {orders} zamówień"
+        ),
+        columns=["operacja", "implementacja", "p50 ms", "p95 ms", "rozmiar KiB"],
+    )
+
+    parsers = (
+        ("DRF JSONParser", JSONParser()),
+        (f"FastJSONParser ({implementation})", fast_json.FastJSONParser()),
+    )
+    for name, parser in parsers:
+        _, stats = _measure(lambda: parser.parse(io.BytesIO(body)), repeat)
+        report.rows.append([
+            "parsowanie zamówienia", name,
+            f"{stats['p50_ms']:.2f}", f"{stats['p95_ms']:.2f}", len(body) // 1024,
+        ])
+
+    renderers = (
+        ("DRF JSONRenderer", JSONRenderer()),
+        (f"FastJSONRenderer ({implementation})", fast_json.FastJSONRenderer()),
+    )
+    for name, renderer in renderers:
+        rendered, stats = _measure(lambda: renderer.render(listing), repeat)
+        report.rows.append([
+            "renderowanie listy", name,
+            f"{stats['p50_ms']:.2f}", f"{stats['p95_ms']:.2f}", len(rendered) // 1024,
+        ])
+
+    report.notes.append(
+        "DRF JSONRenderer zapisuje Decimal jako liczbę, FastJSONRenderer jako napis"
+    )
+    return report
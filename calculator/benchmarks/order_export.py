@@ -0,0 +1,90 @@
+"""
+Benchmark eksportu zamówień: czas i szczytowa pamięć dla rosnącej liczby zamówień.
+
+Zamówienia są zapisywane do tymczasowej bazy SQLite, a eksport CSV i XLSX
+jest wykonywany po każdym kroku wzrostu tabeli. Przy eksporcie
+strumieniowym szczyt pamięci (tracemalloc) nie powinien rosnąć razem
+z liczbą zamówień.
+"""
+
+import copy
+import os
+import tempfile
+import time
+import tracemalloc
+
+from django.conf import settings
+
+from calculator.benchmarks import BenchmarkReport
+from calculator.benchmarks.db_concurrency import temporary_database
+from calculator.benchmarks.order_memory import generate_order
+from calculator.models import SimpleOrder
+from calculator.services.catalog_snapshot import get_catalog_snapshot
+from calculator.services.order_export import EXPORT_FORMATS, OrderExportFilter, iter_export
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--orders", type=int, default=500, help="Zamówienia dodawane w kroku (domyślnie 500)"
+    )
+    parser.add_argument("--steps", type=int, default=4, help="Liczba kroków (domyślnie 4)")
+    parser.add_argument(
+        "--boxes", type=int, default=5, help="Liczba obudów w zamówieniu (domyślnie 5)"
+    )
+
+
+def _measure_export(export_format: str, using: str) -> tuple[float, int, int]:
+    """
+    Zwraca (czas, rozmiar pliku, szczyt pamięci) eksportu wszystkich zamówień.
+    """
+    tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        size = sum(len(chunk) for chunk in iter_export(export_format, OrderExportFilter(), using))
+        elapsed = time.perf_counter() - started
+        return elapsed, size, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(orders=500, steps=4, boxes=5, **options) -> BenchmarkReport:
+    catalog = get_catalog_snapshot()
+    report = BenchmarkReport(
+        title=f"Eksport zamówień ({boxes} obudów w zamówieniu)",
+        columns=["zamówienia", "format", "czas ms", "rozmiar KiB", "szczyt pamięci KiB"],
+    )
+
+    peaks: dict[str, list[int]] = {export_format: [] for export_format in EXPORT_FORMATS}
+    with tempfile.TemporaryDirectory() as directory:
+        db_settings = copy.deepcopy(settings.DATABASES["default"])
+        db_settings["NAME"] = os.path.join(directory, "export.sqlite3")
+        with temporary_database(db_settings) as using:
+            for step in range(steps):
+                SimpleOrder.objects.using(using).bulk_create(
+                    [
+                        SimpleOrder(
+                            customer_name="Benchmark",
+                            customer_email="benchmark@example.com",
+                            order_data=generate_order(catalog, boxes, seed=step * orders + index),
+                        )
+                        for index in range(orders)
+                    ],
+                    batch_size=500,
+                )
+                for export_format in EXPORT_FORMATS:
+                    elapsed, size, peak = _measure_export(export_format, using)
+                    peaks[export_format].append(peak)
+                    report.rows.append([
+                        (step + 1) * orders,
+                        export_format,
+                        f"{elapsed * 1000:.0f}",
+                        f"{size / 1024:.0f}",
+                        f"{peak / 1024:.0f}",
+                    ])
+
+    for export_format, values in peaks.items():
+        report.notes.append(
+            f"{export_format}: szczyt pamięci przy {steps * orders} zamówieniach = "
+            f"{values[-1] / values[0]:.2f}x szczytu przy {orders}"
+        )
+    return report
@@ -0,0 +1,123 @@
+"""
+Benchmark wyszukiwania zamówień po pozycjach: dekodowanie order_data vs OrderItemIndex.
+
+Zamówienia są zapisywane do tymczasowej bazy SQLite razem z indeksem
+pozycji (tak jak save_order). Wyszukiwanie zamówień z daną obudową i z danym
+dławikiem jest wykonywane pełnym skanem (dekodowanie każdego order_data)
+oraz podzapytaniem po indeksie. Plan zapytania (EXPLAIN QUERY PLAN) jest
+wypisywany w uwagach - użycie indeksu sprawdzają testy (calculator/tests.py).
+"""
+
+import copy
+import os
+import random
+import tempfile
+import time
+from typing import Callable
+
+from django.conf import settings
+
+from calculator.benchmarks import BenchmarkReport
+from calculator.benchmarks.db_concurrency import temporary_database
+from calculator.benchmarks.order_memory import generate_order
+from calculator.domain.order import OrderData
+from calculator.models import SimpleOrder
+from calculator.services.catalog_snapshot import get_catalog_snapshot
+from calculator.services.order_item_index import (
+    explain_query_plan,
+    filter_orders_by_items,
+    index_order_items,
+)
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--orders", type=int, default=2000, help="Liczba zamówień (domyślnie 2000)"
+    )
+    parser.add_argument(
+        "--boxes", type=int, default=5, help="Liczba obudów w zamówieniu (domyślnie 5)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Ziarno generatora (domyślnie 0)")
+
+
+def _scan(using: str, matches: Callable[[OrderData], bool]) -> list:
+    return [
+        pk
+        for pk, order_data in SimpleOrder.objects.using(using).values_list("pk", "order_data")
+        if matches(OrderData.from_dict(order_data))
+    ]
+
+
+def _timed(function: Callable[[], list]) -> tuple[float, list]:
+    started = time.perf_counter()
+    result = function()
+    return time.perf_counter() - started, result
+
+
+def run(orders=2000, boxes=5, seed=0, **options) -> BenchmarkReport:
+    catalog = get_catalog_snapshot()
+    rng = random.Random(seed)
+    enclosure = rng.choice(sorted(catalog.enclosures))
+    gland_size, gland_material = rng.choice(sorted(catalog.glands))
+
+    searches = [
+        (
+            f"obudowa {enclosure}",
+            {"enclosure": enclosure},
+            lambda order: any(box.code == enclosure for box in order.save_box),
+        ),
+        (
+            f"dławik {gland_size} {gland_material}",
+            {"gland": gland_size, "gland_material": gland_material},
+            lambda order: any(
+                item.size == gland_size and item.material == gland_material
+                for box in order.save_box
+                for side in box.current_config.glands
+                for item in side.items
+            ),
+        ),
+    ]
+
+    report = BenchmarkReport(
+        title=f"Wyszukiwanie zamówień po pozycjach ({orders} zamówień, {boxes} obudów)",
+        columns=["wyszukiwanie", "zamówienia", "skan order_data ms", "indeks ms", "przyspieszenie"],
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_settings = copy.deepcopy(settings.DATABASES["default"])
+        db_settings["NAME"] = os.path.join(directory, "order_items.sqlite3")
+        with temporary_database(db_settings) as using:
+            for start in range(0, orders, 500):
+                created = SimpleOrder.objects.using(using).bulk_create([
+                    SimpleOrder(
+                        customer_name="Benchmark",
+                        customer_email="benchmark@example.com",
+                        order_data=generate_order(catalog, boxes, seed=seed + index),
+                    )
+                    for index in range(start, min(start + 500, orders))
+                ])
+                index_order_items(created, using=using)
+
+            for name, filters, matches in searches:
+                queryset = filter_orders_by_items(
+                    SimpleOrder.objects.using(using), **filters
+                ).values_list("pk", flat=True)
+                scan_time, scanned = _timed(lambda: _scan(using, matches))
+                index_time, found = _timed(lambda: list(queryset))
+                if set(scanned) != set(found):
+                    report.failures.append(
+                        f"{name}: indeks zwrócił {len(found)} zamówień, skan {len(scanned)}"
+                    )
+
+                report.rows.append([
+                    name,
+                    len(found),
+                    f"{scan_time * 1000:.1f}",
+                    f"{index_time * 1000:.2f}",
+                    f"{scan_time / index_time:.0f}x" if index_time else "-",
+                ])
+
+                plan = explain_query_plan(queryset)
+                report.notes.append(f"{name}: " + " | ".join(plan))
+
+    return report
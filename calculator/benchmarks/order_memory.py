@@ -0,0 +1,107 @@
+"""
+Benchmark pamięci zamówienia: zagnieżdżone słowniki z JSON vs obiekty OrderData.
+
+Zamówienie jest generowane z produktów katalogu, serializowane do JSON
+i wczytywane ponownie, tak jak dane z żądania lub z SimpleOrder.order_data.
+Pamięć jest mierzona modułem tracemalloc.
+"""
+
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+from calculator.benchmarks import BenchmarkReport
+from calculator.domain.order import OrderData
+from calculator.services.catalog_snapshot import MOUNTING_SIDES, get_catalog_snapshot
+from calculator.services.pricing import calculate_order_price_breakdown
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--boxes", type=int, default=500, help="Liczba obudów w zamówieniu (domyślnie 500)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Ziarno generatora (domyślnie 0)")
+
+
+def generate_order(catalog, boxes, seed):
+    """
+    Zwraca dane zamówienia (kształt JSON) z losowymi produktami katalogu.
+    """
+    rng = random.Random(seed)
+    enclosures = sorted(catalog.enclosures)
+    glands = sorted(catalog.glands)
+    terminals = sorted(catalog.terminals)
+
+    return {
+        "name": "Benchmark",
+        "email": "benchmark@example.com",
+        "userInformation": "",
+        "saveBox": [
+            {
+                "id": str(index),
+                "name": f"Skrzynka {index}",
+                "code": rng.choice(enclosures),
+                "quantity": rng.randint(1, 10),
+                "currentConfig": {
+                    "glands": [
+                        {
+                            "side": side,
+                            "items": [
+                                {"size": size, "material": material, "quantity": rng.randint(1, 4)}
+                                for size, material in rng.sample(glands, 3)
+                            ],
+                        }
+                        for side in MOUNTING_SIDES
+                    ],
+                    "terminals": [
+                        {"size": size, "color": color, "quantity": rng.randint(1, 12)}
+                        for size, color in rng.sample(terminals, 4)
+                    ],
+                },
+            }
+            for index in range(boxes)
+        ],
+    }
+
+
+def _measure(build):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        value = build()
+        gc.collect()
+        return value, tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+def run(boxes=500, seed=0, **options) -> BenchmarkReport:
+    catalog = get_catalog_snapshot()
+    payload = json.dumps(generate_order(catalog, boxes, seed))
+
+    data, dict_bytes = _measure(lambda: json.loads(payload))
+    order, object_bytes = _measure(lambda: OrderData.from_dict(json.loads(payload)))
+
+    started = time.perf_counter()
+    OrderData.from_dict(data)
+    conversion = time.perf_counter() - started
+
+    started = time.perf_counter()
+    calculate_order_price_breakdown(order, catalog)
+    pricing = time.perf_counter() - started
+
+    report = BenchmarkReport(
+        title=f"Pamięć zamówienia ({boxes} obudów)",
+        columns=["reprezentacja", "KiB na zamówienie", "B na obudowę", "względem dict"],
+    )
+    for name, size in (("dict (JSON)", dict_bytes), ("OrderData (__slots__)", object_bytes)):
+        report.rows.append([
+            name, f"{size / 1024:.1f}", f"{size / boxes:.0f}", f"{size / dict_bytes:.2f}x"
+        ])
+
+    report.notes.append(f"Konwersja dict -> OrderData: {conversion * 1000:.2f} ms")
+    report.notes.append(f"Wycena OrderData: {pricing * 1000:.2f} ms")
+    return report
@@ -0,0 +1,132 @@
+"""
+Benchmark zapisu zamówień: transakcja na zamówienie vs zapis grupowy (OrderWriter).
+
+Wątki klientów zapisują zamówienia po kolei i czekają na każdy zapis, tak jak
+żądania create_order. Oba warianty piszą do tymczasowej bazy z profilem
+DATABASES['default'] i CALCULATOR_SQLITE; --synchronous pozwala sprawdzić
+wpływ fsync przy każdym zatwierdzeniu (np. FULL).
+"""
+
+import copy
+import os
+import tempfile
+import threading
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.test.utils import override_settings
+
+from calculator.benchmarks import BenchmarkReport, timing_stats
+from calculator.benchmarks.db_concurrency import temporary_database
+from calculator.models import SimpleOrder
+from calculator.services.email_service import enqueue_order_confirmations
+from calculator.services.order_writer import OrderWriter, get_order_writer_settings
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--threads", type=int, default=32, help="Liczba wątków klientów (domyślnie 32)"
+    )
+    parser.add_argument(
+        "--orders", type=int, default=50, help="Liczba zamówień na wątek (domyślnie 50)"
+    )
+    parser.add_argument(
+        "--synchronous",
+        default=None,
+        help="Wartość PRAGMA synchronous (domyślnie z CALCULATOR_SQLITE)",
+    )
+
+
+def _build_order(thread_index: int, order_index: int) -> SimpleOrder:
+    return SimpleOrder(
+        customer_name=f"Benchmark {thread_index}",
+        customer_email=f"benchmark-{thread_index}@example.com",
+        order_data={"saveBox": [], "thread": thread_index, "order": order_index},
+        total_price=Decimal("100.00"),
+    )
+
+
+def _save_in_own_transaction(alias: str, order: SimpleOrder) -> None:
+    with transaction.atomic(using=alias):
+        order.save(using=alias, force_insert=True)
+        enqueue_order_confirmations([order], using=alias)
+
+
+def _run_clients(save, threads: int, orders: int, alias: str) -> tuple[float, list[float]]:
+    durations: list[float] = []
+
+    def client(thread_index):
+        try:
+            for order_index in range(orders):
+                started = time.perf_counter()
+                save(_build_order(thread_index, order_index))
+                durations.append(time.perf_counter() - started)
+        finally:
+            connections[alias].close()
+
+    workers = [threading.Thread(target=client, args=(index,)) for index in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - started, durations
+
+
+def run(threads=32, orders=50, synchronous=None, **options) -> BenchmarkReport:
+    sqlite_settings = dict(getattr(settings, "CALCULATOR_SQLITE", {}))
+    if synchronous is not None:
+        sqlite_settings["SYNCHRONOUS"] = synchronous
+    writer_settings = get_order_writer_settings()
+
+    report = BenchmarkReport(
+        title=(
+            f"Zapis zamówień ({threads} wątków x {orders} zamówień, "
+            f"synchronous={sqlite_settings.get('SYNCHRONOUS', 'normal')})"
+        ),
+        columns=["wariant", "zamówienia/s", "p50 ms", "p95 ms", "max ms", "transakcje"],
+    )
+
+    with (
+        tempfile.TemporaryDirectory() as directory,
+        override_settings(CALCULATOR_SQLITE=sqlite_settings),
+    ):
+        for name in ("transakcja na zamówienie", "zapis grupowy"):
+            db_settings = copy.deepcopy(settings.DATABASES["default"])
+            db_settings["NAME"] = os.path.join(directory, f"{len(report.rows)}.sqlite3")
+
+            with temporary_database(db_settings) as alias:
+                if name == "zapis grupowy":
+                    writer = OrderWriter(
+                        using=alias,
+                        max_batch=writer_settings["MAX_BATCH"],
+                        max_delay=writer_settings["MAX_DELAY_MS"] / 1000,
+                    )
+                    elapsed, durations = _run_clients(writer.write, threads, orders, alias)
+                    writer.stop()
+                    commits = writer.batches
+                else:
+                    elapsed, durations = _run_clients(
+                        lambda order: _save_in_own_transaction(alias, order), threads, orders, alias
+                    )
+                    commits = len(durations)
+
+                saved = SimpleOrder.objects.using(alias).count()
+
+            stats = timing_stats(durations)
+            report.rows.append([
+                name,
+                f"{saved / elapsed:.0f}",
+                f"{stats['p50_ms']:.1f}",
+                f"{stats['p95_ms']:.1f}",
+                f"{stats['max_ms']:.1f}",
+                commits,
+            ])
+
+    report.notes.append(
+        f"Zapis grupowy: MAX_BATCH={writer_settings['MAX_BATCH']}, "
+        f"MAX_DELAY_MS={writer_settings['MAX_DELAY_MS']}"
+    )
+    return report
@@ -0,0 +1,159 @@
+"""
+Benchmark startu aplikacji: czas od uruchomienia procesu do pierwszej odpowiedzi.
+
+Każdy pomiar to nowy proces Pythona, który tworzy aplikację WSGI
+(django.setup(), modele, sygnały) i obsługuje jedno żądanie GET - razem
+z importem URLconf i widoków oraz wczytaniem katalogu. Dodatkowy proces
+z ``-X importtime`` podaje rozkład czasu importów na pakiety (dla modułów
+kalkulatora - na moduły). Opcja --budget-ms kończy komendę błędem, gdy
+mediana przekroczy budżet, więc benchmark może działać jako bramka w CI.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+from calculator.benchmarks import BenchmarkReport, timing_stats
+
+
+# Skrypt procesu potomnego: czasy (time.time()) po utworzeniu aplikacji i po odpowiedzi.
+FIRST_REQUEST_SCRIPT = """
+import json, sys, time
+from wsgiref.util import setup_testing_defaults
+
+from django.core.wsgi import get_wsgi_application
+
+application = get_wsgi_application()
+ready = time.time()
+
+environ = {"PATH_INFO": sys.argv[1], "REQUEST_METHOD": "GET"}
+setup_testing_defaults(environ)
+statuses = []
+body = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+try:
+    for _ in body:
+        pass
+finally:
+    getattr(body, "close", lambda: None)()
+
+print(json.dumps({"ready": ready, "done": time.time(), "status": statuses[0]}))
+"""
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Liczba uruchomień procesu (domyślnie 5)"
+    )
+    parser.add_argument(
+        "--path",
+        default="/api/recruitment/enclosures/",
+        help="Ścieżka pierwszego żądania (domyślnie /api/recruitment/enclosures/)",
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=None,
+        help=(
+            "Budżet mediany czasu do pierwszej odpowiedzi w ms - "
+            "przekroczenie kończy komendę błędem"
+        ),
+    )
+    parser.add_argument(
+        "--top", type=int, default=15, help="Liczba pozycji w rozkładzie importów (domyślnie 15)"
+    )
+
+
+def _child_env() -> dict[str, str]:
+    env = dict(os.environ)
+    env["DJANGO_SETTINGS_MODULE"] = settings.SETTINGS_MODULE
+    env["PYTHONPATH"] = os.pathsep.join(
+        path for path in (str(settings.BASE_DIR), env.get("PYTHONPATH")) if path
+    )
+    return env
+
+
+def _run_child(path: str, env: dict[str, str], importtime: bool = False) -> tuple[float, dict, str]:
+    """
+    Uruchamia proces potomny; zwraca (czas startu procesu, wynik skryptu, stderr).
+    """
+    command = [
+        sys.executable,
+        *(["-X", "importtime"] if importtime else []),
+        "-c", FIRST_REQUEST_SCRIPT,
+        path,
+    ]
+    started = time.time()
+    completed = subprocess.run(command, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup benchmark process failed:\n{completed.stderr[-2000:]}")
+
+    return started, json.loads(completed.stdout.strip().splitlines()[-1]), completed.stderr
+
+
+def import_breakdown(importtime_output: str) -> dict[str, int]:
+    """
+    Sumuje czas własny importów (µs) z wyjścia ``-X importtime`` - na pakiety
+    najwyższego poziomu, a dla pakietu calculator na poszczególne moduły.
+    """
+    totals: dict[str, int] = defaultdict(int)
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # nagłówek tabeli
+        name = name.strip()
+        key = name if name.startswith("calculator.") else name.split(".")[0]
+        totals[key] += int(self_us)
+
+    return dict(totals)
+
+
+def run(
+    repeat=5, path="/api/recruitment/enclosures/", budget_ms=None, top=15, **options
+) -> BenchmarkReport:
+    env = _child_env()
+    ready, request, total, statuses = [], [], [], set()
+    for _ in range(repeat):
+        started, result, _ = _run_child(path, env)
+        ready.append(result["ready"] - started)
+        request.append(result["done"] - result["ready"])
+        total.append(result["done"] - started)
+        statuses.add(result["status"])
+
+    report = BenchmarkReport(
+        title=f"Start aplikacji i pierwsze żądanie GET {path} ({repeat} procesów)",
+        columns=["etap", "mediana ms", "max ms"],
+    )
+    for name, durations in (
+        ("start procesu i get_wsgi_application()", ready),
+        ("pierwsze żądanie (URLconf, widoki, katalog)", request),
+        ("czas do pierwszej odpowiedzi", total),
+    ):
+        stats = timing_stats(durations)
+        report.rows.append([name, f"{stats['p50_ms']:.1f}", f"{stats['max_ms']:.1f}"])
+    report.notes.append(f"Statusy odpowiedzi: {', '.join(sorted(statuses))}")
+
+    _, _, importtime_output = _run_child(path, env, importtime=True)
+    breakdown = sorted(
+        import_breakdown(importtime_output).items(), key=lambda item: item[1], reverse=True
+    )
+    report.notes.append(
+        f"Importy łącznie: {sum(us for _, us in breakdown) / 1000:.1f} ms "
+        "(czas własny, -X importtime)"
+    )
+    for name, us in breakdown[:top]:
+        report.notes.append(f"  {name}: {us / 1000:.1f} ms")
+
+    median_ms = timing_stats(total)["p50_ms"]
+    if budget_ms is not None and median_ms > budget_ms:
+        report.failures.append(
+            f"Czas do pierwszej odpowiedzi {median_ms:.1f} ms przekracza budżet {budget_ms:.1f} ms"
+        )
+
+    return report
@@ -0,0 +1,125 @@
+"""
+Dane zamówienia jako niemutowalne obiekty domenowe.
+
+Zwalidowany JSON zamówienia (OrderSerializer, SimpleOrder.order_data) jest
+zamieniany na te obiekty raz - wycena i walidacja geometryczna korzystają
+z atrybutów zamiast z zagnieżdżonych słowników. Klasy używają ``__slots__``
+(bez słownika atrybutów na instancję), a powtarzające się napisy (rozmiary,
+materiały, kolory, kody obudów) są internowane, więc duże zamówienie zajmuje
+kilkukrotnie mniej pamięci niż słowniki. Kształt JSON (kamelCase) pozostaje
+formatem zapisu w SimpleOrder.order_data.
+"""
+
+import sys
+from dataclasses import dataclass
+from typing import Any, Mapping
+
+
+def _intern(value: str) -> str:
+    return sys.intern(value)
+
+
+def _intern_optional(value: str | None) -> str | None:
+    return None if value is None else sys.intern(value)
+
+
+def size_and_quantity(item: Any) -> tuple[str, int]:
+    """
+    Zwraca (rozmiar, ilość) pozycji - obiektu GlandItem/TerminalItem lub słownika
+    w kształcie JSON (API walidatorów przyjmuje oba).
+    """
+    if isinstance(item, Mapping):
+        return item["size"], item["quantity"]
+    return item.size, item.quantity
+
+
+@dataclass(frozen=True, slots=True)
+class GlandItem:
+    size: str
+    quantity: int
+    material: str
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "GlandItem":
+        return cls(_intern(data["size"]), data["quantity"], _intern(data["material"]))
+
+
+@dataclass(frozen=True, slots=True)
+class GlandSide:
+    side: str
+    items: tuple[GlandItem, ...]
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "GlandSide":
+        return cls(
+            _intern(data["side"]), tuple(GlandItem.from_dict(item) for item in data["items"])
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class TerminalItem:
+    size: str
+    quantity: int
+    color: str | None = None
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "TerminalItem":
+        return cls(_intern(data["size"]), data["quantity"], _intern_optional(data.get("color")))
+
+
+@dataclass(frozen=True, slots=True)
+class CurrentConfig:
+    glands: tuple[GlandSide, ...] = ()
+    terminals: tuple[TerminalItem, ...] = ()
+    box_type: str = ""
+    comment: str = ""
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "CurrentConfig":
+        return cls(
+            glands=tuple(GlandSide.from_dict(side) for side in data.get("glands", [])),
+            terminals=tuple(TerminalItem.from_dict(item) for item in data.get("terminals", [])),
+            box_type=data.get("box_type", ""),
+            comment=data.get("comment", ""),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class SaveBox:
+    code: str
+    quantity: int
+    current_config: CurrentConfig
+    id: str = ""
+    name: str = ""
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "SaveBox":
+        return cls(
+            code=_intern(data["code"]),
+            quantity=data["quantity"],
+            current_config=CurrentConfig.from_dict(data["currentConfig"]),
+            id=data.get("id", ""),
+            name=_intern(data.get("name", "")),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class OrderData:
+    save_box: tuple[SaveBox, ...]
+    name: str = ""
+    email: str = ""
+    user_information: str = ""
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "OrderData":
+        """
+        Tworzy zamówienie z JSON w kształcie OrderSerializer / SimpleOrder.order_data.
+
+        Rzuca KeyError lub TypeError, jeśli dane nie mają wymaganej struktury.
+        """
+        return cls(
+            save_box=tuple(SaveBox.from_dict(box) for box in data.get("saveBox", [])),
+            name=data.get("name", ""),
+            email=data.get("email", ""),
+            user_information=data.get("userInformation", ""),
+        )
@@ -0,0 +1,91 @@
+"""
+Optymalizacja kolejności wiercenia otworów.
+
+Kolejność jest wyznaczana heurystyką najbliższego sąsiada, a następnie
+poprawiana algorytmem 2-opt, aby skrócić sumaryczną drogę ruchów szybkich (G00).
+"""
+
+from math import dist
+from typing import List, Sequence, Tuple
+
+
+Point = Tuple[float, float]
+
+MAX_TWO_OPT_PASSES = 50
+
+
+def path_length(points: Sequence[Point], order: Sequence[int], start: Point = (0.0, 0.0)) -> float:
+    """
+    Zwraca długość ścieżki od punktu startowego przez punkty w podanej kolejności.
+    """
+    length = 0.0
+    previous = start
+    for index in order:
+        length += dist(previous, points[index])
+        previous = points[index]
+
+    return length
+
+
+def nearest_neighbour_order(points: Sequence[Point], start: Point = (0.0, 0.0)) -> List[int]:
+    """
+    Wyznacza kolejność odwiedzania punktów heurystyką najbliższego sąsiada.
+    """
+    remaining = set(range(len(points)))
+    order = []
+    current = start
+
+    while remaining:
+        nearest = min(remaining, key=lambda index: dist(current, points[index]))
+        remaining.remove(nearest)
+        order.append(nearest)
+        current = points[nearest]
+
+    return order
+
+
+def two_opt(
+    points: Sequence[Point],
+    order: List[int],
+    start: Point = (0.0, 0.0),
+    max_passes: int = MAX_TWO_OPT_PASSES,
+) -> List[int]:
+    """
+    Poprawia otwartą ścieżkę (ze stałym punktem startowym) odwracając jej fragmenty.
+
+    Parametry:
+        points (Sequence[Point]): Współrzędne punktów.
+        order (List[int]): Początkowa kolejność (indeksy punktów).
+        start (Point): Punkt startowy narzędzia.
+        max_passes (int): Limit przebiegów bez względu na to, czy są jeszcze poprawy.
+    """
+    path = [start] + [points[index] for index in order]
+    order = list(order)
+    size = len(path)
+
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, size - 1):
+            for j in range(i + 1, size):
+                before = dist(path[i - 1], path[i])
+                after = dist(path[i - 1], path[j])
+                if j + 1 < size:
+                    before += dist(path[j], path[j + 1])
+                    after += dist(path[i], path[j + 1])
+
+                if after < before - 1e-9:
+                    path[i:j + 1] = reversed(path[i:j + 1])
+                    order[i - 1:j] = reversed(order[i - 1:j])
+                    improved = True
+
+        if not improved:
+            break
+
+    return order
+
+
+def optimize_drill_path(points: Sequence[Point], start: Point = (0.0, 0.0)) -> List[int]:
+    """
+    Zwraca kolejność wiercenia (indeksy punktów) minimalizującą drogę ruchów szybkich.
+    """
+    return two_opt(points, nearest_neighbour_order(points, start), start)
@@ -0,0 +1,129 @@
+"""
+Indeks obudów po wymiarach i obszarach montażowych.
+
+Dla każdego atrybutu (szerokość, wysokość, głębokość, wymiary X/Y obszarów
+montażowych) przechowywana jest posortowana tablica wartości. Zapytanie
+"wszystkie obudowy z atrybutami >= progów" wyszukuje binarnie liczbę
+kandydatów dla każdego progu, przegląda tylko najbardziej selektywny zakres,
+a pozostałe warunki sprawdza na tym zawężonym zbiorze.
+"""
+
+from bisect import bisect_left
+from typing import Any, Generic, Iterable, Mapping, Protocol, TypeVar
+
+
+class IndexedEnclosure(Protocol):
+    @property
+    def code(self) -> str: ...
+
+    @property
+    def price(self) -> Any: ...
+
+    @property
+    def dimension_width(self) -> int: ...
+
+    @property
+    def dimension_height(self) -> int: ...
+
+    @property
+    def dimension_depth(self) -> int: ...
+
+    @property
+    def mounting_areas(self) -> Mapping[str, tuple[float, float]]: ...
+
+
+EnclosureT = TypeVar("EnclosureT", bound=IndexedEnclosure)
+
+
+def enclosure_attributes(enclosure: IndexedEnclosure) -> dict[str, float]:
+    """
+    Zwraca indeksowane atrybuty obudowy (brakujące obszary montażowe są pomijane).
+    """
+    attributes: dict[str, float] = {
+        "width": enclosure.dimension_width,
+        "height": enclosure.dimension_height,
+        "depth": enclosure.dimension_depth,
+    }
+    for side, (x, y) in enclosure.mounting_areas.items():
+        attributes[f"{side}_x"] = x
+        attributes[f"{side}_y"] = y
+
+    return attributes
+
+
+class EnclosureIndex(Generic[EnclosureT]):
+    """
+    Niemutowalny indeks obudów zbudowany z posortowanych tablic.
+
+    Wyniki zapytań są zwracane w kolejności rosnącej ceny.
+    """
+
+    def __init__(self, enclosures: Iterable[EnclosureT]):
+        self._enclosures: list[EnclosureT] = sorted(
+            enclosures, key=lambda enclosure: (enclosure.price, enclosure.code)
+        )
+        self._attributes = [enclosure_attributes(enclosure) for enclosure in self._enclosures]
+
+        self._values: dict[str, list[float]] = {}
+        self._positions: dict[str, list[int]] = {}
+        columns: dict[str, list[tuple[float, int]]] = {}
+        for position, attributes in enumerate(self._attributes):
+            for name, value in attributes.items():
+                columns.setdefault(name, []).append((value, position))
+
+        for name, column in columns.items():
+            column.sort()
+            self._values[name] = [value for value, _ in column]
+            self._positions[name] = [position for _, position in column]
+
+    def __len__(self) -> int:
+        return len(self._enclosures)
+
+    def query(
+        self,
+        min_width: float | None = None,
+        min_height: float | None = None,
+        min_depth: float | None = None,
+        mounting_areas: Mapping[str, tuple[float, float]] | None = None,
+    ) -> list[EnclosureT]:
+        """
+        Zwraca obudowy spełniające wszystkie minimalne wymiary, od najtańszej.
+
+        Parametry:
+            min_width, min_height, min_depth: Minimalne wymiary obudowy (mm).
+            mounting_areas: Minimalne wymiary (X, Y) obszarów montażowych według ścianki,
+                np. {"top": (120, 80)} - "obszar górny co najmniej 120x80 mm".
+        """
+        constraints = {
+            name: value
+            for name, value in (("width", min_width), ("height", min_height), ("depth", min_depth))
+            if value is not None
+        }
+        for side, (min_x, min_y) in (mounting_areas or {}).items():
+            constraints[f"{side}_x"] = min_x
+            constraints[f"{side}_y"] = min_y
+
+        if not constraints:
+            return list(self._enclosures)
+
+        starts = {}
+        for name, minimum in constraints.items():
+            values = self._values.get(name)
+            if values is None:
+                return []
+            starts[name] = bisect_left(values, minimum)
+
+        # Najbardziej selektywny warunek (najmniej pasujących obudów) wyznacza zakres kandydatów.
+        pivot = min(starts, key=lambda name: len(self._values[name]) - starts[name])
+        others = [(name, minimum) for name, minimum in constraints.items() if name != pivot]
+
+        positions = sorted(
+            position
+            for position in self._positions[pivot][starts[pivot]:]
+            if all(
+                self._attributes[position].get(name, float("-inf")) >= minimum
+                for name, minimum in others
+            )
+        )
+
+        return [self._enclosures[position] for position in positions]
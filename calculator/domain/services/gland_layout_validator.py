@@ -0,0 +1,415 @@
+import math
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Iterable, List, Mapping, Tuple
+
+from calculator.domain.order import size_and_quantity
+from calculator.domain.services.spatial_hash import SpatialHash
+
+
+@dataclass
+class MountingArea:
+    width: float  # mm
+    height: float  # mm
+    side: str
+
+
+@dataclass(frozen=True)
+class GlandPosition:
+    """
+    Pozycja otworu dławika w obszarze montażowym.
+
+    Atrybuty:
+        size: Rozmiar dławika, np. "M20".
+        x: Współrzędna X środka otworu (mm, od lewej krawędzi obszaru).
+        y: Współrzędna Y środka otworu (mm, od dolnej krawędzi obszaru).
+        diameter: Fizyczna średnica dławika (mm) - decyduje o odstępach.
+        hole_diameter: Średnica otworu do wywiercenia (mm) - średnica nominalna gwintu.
+    """
+    size: str
+    x: float
+    y: float
+    diameter: float
+    hole_diameter: float
+
+
+@dataclass(frozen=True)
+class GlandLayout:
+    """
+    Wynik rozmieszczenia dławików na jednej ściance.
+    """
+    side: str
+    is_valid: bool
+    message: str
+    positions: List[GlandPosition] = field(default_factory=list)
+    required_height: float = 0.0
+    algorithm: str = "ffd"
+
+
+@dataclass
+class _Row:
+    top: float
+    height: float
+    cursor: float
+    glands: List[Tuple[str, float, float]] = field(default_factory=list)
+
+
+class _SearchBudgetExceeded(Exception):
+    pass
+
+
+class GlandLayoutValidator:
+    """
+    Walidator rozmieszczenia dławików w obszarze montażowym.
+
+    Parametry:
+    - MIN_SPACING = 8mm (odstęp między dławikami)
+    - EDGE_MARGIN = 15mm (margines od krawędzi)
+
+    Algorytm First Fit Decreasing:
+    1. Posortuj dławiki od największego do najmniejszego
+    2. Rozmieść w rzędach (od lewej do prawej)
+    3. Sprawdź czy wszystko mieści się w wysokości
+
+    Tryb "optimal": gdy FFD odrzuca układ, przydział dławików do rzędów jest
+    przeszukiwany metodą podziału i ograniczeń (branch and bound) z limitem czasu
+    na ściankę. Po przekroczeniu limitu zwracany jest wynik FFD. Pole
+    GlandLayout.algorithm wskazuje, który algorytm dał wynik:
+    "ffd", "branch_and_bound" lub "ffd_timeout" (przeszukiwanie przerwane).
+
+    Tryb "staggered": gdy FFD odrzuca układ, dławiki są układane w przesuniętych
+    rzędach (co drugi rząd o pół podziałki) i "opuszczane" w dół do pierwszej
+    kolizji, dzięki czemu kolejne rzędy wchodzą w przerwy między otworami
+    (układ heksagonalny dla równych średnic). Kolizje są sprawdzane w siatce
+    SpatialHash, więc koszt ułożenia rośnie praktycznie liniowo z liczbą otworów.
+    """
+
+    MIN_SPACING = 8
+    EDGE_MARGIN = 15
+
+    MODE_FFD = "ffd"
+    MODE_OPTIMAL = "optimal"
+    MODE_STAGGERED = "staggered"
+    MODES = (MODE_FFD, MODE_OPTIMAL, MODE_STAGGERED)
+
+    ALGORITHM_FFD = "ffd"
+    ALGORITHM_BRANCH_AND_BOUND = "branch_and_bound"
+    ALGORITHM_FFD_TIMEOUT = "ffd_timeout"
+    ALGORITHM_STAGGERED = "staggered"
+
+    DEFAULT_TIME_BUDGET = 0.05  # s na ściankę
+    MAX_SEARCH_HOLES = 400  # głębokość rekurencji przeszukiwania
+
+    def __init__(self, mode: str = MODE_FFD, time_budget: float = DEFAULT_TIME_BUDGET):
+        if mode not in self.MODES:
+            raise ValueError(f"Nieznany tryb rozmieszczenia dławików: {mode}")
+
+        self.mode = mode
+        self.time_budget = time_budget
+
+    def validate_gland_layout(
+        self,
+        glands: List[dict],  # [{"size": "M20", "quantity": 3}, ...]
+        mounting_area: MountingArea,
+        glands_data: dict  # {"M20": {"physical_diameter_mm": 25}}
+    ) -> Tuple[bool, str]:
+        """
+        Sprawdza, czy dławiki zmieszczą się w obszarze montażowym.
+
+        Returns:
+            (is_valid, error_message)
+        """
+        layout = self.compute_layout(glands, mounting_area, glands_data)
+        return layout.is_valid, layout.message
+
+    def compute_layout(
+        self,
+        glands: Iterable[Any],
+        mounting_area: MountingArea,
+        glands_data: Mapping[str, Mapping],
+    ) -> GlandLayout:
+        """
+        Rozmieszcza dławiki w rzędach algorytmem First Fit Decreasing
+        (w trybach "optimal" i "staggered" z alternatywnym układem, gdy FFD odrzuca układ).
+
+        Parametry:
+            glands (Iterable): Dławiki z ilościami - GlandItem lub [{"size": "M20", "quantity": 3}].
+            mounting_area (MountingArea): Obszar montażowy ścianki.
+            glands_data (Mapping): Wymiary dławików według rozmiaru.
+        """
+        try:
+            holes = self._expand_glands(glands, glands_data)
+        except KeyError as e:
+            return GlandLayout(
+                mounting_area.side, False, f"Nieznany rozmiar dławika: {e.args[0]}"
+            )
+
+        usable_width = mounting_area.width - 2 * self.EDGE_MARGIN
+        usable_height = mounting_area.height - 2 * self.EDGE_MARGIN
+
+        for size, diameter, _hole_diameter in holes:
+            if diameter > usable_width or diameter > usable_height:
+                return GlandLayout(
+                    mounting_area.side, False,
+                    f"Dławik {size} ({diameter} mm) jest większy niż obszar montażowy "
+                    f"ścianki {mounting_area.side}"
+                )
+
+        layout = self._build_layout(
+            mounting_area, self._first_fit_rows(holes, usable_width), usable_height
+        )
+        if layout.is_valid or self.mode == self.MODE_FFD:
+            return layout
+
+        if self.mode == self.MODE_STAGGERED:
+            return self._staggered_layout(mounting_area, holes, usable_width, usable_height)
+
+        try:
+            rows = self._branch_and_bound_rows(holes, usable_width, usable_height)
+        except _SearchBudgetExceeded:
+            return replace(layout, algorithm=self.ALGORITHM_FFD_TIMEOUT)
+
+        if rows is None:
+            # Przeszukiwanie wykazało, że żaden układ w rzędach się nie mieści.
+            return replace(layout, algorithm=self.ALGORITHM_BRANCH_AND_BOUND)
+
+        return replace(
+            self._build_layout(mounting_area, rows, usable_height),
+            algorithm=self.ALGORITHM_BRANCH_AND_BOUND,
+        )
+
+    def _first_fit_rows(
+        self, holes: List[Tuple[str, float, float]], usable_width: float
+    ) -> List[_Row]:
+        """
+        Przydziela otwory do rzędów algorytmem First Fit Decreasing.
+        """
+        rows: List[_Row] = []
+        for size, diameter, hole_diameter in holes:
+            row = next((row for row in rows if row.cursor + diameter <= usable_width), None)
+            if row is None:
+                top = rows[-1].top + rows[-1].height + self.MIN_SPACING if rows else 0.0
+                row = _Row(top=top, height=diameter, cursor=0.0)
+                rows.append(row)
+
+            row.glands.append((size, diameter, hole_diameter))
+            row.cursor += diameter + self.MIN_SPACING
+
+        return rows
+
+    def _branch_and_bound_rows(
+        self, holes: List[Tuple[str, float, float]], usable_width: float, usable_height: float
+    ) -> List[_Row] | None:
+        """
+        Szuka przydziału otworów do rzędów mieszczącego się w wysokości obszaru.
+
+        Otwory są posortowane malejąco, więc wysokość rzędu wyznacza pierwszy otwór,
+        a dalsze decyzje zależą tylko od wolnych szerokości rzędów i zajętej wysokości.
+        Gałęzie są odcinane, gdy dolne ograniczenie wysokości przekracza dostępną,
+        a stany (wolne szerokości, zajęta wysokość), które już zawiodły, nie są
+        przeszukiwane ponownie.
+
+        Zwraca None, jeśli taki przydział nie istnieje; rzuca _SearchBudgetExceeded
+        po przekroczeniu limitu czasu.
+        """
+        if len(holes) > self.MAX_SEARCH_HOLES:
+            raise _SearchBudgetExceeded()
+
+        spacing = self.MIN_SPACING
+        # Rząd z otworami d1..dk zajmuje sum(d) + spacing * (k - 1) <= usable_width,
+        # czyli sum(d + spacing) <= usable_width + spacing (analogicznie dla wysokości).
+        row_capacity = usable_width + spacing
+        height_capacity = usable_height + spacing
+        widths = [diameter + spacing for _, diameter, _ in holes]
+        remaining_width = [0.0] * (len(holes) + 1)
+        for index in range(len(holes) - 1, -1, -1):
+            remaining_width[index] = remaining_width[index + 1] + widths[index]
+        min_row_height = holes[-1][1] + spacing
+
+        deadline = time.perf_counter() + self.time_budget
+        free: List[float] = []
+        heights: List[float] = []
+        assignment = [0] * len(holes)
+        failed: dict[tuple, float] = {}
+        nodes = 0
+
+        def search(index: int, used_height: float) -> bool:
+            nonlocal nodes
+            if index == len(holes):
+                return True
+
+            nodes += 1
+            if nodes % 64 == 0 and time.perf_counter() > deadline:
+                raise _SearchBudgetExceeded()
+
+            state = (index, tuple(sorted(free)))
+            if failed.get(state, float("inf")) <= used_height:
+                return False
+
+            overflow = remaining_width[index] - sum(free)
+            if overflow > 0:
+                new_rows = -(-overflow // row_capacity)
+                if used_height + new_rows * min_row_height > height_capacity:
+                    failed[state] = used_height
+                    return False
+
+            width = widths[index]
+            tried = set()
+            # Najpierw rzędy z najmniejszym wolnym miejscem (best fit).
+            for row in sorted(range(len(free)), key=free.__getitem__):
+                if free[row] < width or free[row] in tried:
+                    continue
+                tried.add(free[row])
+
+                free[row] -= width
+                assignment[index] = row
+                if search(index + 1, used_height):
+                    return True
+                free[row] += width
+
+            row_height = holes[index][1] + spacing
+            if used_height + row_height <= height_capacity:
+                free.append(row_capacity - width)
+                heights.append(holes[index][1])
+                assignment[index] = len(free) - 1
+                if search(index + 1, used_height + row_height):
+                    return True
+                free.pop()
+                heights.pop()
+
+            failed[state] = used_height
+            return False
+
+        if not search(0, 0.0):
+            return None
+
+        rows: List[_Row] = []
+        top = 0.0
+        for height in heights:
+            rows.append(_Row(top=top, height=height, cursor=0.0))
+            top += height + spacing
+        for hole, row in zip(holes, assignment):
+            rows[row].glands.append(hole)
+            rows[row].cursor += hole[1] + spacing
+
+        return rows
+
+    def _expand_glands(
+        self, glands: Iterable[Any], glands_data: Mapping[str, Mapping]
+    ) -> List[Tuple[str, float, float]]:
+        """
+        Rozwija ilości dławików do listy otworów posortowanej malejąco po średnicy.
+        """
+        holes = []
+        for gland in glands:
+            size, quantity = size_and_quantity(gland)
+            data = glands_data[size]
+            diameter = float(data["physical_diameter_mm"])
+            hole_diameter = float(data.get("diameter_mm", diameter))
+            holes.extend([(size, diameter, hole_diameter)] * quantity)
+
+        holes.sort(key=lambda hole: hole[1], reverse=True)
+        return holes
+
+    def _staggered_layout(
+        self,
+        mounting_area: MountingArea,
+        holes: List[Tuple[str, float, float]],
+        usable_width: float,
+        usable_height: float,
+    ) -> GlandLayout:
+        """
+        Układa otwory w przesuniętych rzędach, opuszczając każdy do pierwszej kolizji.
+
+        Środek otworu o promieniu r jest opuszczany do najniższego y, przy którym
+        odległość od każdego ułożonego otworu o promieniu rn wynosi co najmniej
+        r + rn + MIN_SPACING. Pasy siatki są przeglądane od góry i przegląd kończy
+        się, gdy niższe otwory nie mogą już podnieść wyniku.
+        """
+        spacing = self.MIN_SPACING
+        grid = SpatialHash(cell_size=holes[0][1] + spacing if holes else 1.0)
+        positions = []
+        cursor = None
+        row_pitch = 0.0
+        offset_row = False
+        required_height = 0.0
+
+        for size, diameter, hole_diameter in holes:
+            radius = diameter / 2
+            if cursor is None or cursor + diameter > usable_width:
+                if cursor is not None:
+                    offset_row = not offset_row
+                cursor = row_pitch / 2 if offset_row else 0.0
+                if cursor + diameter > usable_width:
+                    cursor = 0.0
+                row_pitch = diameter + spacing
+
+            x = cursor + radius
+            y = radius
+            reach = radius + spacing + grid.max_radius
+            for band_bottom, circles in grid.bands_from_top(x - reach, x + reach):
+                if band_bottom + grid.cell_size + reach <= y:
+                    break
+                for other_x, other_y, other_radius in circles:
+                    distance = radius + other_radius + spacing
+                    dx = abs(x - other_x)
+                    if dx < distance:
+                        y = max(y, other_y + math.sqrt(distance * distance - dx * dx))
+
+            grid.insert(x, y, radius)
+            positions.append(GlandPosition(
+                size=size,
+                x=round(self.EDGE_MARGIN + x, 3),
+                y=round(self.EDGE_MARGIN + y, 3),
+                diameter=diameter,
+                hole_diameter=hole_diameter,
+            ))
+            required_height = max(required_height, y + radius)
+            cursor += diameter + spacing
+
+        if required_height > usable_height:
+            return GlandLayout(
+                mounting_area.side, False,
+                f"Dławiki nie mieszczą się na ściance {mounting_area.side}: "
+                f"wymagana wysokość {required_height:.1f} mm, dostępna {usable_height:.1f} mm",
+                required_height=required_height,
+                algorithm=self.ALGORITHM_STAGGERED,
+            )
+
+        return GlandLayout(
+            mounting_area.side, True, "OK", positions,
+            required_height=required_height, algorithm=self.ALGORITHM_STAGGERED,
+        )
+
+    def _build_layout(
+        self, mounting_area: MountingArea, rows: List[_Row], usable_height: float
+    ) -> GlandLayout:
+        """
+        Wylicza współrzędne środków otworów i sprawdza wysokość zajętą przez rzędy.
+        """
+        required_height = rows[-1].top + rows[-1].height if rows else 0.0
+        if required_height > usable_height:
+            return GlandLayout(
+                mounting_area.side, False,
+                f"Dławiki nie mieszczą się na ściance {mounting_area.side}: "
+                f"wymagana wysokość {required_height:.1f} mm, dostępna {usable_height:.1f} mm",
+                required_height=required_height,
+            )
+
+        positions = []
+        for row in rows:
+            x = float(self.EDGE_MARGIN)
+            center_y = self.EDGE_MARGIN + row.top + row.height / 2
+            for size, diameter, hole_diameter in row.glands:
+                positions.append(GlandPosition(
+                    size=size,
+                    x=round(x + diameter / 2, 3),
+                    y=round(center_y, 3),
+                    diameter=diameter,
+                    hole_diameter=hole_diameter,
+                ))
+                x += diameter + self.MIN_SPACING
+
+        return GlandLayout(
+            mounting_area.side, True, "OK", positions, required_height=required_height
+        )
@@ -0,0 +1,86 @@
+"""
+Dobór dławików do średnic kabli.
+
+Każdy dławik obsługuje przedział średnic kabla [cable_range_min, cable_range_max].
+Dla listy kabli wybierany jest najtańszy dławik, którego przedział zawiera
+średnicę kabla. Zapytania są rozwiązywane jednym przebiegiem (sweep) po
+posortowanych kablach i początkach przedziałów, z kopcem aktywnych przedziałów
+uporządkowanym po cenie - O((n + m) log m) dla n kabli i m dławików.
+"""
+
+import heapq
+from typing import Any, Generic, Iterable, Protocol, Sequence, TypeVar
+
+
+class SelectableGland(Protocol):
+    @property
+    def material(self) -> str: ...
+
+    @property
+    def price(self) -> Any: ...
+
+    @property
+    def physical_diameter_mm(self) -> int: ...
+
+    @property
+    def cable_range_min(self) -> float: ...
+
+    @property
+    def cable_range_max(self) -> float: ...
+
+    @property
+    def catalog_number(self) -> str: ...
+
+
+GlandT = TypeVar("GlandT", bound=SelectableGland)
+
+
+class GlandSelector(Generic[GlandT]):
+    """
+    Niemutowalny indeks przedziałów średnic kabli dla listy dławików.
+    """
+
+    def __init__(self, glands: Iterable[GlandT]):
+        self._glands: list[GlandT] = sorted(glands, key=lambda gland: gland.cable_range_min)
+
+    def __len__(self) -> int:
+        return len(self._glands)
+
+    def select(self, cable_diameters: Sequence[float]) -> list[GlandT | None]:
+        """
+        Zwraca najtańszy pasujący dławik dla każdej średnicy kabla (None, gdy brak).
+
+        Przy równej cenie wybierany jest dławik o mniejszej średnicy fizycznej.
+
+        Parametry:
+            cable_diameters (Sequence[float]): Zewnętrzne średnice kabli w mm.
+        """
+        results: list[GlandT | None] = [None] * len(cable_diameters)
+        order = sorted(range(len(cable_diameters)), key=lambda index: cable_diameters[index])
+
+        active: list[tuple[Any, int, str, int]] = []
+        next_gland = 0
+
+        for index in order:
+            diameter = cable_diameters[index]
+
+            while (
+                next_gland < len(self._glands)
+                and self._glands[next_gland].cable_range_min <= diameter
+            ):
+                gland = self._glands[next_gland]
+                heapq.heappush(
+                    active,
+                    (gland.price, gland.physical_diameter_mm, gland.catalog_number, next_gland),
+                )
+                next_gland += 1
+
+            # Kable są posortowane rosnąco, więc przedział kończący się przed
+            # bieżącym kablem nie pasuje też do żadnego kolejnego.
+            while active and self._glands[active[0][3]].cable_range_max < diameter:
+                heapq.heappop(active)
+
+            if active:
+                results[index] = self._glands[active[0][3]]
+
+        return results
@@ -0,0 +1,47 @@
+"""
+Równomierna siatka (spatial hash) dla kół w obszarze montażowym.
+
+Koło trafia do komórki zawierającej jego środek. Przy rozmiarze komórki nie
+mniejszym niż największa średnica z odstępem, sprawdzenie kolizji dotyczy tylko
+kolumn komórek w zasięgu koła - stała liczba porównań na pas komórek.
+"""
+
+import math
+from typing import Iterator, List, Tuple
+
+
+Circle = Tuple[float, float, float]  # (x, y, promień)
+
+
+class SpatialHash:
+    def __init__(self, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError("Rozmiar komórki musi być dodatni")
+
+        self.cell_size = cell_size
+        self.max_radius = 0.0
+        self._cells: dict[tuple[int, int], List[Circle]] = {}
+        self._top_row = -1
+
+    def _cell(self, value: float) -> int:
+        return math.floor(value / self.cell_size)
+
+    def insert(self, x: float, y: float, radius: float) -> None:
+        row = self._cell(y)
+        self._cells.setdefault((self._cell(x), row), []).append((x, y, radius))
+        self.max_radius = max(self.max_radius, radius)
+        self._top_row = max(self._top_row, row)
+
+    def bands_from_top(self, x_min: float, x_max: float) -> Iterator[Tuple[float, List[Circle]]]:
+        """
+        Zwraca pasy komórek w zakresie [x_min, x_max] od najwyższego do najniższego.
+
+        Każdy element to (dolna krawędź pasa, koła ze środkiem w pasie); wywołujący
+        może przerwać iterację, gdy niższe pasy nie mają już znaczenia.
+        """
+        columns = range(self._cell(x_min), self._cell(x_max) + 1)
+        for row in range(self._top_row, -1, -1):
+            circles = [
+                circle for column in columns for circle in self._cells.get((column, row), ())
+            ]
+            yield row * self.cell_size, circles
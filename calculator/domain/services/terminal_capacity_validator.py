@@ -0,0 +1,44 @@
+from typing import Any, Iterable, Mapping, Tuple
+
+from calculator.domain.order import size_and_quantity
+
+
+def count_terminals_by_size(terminals: Iterable[Any]) -> dict[str, int]:
+    """
+    Sumuje ilości terminali (TerminalItem lub słowniki) według przekroju (niezależnie od koloru).
+    """
+    required: dict[str, int] = {}
+    for terminal in terminals:
+        size, quantity = size_and_quantity(terminal)
+        required[size] = required.get(size, 0) + quantity
+
+    return required
+
+
+def validate_terminal_capacity(
+    terminals: Iterable[Any],  # TerminalItem lub [{"size": "2,5mm", "quantity": 8}]
+    enclosure_capacity: Mapping[str, int] | None  # {"2,5mm": 9, "4mm": 8}
+) -> Tuple[bool, str, dict]:
+    """
+    Sprawdza czy terminale zmieszczą się w skrzynce.
+
+    Returns:
+        (is_valid, message, details)
+    """
+    details = {}
+    errors = []
+
+    for size, required in count_terminals_by_size(terminals).items():
+        capacity = (enclosure_capacity or {}).get(size, 0)
+        details[size] = {
+            "required": required,
+            "capacity": capacity,
+            "fits": required <= capacity,
+        }
+        if required > capacity:
+            errors.append(f"terminale {size}: wymagane {required}, pojemność {capacity}")
+
+    if errors:
+        return False, "Terminale nie mieszczą się w obudowie: " + ", ".join(errors), details
+
+    return True, "OK", details
@@ -0,0 +1,140 @@
+"""
+Dobór terminali do wymagań obwodów (prąd, napięcie, kolor).
+
+Dla każdego koloru i każdego progu napięcia z katalogu przechowywana jest
+tablica terminali o napięciu >= progu posortowana po prądzie, wraz z tablicą
+"najlepszego terminala w sufiksie" dla każdej strategii. Zapytanie to dwa
+wyszukiwania binarne (próg napięcia, prąd) i jeden odczyt z tablicy sufiksów.
+"""
+
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Iterable, Protocol, Sequence, TypeVar
+
+
+class SelectableTerminal(Protocol):
+    @property
+    def wire_cross_section(self) -> str: ...
+
+    @property
+    def color(self) -> str: ...
+
+    @property
+    def price(self) -> Any: ...
+
+    @property
+    def width_mm(self) -> float: ...
+
+    @property
+    def voltage(self) -> int: ...
+
+    @property
+    def current(self) -> float: ...
+
+    @property
+    def catalog_number(self) -> str: ...
+
+
+TerminalT = TypeVar("TerminalT", bound=SelectableTerminal)
+
+STRATEGY_KEYS: dict[str, Callable[[SelectableTerminal], tuple]] = {
+    "cheapest": lambda terminal: (terminal.price, terminal.width_mm, terminal.catalog_number),
+    "narrowest": lambda terminal: (terminal.width_mm, terminal.price, terminal.catalog_number),
+}
+
+
+@dataclass(frozen=True)
+class CircuitRequirement:
+    current: float
+    voltage: float = 0
+    color: str | None = None
+
+
+@dataclass
+class _VoltageLevel(Generic[TerminalT]):
+    terminals: list[TerminalT]
+    currents: list[float]
+    best_suffix: dict[str, list[int]]
+
+
+class TerminalSelector(Generic[TerminalT]):
+    """
+    Niemutowalny indeks terminali według koloru, napięcia i prądu.
+    """
+
+    def __init__(self, terminals: Iterable[TerminalT]):
+        by_color: dict[str | None, list[TerminalT]] = {None: []}
+        for terminal in terminals:
+            by_color[None].append(terminal)
+            by_color.setdefault(terminal.color, []).append(terminal)
+
+        self._levels: dict[str | None, tuple[list[float], list[_VoltageLevel]]] = {
+            color: self._build_levels(color_terminals)
+            for color, color_terminals in by_color.items()
+        }
+
+    @staticmethod
+    def _build_levels(terminals: list[TerminalT]) -> tuple[list[float], list[_VoltageLevel]]:
+        voltages: list[float] = sorted({terminal.voltage for terminal in terminals})
+        levels = []
+
+        for voltage in voltages:
+            eligible = sorted(
+                (terminal for terminal in terminals if terminal.voltage >= voltage),
+                key=lambda terminal: terminal.current,
+            )
+            best_suffix = {}
+            for strategy, key in STRATEGY_KEYS.items():
+                best = [0] * len(eligible)
+                for index in range(len(eligible) - 1, -1, -1):
+                    is_last = index == len(eligible) - 1
+                    if is_last or key(eligible[index]) < key(eligible[best[index + 1]]):
+                        best[index] = index
+                    else:
+                        best[index] = best[index + 1]
+                best_suffix[strategy] = best
+
+            levels.append(_VoltageLevel(
+                terminals=eligible,
+                currents=[terminal.current for terminal in eligible],
+                best_suffix=best_suffix,
+            ))
+
+        return voltages, levels
+
+    def select(
+        self, requirement: CircuitRequirement, strategy: str = "cheapest"
+    ) -> TerminalT | None:
+        """
+        Zwraca terminal spełniający wymagania obwodu (None, gdy żaden nie spełnia).
+
+        Parametry:
+            requirement (CircuitRequirement): Minimalny prąd i napięcie oraz kolor (opcjonalnie).
+            strategy (str): "cheapest" (najtańszy) lub "narrowest" (najwęższy na szynie).
+        """
+        if strategy not in STRATEGY_KEYS:
+            raise ValueError(f"Nieznana strategia doboru terminala: {strategy}")
+
+        color_levels = self._levels.get(requirement.color)
+        if color_levels is None:
+            return None
+
+        voltages, levels = color_levels
+        level_index = bisect_left(voltages, requirement.voltage)
+        if level_index == len(levels):
+            return None
+
+        level = levels[level_index]
+        start = bisect_left(level.currents, requirement.current)
+        if start == len(level.terminals):
+            return None
+
+        return level.terminals[level.best_suffix[strategy][start]]
+
+    def select_many(
+        self, requirements: Sequence[CircuitRequirement], strategy: str = "cheapest"
+    ) -> list[TerminalT | None]:
+        """
+        Dobiera terminale dla listy obwodów.
+        """
+        return [self.select(requirement, strategy) for requirement in requirements]
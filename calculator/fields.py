@@ -0,0 +1,147 @@
+"""
+Pole modelu z JSON kompresowanym w bazie danych.
+
+CompressedJSONField zachowuje się w kodzie modeli jak JSONField (wartość
+to obiekt Pythona), ale zapisuje JSON jako BLOB: wartości od
+THRESHOLD_BYTES bajtów są kompresowane (zstd lub zlib) i poprzedzone
+jednobajtowym znacznikiem algorytmu, mniejsze są zapisywane jako zwykły
+JSON. Odczyt rozpoznaje też wiersze zapisane wcześniej przez JSONField
+(tekst JSON), więc zmiana pola nie wymaga przepisania danych od razu -
+robi to komenda compress_order_json. Pole nie obsługuje zapytań po
+kluczach JSON (order_data__...).
+
+zstd wymaga Pythona 3.14 (compression.zstd) lub pakietu ``zstandard``;
+bez nich używany jest zlib.
+"""
+
+import json
+import zlib
+from typing import Any
+
+from django import forms
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+
+try:
+    from compression import zstd as _zstd  # type: ignore[import-not-found]
+
+    def _zstd_compress(data: bytes, level: int) -> bytes:
+        return _zstd.compress(data, level=level)
+
+    _zstd_decompress = _zstd.decompress
+except ImportError:
+    try:
+        import zstandard as _zstd  # type: ignore[import-not-found]
+
+        def _zstd_compress(data: bytes, level: int) -> bytes:
+            return _zstd.ZstdCompressor(level=level).compress(data)
+
+        def _zstd_decompress(data: bytes) -> bytes:
+            return _zstd.ZstdDecompressor().decompress(data)
+    except ImportError:  # pragma: no cover - zależność opcjonalna
+        _zstd = None
+
+
+ZLIB_MARKER = b"\x01"
+ZSTD_MARKER = b"\x02"
+
+DEFAULT_COMPRESSED_JSON_SETTINGS = {
+    "ENABLED": True,
+    "ALGORITHM": "zstd",
+    "THRESHOLD_BYTES": 1024,
+    "LEVEL": 6,
+}
+
+
+def get_compressed_json_settings() -> dict[str, Any]:
+    """
+    Zwraca ustawienia kompresji pól JSON uzupełnione o wartości domyślne.
+    """
+    return {
+        **DEFAULT_COMPRESSED_JSON_SETTINGS,
+        **getattr(settings, "CALCULATOR_COMPRESSED_JSON", {}),
+    }
+
+
+def compress_json(data: bytes) -> bytes:
+    """
+    Kompresuje zakodowany JSON zgodnie z ustawieniami (lub zwraca go bez zmian).
+    """
+    compression = get_compressed_json_settings()
+    if not compression["ENABLED"] or len(data) < compression["THRESHOLD_BYTES"]:
+        return data
+
+    if compression["ALGORITHM"] == "zstd" and _zstd is not None:
+        return ZSTD_MARKER + _zstd_compress(data, compression["LEVEL"])
+    return ZLIB_MARKER + zlib.compress(data, compression["LEVEL"])
+
+
+def decompress_json(data: bytes) -> bytes:
+    """
+    Zwraca JSON z wartości zapisanej przez compress_json.
+    """
+    marker = data[:1]
+    if marker == ZLIB_MARKER:
+        return zlib.decompress(data[1:])
+    if marker == ZSTD_MARKER:
+        if _zstd is None:
+            raise ImproperlyConfigured(
+                "Value is compressed with zstd - install 'zstandard' or use Python 3.14+"
+            )
+        return _zstd_decompress(data[1:])
+    return data
+
+
+class CompressedJSONField(models.Field):
+    """
+    JSONField zapisywany jako (opcjonalnie skompresowany) BLOB.
+    """
+    description = "Compressed JSON"
+    empty_strings_allowed = False
+
+    def __init__(self, *args, encoder=None, decoder=None, **kwargs):
+        self.encoder = encoder
+        self.decoder = decoder
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.encoder is not None:
+            kwargs["encoder"] = self.encoder
+        if self.decoder is not None:
+            kwargs["decoder"] = self.decoder
+        return name, path, args, kwargs
+
+    def get_internal_type(self):
+        return "BinaryField"
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            # Wiersz zapisany przez JSONField przed zmianą pola.
+            return json.loads(value, cls=self.decoder)
+        return json.loads(decompress_json(bytes(value)), cls=self.decoder)
+
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+        data = json.dumps(value, cls=self.encoder, ensure_ascii=False, separators=(",", ":"))
+        return compress_json(data.encode())
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if not prepared:
+            value = self.get_prep_value(value)
+        return connection.Database.Binary(value) if value is not None else None
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
+
+    def formfield(self, **kwargs):
+        return super().formfield(**{
+            "form_class": forms.JSONField,
+            "encoder": self.encoder,
+            "decoder": self.decoder,
+            **kwargs,
+        })
@@ -0,0 +1,305 @@
+"""
+Widoki API katalogu produktów (dobór obudów, dławików i terminali).
+"""
+
+import logging
+
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from .order_serializers import (
+    EnclosureRecommendationSerializer,
+    EnclosureSearchSerializer,
+    GlandSelectionSerializer,
+    TerminalSelectionSerializer,
+)
+from calculator.domain.order import CurrentConfig
+from calculator.domain.services.terminal_capacity_validator import validate_terminal_capacity
+from calculator.domain.services.terminal_selector import CircuitRequirement
+from calculator.infrastructure.profiling import profile_request
+from calculator.services.catalog_snapshot import get_catalog_snapshot
+from calculator.services.product_selection import (
+    select_glands_for_cables,
+    select_terminals_for_circuits,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+@api_view(['POST'])
+@profile_request
+def recommend_enclosure(request):
+    """
+    Zwraca najtańsze obudowy, w których zmieści się podana konfiguracja.
+
+    Endpoint: POST /api/recruitment/enclosures/recommend/
+
+    Request body: {"currentConfig": {"glands": [...], "terminals": [...]}, "limit": 3}
+
+    Returns:
+        200: Lista rekomendowanych obudów (od najtańszej) z rozmieszczeniem dławików
+        400: Błąd walidacji danych
+    """
+    serializer = EnclosureRecommendationSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            {
+                "success": False,
+                "errors": serializer.errors,
+                "message": "Dane wejściowe są niepoprawne"
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Rekomendacja korzysta z walidacji geometrycznej - import przy pierwszym użyciu.
+    from calculator.services.enclosure_recommendation import recommend_enclosures
+
+    catalog = get_catalog_snapshot()
+    try:
+        result = recommend_enclosures(
+            CurrentConfig.from_dict(serializer.validated_data['currentConfig']),
+            catalog,
+            serializer.validated_data['limit'],
+        )
+    except KeyError as e:
+        return Response(
+            {
+                "success": False,
+                "error": f"Nieznany rozmiar dławika: {e.args[0]}",
+                "message": "Dane wejściowe są niepoprawne"
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response({
+        "success": True,
+        "recommendations": [
+            {
+                "code": geometry.code,
+                "name": catalog.enclosures[geometry.code].name,
+                "price": str(catalog.enclosures[geometry.code].price),
+                "sides": {
+                    layout.side: [
+                        {"size": position.size, "x": position.x, "y": position.y}
+                        for position in layout.positions
+                    ]
+                    for layout in geometry.layouts
+                },
+                "terminals": geometry.terminal_details,
+            }
+            for geometry in result.recommendations
+        ],
+        "stats": {
+            "candidates": result.candidates,
+            "pruned": result.pruned,
+            "laid_out": result.laid_out,
+        },
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@profile_request
+def search_enclosures(request):
+    """
+    Wyszukuje obudowy o wymiarach nie mniejszych niż podane.
+
+    Endpoint: GET /api/recruitment/enclosures/
+
+    Parametry zapytania (opcjonalne): min_width, min_height, min_depth oraz minimalne
+    wymiary obszarów montażowych {top,down,left,right}_{x,y}, np. top_x=120&top_y=80.
+
+    Returns:
+        200: Lista obudów od najtańszej
+        400: Błąd walidacji parametrów
+    """
+    serializer = EnclosureSearchSerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(
+            {
+                "success": False,
+                "errors": serializer.errors,
+                "message": "Dane wejściowe są niepoprawne"
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    enclosures = get_catalog_snapshot().enclosure_index.query(
+        min_width=serializer.validated_data.get('min_width'),
+        min_height=serializer.validated_data.get('min_height'),
+        min_depth=serializer.validated_data.get('min_depth'),
+        mounting_areas=serializer.get_mounting_areas(),
+    )
+
+    return Response({
+        "success": True,
+        "enclosures": [
+            {
+                "code": enclosure.code,
+                "name": enclosure.name,
+                "price": str(enclosure.price),
+                "dimensions": {
+                    "width": enclosure.dimension_width,
+                    "height": enclosure.dimension_height,
+                    "depth": enclosure.dimension_depth,
+                },
+                "mounting_areas": {
+                    side: {"x": x, "y": y} for side, (x, y) in enclosure.mounting_areas.items()
+                },
+            }
+            for enclosure in enclosures
+        ],
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@profile_request
+def select_glands(request):
+    """
+    Dobiera najtańszy dławik do każdej średnicy kabla.
+
+    Endpoint: POST /api/recruitment/glands/select/
+
+    Request body: {"cables": [8.5, 12.0, ...], "material": "PA" (opcjonalnie)}
+
+    Returns:
+        200: Dławik dla każdego kabla (null, gdy żaden nie pasuje) oraz zestawienie
+             w formacie pozycji dławików z currentConfig
+        400: Błąd walidacji danych
+    """
+    serializer = GlandSelectionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            {
+                "success": False,
+                "errors": serializer.errors,
+                "message": "Dane wejściowe są niepoprawne"
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    cables = serializer.validated_data['cables']
+    glands = select_glands_for_cables(
+        cables, get_catalog_snapshot(), serializer.validated_data.get('material')
+    )
+
+    items: dict[tuple[str, str], int] = {}
+    for gland in glands:
+        if gland is not None:
+            items[(gland.size, gland.material)] = items.get((gland.size, gland.material), 0) + 1
+
+    return Response({
+        "success": True,
+        "glands": [
+            None if gland is None else {
+                "cable_diameter": cable,
+                "size": gland.size,
+                "material": gland.material,
+                "catalog_number": gland.catalog_number,
+                "price": str(gland.price),
+            }
+            for cable, gland in zip(cables, glands)
+        ],
+        "items": [
+            {"size": size, "material": material, "quantity": quantity}
+            for (size, material), quantity in items.items()
+        ],
+        "unmatched": [index for index, gland in enumerate(glands) if gland is None],
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@profile_request
+def select_terminals(request):
+    """
+    Dobiera terminal do wymaganego prądu, napięcia i koloru każdego obwodu.
+
+    Endpoint: POST /api/recruitment/terminals/select/
+
+    Request body: {
+        "circuits": [{"current": 16, "voltage": 400, "color": "blue", "quantity": 2}, ...],
+        "strategy": "cheapest" | "narrowest" (opcjonalnie),
+        "enclosure_code": "..." (opcjonalnie - sprawdza pojemność terminali obudowy)
+    }
+
+    Returns:
+        200: Terminal dla każdego obwodu (null, gdy żaden nie pasuje), zestawienie
+             w formacie pozycji terminali z currentConfig oraz wynik sprawdzenia pojemności
+        400: Błąd walidacji danych
+        404: Nieznana obudowa
+    """
+    serializer = TerminalSelectionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            {
+                "success": False,
+                "errors": serializer.errors,
+                "message": "Dane wejściowe są niepoprawne"
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    catalog = get_catalog_snapshot()
+    enclosure_code = serializer.validated_data.get('enclosure_code')
+    if enclosure_code is not None and enclosure_code not in catalog.enclosures:
+        return Response(
+            {
+                "success": False,
+                "error": f"Obudowa {enclosure_code} nie istnieje"
+            },
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    circuits = serializer.validated_data['circuits']
+    terminals = select_terminals_for_circuits(
+        [
+            CircuitRequirement(
+                current=circuit['current'],
+                voltage=circuit['voltage'],
+                color=circuit.get('color'),
+            )
+            for circuit in circuits
+        ],
+        catalog,
+        serializer.validated_data['strategy'],
+    )
+
+    items: dict[tuple[str, str], int] = {}
+    for circuit, terminal in zip(circuits, terminals):
+        if terminal is not None:
+            key = (terminal.wire_cross_section, terminal.color)
+            items[key] = items.get(key, 0) + circuit['quantity']
+
+    terminal_items = [
+        {"size": size, "color": color, "quantity": quantity}
+        for (size, color), quantity in items.items()
+    ]
+
+    capacity = None
+    if enclosure_code is not None:
+        is_valid, message, details = validate_terminal_capacity(
+            terminal_items, catalog.enclosures[enclosure_code].terminal_capacity
+        )
+        capacity = {"valid": is_valid, "message": message, "details": details}
+
+    return Response({
+        "success": True,
+        "terminals": [
+            None if terminal is None else {
+                "current": circuit['current'],
+                "voltage": circuit['voltage'],
+                "size": terminal.wire_cross_section,
+                "color": terminal.color,
+                "catalog_number": terminal.catalog_number,
+                "rated_current": terminal.current,
+                "rated_voltage": terminal.voltage,
+                "width_mm": terminal.width_mm,
+                "price": str(terminal.price),
+            }
+            for circuit, terminal in zip(circuits, terminals)
+        ],
+        "items": terminal_items,
+        "unmatched": [index for index, terminal in enumerate(terminals) if terminal is None],
+        "capacity": capacity,
+    }, status=status.HTTP_200_OK)
@@ -0,0 +1,92 @@
+"""
+Szybki renderer i parser JSON dla API kalkulatora.
+
+Gdy zainstalowany jest ``orjson``, odpowiedzi i żądania JSON są kodowane
+przez niego zamiast przez moduł json z biblioteki standardowej - UUID (np.
+SimpleOrder.id) i daty są serializowane natywnie, a Decimal (ceny) jako
+napisy, bez utraty precyzji. Bez ``orjson`` (albo dla odpowiedzi z
+wcięciami, np. w przeglądarkowym API DRF) używany jest stdlib json z tym
+samym kodowaniem Decimal. Klasy podpina się w REST_FRAMEWORK
+(DEFAULT_RENDERER_CLASSES / DEFAULT_PARSER_CLASSES).
+"""
+
+import codecs
+from decimal import Decimal
+from typing import Any
+
+from django.conf import settings
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.utils import encoders
+
+try:
+    import orjson  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - zależność opcjonalna
+    orjson = None  # type: ignore[assignment]
+
+
+class DecimalAsStringEncoder(encoders.JSONEncoder):
+    """
+    Koder DRF, który zapisuje Decimal jako napis (domyślnie DRF zamienia go na float).
+    """
+
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return str(obj)
+        return super().default(obj)
+
+
+_fallback_encoder = DecimalAsStringEncoder()
+
+
+def _orjson_default(obj: Any) -> Any:
+    # orjson wywołuje tę funkcję tylko dla typów, których nie koduje sam.
+    return _fallback_encoder.default(obj)
+
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer używający orjson (NaN i nieskończoności są zapisywane jako null).
+    """
+    encoder_class = DecimalAsStringEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_orjson_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Np. liczby całkowite większe niż 64 bity - stdlib json je obsługuje.
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Jak w JSONRenderer: \u2028 i \u2029 zawsze escapowane (JSON jako podzbiór JavaScript).
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser używający orjson.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            body = stream.read()
+            if codecs.lookup(encoding).name != "utf-8":
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except (ValueError, LookupError) as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from calculator.models import Gland
+
 
 class TerminalSerializer(serializers.Serializer):
     id = serializers.IntegerField(min_value=0, required=False)
@@ -62,3 +64,80 @@ class OrderSerializer(serializers.Serializer):
                 raise serializers.ValidationError("Ilość musi być większa od 0.")
 
         return data
+
+
+class DuplicateOrderSerializer(serializers.Serializer):
+    email = serializers.EmailField(required=False)
+
+
+class DuplicateOrdersSerializer(serializers.Serializer):
+    order_ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False)
+    email = serializers.EmailField(required=False)
+
+    def validate_order_ids(self, order_ids):
+        """
+        Usuwa powtórzone ID, zachowując kolejność.
+        """
+        return list(dict.fromkeys(order_ids))
+
+
+class OrderListSerializer(serializers.Serializer):
+    enclosure = serializers.CharField(max_length=100, required=False)
+    gland = serializers.CharField(max_length=100, required=False)
+    material = serializers.ChoiceField(choices=Gland.Material.choices, required=False)
+    terminal = serializers.CharField(max_length=100, required=False)
+    archived = serializers.BooleanField(default=False)
+    limit = serializers.IntegerField(min_value=1, max_value=500, default=50)
+    offset = serializers.IntegerField(min_value=0, default=0)
+
+
+class EnclosureRecommendationSerializer(serializers.Serializer):
+    currentConfig = CurrentConfigSerializer()
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=3)
+
+
+class EnclosureSearchSerializer(serializers.Serializer):
+    min_width = serializers.FloatField(required=False, min_value=0)
+    min_height = serializers.FloatField(required=False, min_value=0)
+    min_depth = serializers.FloatField(required=False, min_value=0)
+    top_x = serializers.FloatField(required=False, min_value=0)
+    top_y = serializers.FloatField(required=False, min_value=0)
+    down_x = serializers.FloatField(required=False, min_value=0)
+    down_y = serializers.FloatField(required=False, min_value=0)
+    left_x = serializers.FloatField(required=False, min_value=0)
+    left_y = serializers.FloatField(required=False, min_value=0)
+    right_x = serializers.FloatField(required=False, min_value=0)
+    right_y = serializers.FloatField(required=False, min_value=0)
+
+    def get_mounting_areas(self) -> dict[str, tuple[float, float]]:
+        """
+        Zwraca minimalne wymiary obszarów montażowych według ścianki.
+        """
+        mounting_areas = {}
+        for side in ("top", "down", "left", "right"):
+            min_x = self.validated_data.get(f"{side}_x")
+            min_y = self.validated_data.get(f"{side}_y")
+            if min_x is not None or min_y is not None:
+                mounting_areas[side] = (min_x or 0.0, min_y or 0.0)
+
+        return mounting_areas
+
+
+class GlandSelectionSerializer(serializers.Serializer):
+    cables = serializers.ListField(
+        child=serializers.FloatField(min_value=0), allow_empty=False, max_length=100_000
+    )
+    material = serializers.ChoiceField(choices=Gland.Material.choices, required=False)
+
+
+class CircuitSerializer(serializers.Serializer):
+    current = serializers.FloatField(min_value=0)
+    voltage = serializers.FloatField(min_value=0, default=0)
+    color = serializers.CharField(max_length=20, required=False)
+    quantity = serializers.IntegerField(min_value=1, default=1)
+
+
+class TerminalSelectionSerializer(serializers.Serializer):
+    circuits = CircuitSerializer(many=True, allow_empty=False, max_length=100_000)
+    strategy = serializers.ChoiceField(choices=["cheapest", "narrowest"], default="cheapest")
+    enclosure_code = serializers.CharField(max_length=50, required=False)
@@ -4,25 +4,40 @@ Szablon widoku API dla zadania rekrutacyjnego.
 Ten plik pokazuje uproszczoną strukturę widoku.
 """
 
+from django.db import router
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from decimal import Decimal
+from typing import TYPE_CHECKING
 import logging
-from typing import TypedDict, Literal, Iterable
 
 
-from .order_serializers import OrderSerializer
-from calculator.models import Enclosure, Gland, Terminal, SimpleOrder
+from .order_serializers import (
+    DuplicateOrderSerializer,
+    DuplicateOrdersSerializer,
+    OrderListSerializer,
+    OrderSerializer,
+)
+from calculator.domain.order import OrderData
+from calculator.infrastructure.profiling import profile_request
+from calculator.models import SimpleOrder
+from calculator.services.catalog_snapshot import get_catalog_snapshot, refresh_catalog_snapshot
+from mysite.db_router import reporting_reads
 
-
-# TODO: Import walidatorów (po implementacji)
+# Geometria, generator CNC i wysyłka emaili (pakiet email z biblioteki standardowej)
+# są importowane w widokach, które ich używają - start procesu i pierwsze żądanie
+# do pozostałych endpointów nie płacą za ich import.
+if TYPE_CHECKING:
+    from calculator.services.geometry import BoxGeometryResult
 
 
 logger = logging.getLogger(__name__)
 
 
 @api_view(['POST'])
+@profile_request
 def create_order(request):
     """
     Tworzy nowe zamówienie z walidacją geometryczną.
@@ -53,6 +68,9 @@ def create_order(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
+    from calculator.services.order_quote import quote_order
+    from calculator.services.order_writer import save_order
+
     # KROK 3: Walidacja geometryczna - ZADANIE DLA KANDYDATA
     validated_data = serializer.validated_data
 
@@ -68,23 +86,21 @@ def create_order(request):
     #         "errors": validation_errors
     #     }, status=status.HTTP_400_BAD_REQUEST)
 
-    # KROK 4: Obliczenie ceny - ZADANIE DLA KANDYDATA
+    # KROK 4: Obliczenie ceny
+    # Zapisywane ceny i wersja katalogu muszą odpowiadać bazie głównej - migawka z pamięci
+    # procesu może pochodzić z repliki i mieć do CALCULATOR_CATALOG_CACHE_SECONDS.
     try:
-        total_price = calculate_order_price(validated_data)
+        quote = quote_order(OrderData.from_dict(validated_data), refresh_catalog_snapshot())
+        total_price = quote.breakdown.total_price
 
-        # KROK 5: Zapisanie zamówienia do bazy
-        order = SimpleOrder.objects.create(
+        # KROK 5: Zapisanie zamówienia do bazy (razem z emailem w kolejce wysyłki)
+        order = save_order(SimpleOrder(
             customer_name=validated_data['name'],
             customer_email=validated_data['email'],
             user_information=validated_data.get('userInformation', ''),
             order_data=validated_data,
-            total_price=total_price,
-            # TODO: Dodaj pozostałe ceny
-            # enclosures_price=...,
-            # glands_price=...,
-            # terminals_price=...,
-            geometry_validation_passed=True  # TODO: Użyj wyniku walidacji
-        )
+            **quote.as_order_fields(),
+        ))
 
         # KROK 6: Zwróć odpowiedź
         return Response({
@@ -107,6 +123,7 @@ def create_order(request):
 
 
 @api_view(['POST'])
+@profile_request
 def validate_order_layout(request):
     """
     Waliduje układ komponentów bez tworzenia zamówienia.
@@ -123,11 +140,6 @@ def validate_order_layout(request):
         400: Błąd walidacji
     """
 
-    # TODO: Zaimplementuj walidację bez tworzenia zamówienia
-    # Bardzo podobne do create_order, ale:
-    # 1. Nie tworzy zamówienia w bazie
-    # 2. Zwraca szczegółowe info o rozmieszczeniu komponentów
-
     serializer = OrderSerializer(data=request.data)
     if not serializer.is_valid():
         return Response(
@@ -138,143 +150,355 @@ def validate_order_layout(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    validated_data = serializer.validated_data
+    from calculator.services.geometry import validate_order_geometry
+
+    geometry_results = validate_order_geometry(
+        OrderData.from_dict(serializer.validated_data), get_catalog_snapshot()
+    )
+    is_valid = all(result.is_valid for result in geometry_results)
 
-    # TODO: Uruchom walidatory geometryczne
-    # Zwróć szczegółowe informacje:
     response_data = {
-        "valid": True,
-        "message": "Wszystkie komponenty zmieszczą się w wybranych obudowach",
+        "valid": is_valid,
+        "message": (
+            "Wszystkie komponenty zmieszczą się w wybranych obudowach"
+            if is_valid else "Komponenty nie mieszczą się w wybranych obudowach"
+        ),
         "details": {
-
+            "boxes": [_box_geometry_details(result) for result in geometry_results],
         }
     }
 
-    return Response(response_data, status=status.HTTP_200_OK)
+    return Response(
+        response_data,
+        status=status.HTTP_200_OK if is_valid else status.HTTP_400_BAD_REQUEST
+    )
 
 
-class GlandItem(TypedDict):
-    size: str
-    quantity: int
-    material: Literal["PA", "Brass"]
+def _box_geometry_details(result: "BoxGeometryResult") -> dict:
+    """
+    Zwraca szczegóły rozmieszczenia komponentów jednej obudowy dla odpowiedzi API.
+    """
+    return {
+        "box": result.box_index,
+        "code": result.code,
+        "valid": result.is_valid,
+        "errors": result.errors,
+        "sides": {
+            layout.side: {
+                "valid": layout.is_valid,
+                "message": layout.message,
+                "algorithm": layout.algorithm,
+                "positions": [
+                    {
+                        "size": position.size,
+                        "x": position.x,
+                        "y": position.y,
+                        "diameter": position.diameter,
+                    }
+                    for position in layout.positions
+                ],
+            }
+            for layout in result.layouts
+        },
+        "terminals": result.terminal_details,
+    }
 
 
-class GlandSide(TypedDict):
-    side: str
-    items: Iterable[GlandItem]
+@api_view(['POST'])
+@profile_request
+def duplicate_order(request, order_id):
+    """
+    Duplikuje istniejące zamówienie.
 
+    Endpoint: POST /api/recruitment/orders/{order_id}/duplicate/
 
-class TerminalItem(TypedDict):
-    size: str
-    quantity: int
-    color: str
+    Request body (opcjonalnie): {"email": "nowy@example.com"}
 
+    Jeśli katalog nie zmienił się od wyceny zamówienia, kopia przejmuje zapisane
+    ceny i wynik walidacji geometrycznej; w przeciwnym razie jest wyceniana od nowa.
 
-class CurrentConfig(TypedDict):
-    box_type: str
-    comment: str
-    glands: Iterable[GlandSide]
-    terminals: Iterable[TerminalItem]
+    Returns:
+        201: Zamówienie zduplikowane pomyślnie
+        400: Błąd walidacji danych
+        404: Zamówienie nie istnieje
+    """
+    serializer = DuplicateOrderSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            {
+                "success": False,
+                "errors": serializer.errors,
+                "message": "Dane wejściowe są niepoprawne"
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
+    return _duplicate_orders_response([order_id], serializer.validated_data.get('email'))
 
-class SaveBox(TypedDict):
-    id: str
-    name: str
-    code: str
-    quantity: int
-    currentConfig: CurrentConfig
 
+@api_view(['POST'])
+@profile_request
+def duplicate_orders_bulk(request):
+    """
+    Duplikuje wiele zamówień w jednej transakcji.
 
-class OrderData(TypedDict):
-    name: str
-    email: str
-    userInformation: str
-    saveBox: Iterable[SaveBox]
+    Endpoint: POST /api/recruitment/orders/duplicate/
 
+    Request body: {"order_ids": ["<uuid>", ...], "email": "nowy@example.com" (opcjonalnie)}
 
-def get_glands_list(glands: Iterable[GlandSide]) -> Iterable[GlandItem]:
-    """
-    Spłaszcza strukturę dławików kablowych które byly pogrupowane według stron.
+    Returns:
+        201: Zamówienia zduplikowane pomyślnie
+        400: Błąd walidacji danych
+        404: Co najmniej jedno zamówienie nie istnieje (nic nie zostaje zapisane)
     """
-    glands_list: list[GlandItem] = []
-
-    for side in glands:
-        glands_list.extend(side['items'])
+    serializer = DuplicateOrdersSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            {
+                "success": False,
+                "errors": serializer.errors,
+                "message": "Dane wejściowe są niepoprawne"
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
-    return glands_list
+    return _duplicate_orders_response(
+        serializer.validated_data['order_ids'], serializer.validated_data.get('email')
+    )
 
 
-def calculate_glands_price(glands: Iterable[GlandItem]) -> Decimal:
+def _duplicate_orders_response(order_ids, customer_email: str | None) -> Response:
     """
-    Oblicza łączną cenę dławików kablowych.
-
-    Parametry:
-        glands (Iterable[GlandItem]): Lista dławików kablowych w zamówieniu.
+    Duplikuje zamówienia o podanych ID i buduje odpowiedź API.
     """
-    glands_total_price = Decimal('0.00')
+    from calculator.services.order_duplication import duplicate_orders
+
+    sources = SimpleOrder.objects.in_bulk(order_ids)
+    missing_ids = [str(order_id) for order_id in order_ids if order_id not in sources]
+    if missing_ids:
+        return Response(
+            {
+                "success": False,
+                "missing_order_ids": missing_ids,
+                "message": "Nie znaleziono zamówień"
+            },
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    try:
+        # Katalog prosto z bazy - migawka z pamięci procesu może nie widzieć
+        # importu cen wykonanego w innym procesie.
+        duplicates = duplicate_orders(
+            [sources[order_id] for order_id in order_ids],
+            refresh_catalog_snapshot(),
+            customer_email,
+        )
+    except Exception as e:
+        logger.error(f"Error duplicating orders: {str(e)}", exc_info=True)
+        return Response(
+            {
+                "success": False,
+                "error": str(e),
+                "message": "Wystąpił błąd podczas duplikowania zamówienia"
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
 
-    for gland in glands:
-        gland_size = gland['size']
-        gland_material = gland['material']
-        gland_quantity = gland['quantity']
+    return Response({
+        "success": True,
+        "orders": [
+            {
+                "source_order_id": str(duplicate.source.id),
+                "order_id": str(duplicate.order.id),
+                "total_price": str(duplicate.order.total_price),
+                "repriced": duplicate.repriced,
+            }
+            for duplicate in duplicates
+        ],
+        "message": "Zamówienie zduplikowane pomyślnie"
+    }, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@profile_request
+def list_orders(request):
+    """
+    Zwraca zamówienia od najnowszego, opcjonalnie tylko z podanymi pozycjami.
 
-        db_gland = Gland.objects.get(size=gland_size, material=gland_material)
-        gland_price = Decimal(db_gland.price) * gland_quantity
-        glands_total_price += gland_price
+    Endpoint: GET /api/recruitment/orders/
 
-    return glands_total_price
+    Parametry zapytania (opcjonalne):
+        enclosure - kod obudowy, np. ENC-300-200-150
+        gland, material - rozmiar dławika (np. M20) i jego materiał (PA / Brass)
+        terminal - rozmiar terminala
+        archived=1 - dołącz zamówienia z archiwum (archive_orders)
+        limit (domyślnie 50, maks. 500), offset - stronicowanie
 
+    Filtry pozycji korzystają z indeksu OrderItemIndex - order_data nie jest dekodowane.
 
-def calculate_terminals_price(terminals: Iterable[TerminalItem]) -> Decimal:
+    Returns:
+        200: Lista zamówień
+        400: Niepoprawne parametry
     """
-    Oblicza łączną cenę terminali elektrycznych.
+    serializer = OrderListSerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(
+            {
+                "success": False,
+                "errors": serializer.errors,
+                "message": "Dane wejściowe są niepoprawne"
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
-    Parametry: 
-        terminals (Iterable[TerminalItem]): Lista terminali w zamówieniu.
+    from calculator.services.order_archive import order_history
+    from calculator.services.order_item_index import filter_orders_by_items
+
+    params = serializer.validated_data
+    orders = filter_orders_by_items(
+        order_history(include_archived=params['archived']),
+        enclosure=params.get('enclosure'),
+        gland=params.get('gland'),
+        gland_material=params.get('material'),
+        terminal=params.get('terminal'),
+    ).values('id', 'customer_name', 'customer_email', 'total_price', 'created_at')
+    page = orders[params['offset']:params['offset'] + params['limit']]
+
+    return Response({
+        "success": True,
+        "orders": [
+            {
+                "order_id": str(order['id']),
+                "customer_name": order['customer_name'],
+                "customer_email": order['customer_email'],
+                "total_price": str(order['total_price']),
+                "created_at": order['created_at'],
+            }
+            for order in page
+        ],
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@profile_request
+def order_cnc_program(request, order_id):
     """
-    terminals_total_price = Decimal('0.00')
+    Zwraca program CNC (G-code) do wiercenia otworów dławików dla zamówienia.
 
-    for terminal in terminals:
-        terminal_size = terminal['size']
-        terminal_quantity = terminal['quantity']
-        terminal_color = terminal['color']
+    Endpoint: GET /api/recruitment/orders/{order_id}/cnc/
 
-        db_terminal = Terminal.objects.get(wire_cross_section=terminal_size, color=terminal_color)
+    Parametry zapytania (opcjonalne):
+        expand=1 - powtórz sekcję obudowy dla każdej sztuki (program dla całej serii)
+        thickness - grubość ścianki w mm (domyślnie 2.0)
+        speed - prędkość wrzeciona w RPM (domyślnie 3000)
 
-        terminal_price = Decimal(db_terminal.price) * terminal_quantity
+    Program jest wysyłany strumieniowo, bez budowania go w pamięci. Zamówienia, którego
+    nie ma w bazie bieżącej, szuka się w archiwum (archive_orders).
 
-        terminals_total_price += terminal_price
+    Returns:
+        200: Program CNC (text/plain)
+        400: Niepoprawne parametry lub zamówienie nie przeszło walidacji geometrycznej
+        404: Zamówienie nie istnieje
+    """
+    from calculator.services.order_archive import order_history
 
-    return terminals_total_price
+    try:
+        order = order_history(include_archived=True).only('id', 'order_data').get(pk=order_id)
+    except SimpleOrder.DoesNotExist:
+        return Response(
+            {"success": False, "message": "Nie znaleziono zamówienia"},
+            status=status.HTTP_404_NOT_FOUND
+        )
 
+    try:
+        material_thickness = float(request.query_params.get('thickness', 2.0))
+        drill_speed = int(request.query_params.get('speed', 3000))
+    except ValueError:
+        return Response(
+            {"success": False, "message": "Parametry thickness i speed muszą być liczbami"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
-def calculate_order_price(order_data: OrderData) -> Decimal:
-    """
-    Oblicza cenę zamówienia.
+    from calculator.services.cnc_generator import CNCProgramGenerator
 
-    Parametry:
-        order_data (OrderData): Dane zamówienia.
-    """
-    total_price = Decimal('0.00')
+    lines = CNCProgramGenerator().generate_order_gcode(
+        OrderData.from_dict(order.order_data),
+        get_catalog_snapshot(),
+        material_thickness=material_thickness,
+        drill_speed=drill_speed,
+        expand_quantity=request.query_params.get('expand') in ('1', 'true'),
+    )
+    response = StreamingHttpResponse(
+        (f"{line}\n" for line in lines), content_type='text/plain; charset=utf-8'
+    )
+    response['Content-Disposition'] = f'attachment; filename="order-{order.id}.nc"'
 
-    for box_data in order_data.get('saveBox', []):
-        # 1. Cena obudowy
-        enclosure_code = box_data['code']
-        db_enclosure = Enclosure.objects.get(code=enclosure_code)
-        enclosure_price = Decimal(db_enclosure.price)
+    return response
 
-        # 2. Ceny dławików
-        glands_order = box_data['currentConfig'].get('glands', [])
-        glands_list = get_glands_list(glands_order)
-        glands_price = calculate_glands_price(glands_list)
 
-        # 3. Ceny terminali
-        terminals_order = box_data['currentConfig'].get('terminals', [])
-        terminals_price = calculate_terminals_price(terminals_order)
+@api_view(['GET'])
+@profile_request
+def export_orders(request):
+    """
+    Eksportuje zamówienia z pozycjami obudów, dławików i terminali do CSV lub XLSX.
+
+    Endpoint: GET /api/recruitment/orders/export/
+
+    Parametry zapytania (opcjonalne):
+        type - csv (domyślnie) lub xlsx
+        date_from, date_to - zakres dat utworzenia zamówienia (YYYY-MM-DD, włącznie)
+        enclosure - tylko zamówienia zawierające obudowę o tym kodzie
+        archived=1 - dołącz zamówienia z archiwum (archive_orders)
 
-        box_price = (enclosure_price + glands_price +
-                     terminals_price) * box_data['quantity']
+    Plik jest wysyłany strumieniowo - pamięć nie zależy od liczby zamówień.
 
-        total_price += box_price
+    Returns:
+        200: Plik eksportu
+        400: Niepoprawne parametry
+    """
+    from calculator.services.order_export import (
+        CONTENT_TYPES,
+        EXPORT_FORMATS,
+        OrderExportFilter,
+        iter_export,
+    )
+
+    export_format = request.query_params.get('type', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return Response(
+            {
+                "success": False,
+                "message": f"Parametr type musi być jednym z: {', '.join(EXPORT_FORMATS)}"
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
-    return total_price
+    dates = {}
+    for param in ('date_from', 'date_to'):
+        value = request.query_params.get(param)
+        try:
+            dates[param] = parse_date(value) if value else None
+        except ValueError:
+            dates[param] = None
+        if value and dates[param] is None:
+            return Response(
+                {"success": False, "message": f"Parametr {param} musi być datą YYYY-MM-DD"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    export_filter = OrderExportFilter(
+        enclosure_code=request.query_params.get('enclosure') or None,
+        include_archived=request.query_params.get('archived') in ('1', 'true'),
+        **dates,
+    )
+    # Alias bazy jest wybierany teraz - plik jest generowany już po wyjściu z widoku.
+    with reporting_reads():
+        using = router.db_for_read(SimpleOrder)
+
+    response = StreamingHttpResponse(
+        iter_export(export_format, export_filter, using=using),
+        content_type=CONTENT_TYPES[export_format],
+    )
+    response['Content-Disposition'] = f'attachment; filename="orders.{export_format}"'
+
+    return response
@@ -0,0 +1,286 @@
+"""
+Opcjonalne profilowanie żądań API kalkulatora.
+
+Profilowanie włącza się ustawieniem ``CALCULATOR_PROFILING`` w ``mysite/settings.py``.
+Profil jest zapisywany dla co N-tego żądania (``SAMPLE_RATE``) albo dla każdego
+żądania, które trwało dłużej niż ``SLOW_THRESHOLD_MS``. Profile trafiają do
+ograniczonego bufora cyklicznego na dysku (``DIRECTORY``, maks. ``MAX_PROFILES`` plików).
+"""
+
+import cProfile
+import functools
+import io
+import itertools
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, TypedDict
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SUFFIX = ".prof"
+METADATA_SUFFIX = ".json"
+
+DEFAULT_PROFILING_SETTINGS = {
+    "ENABLED": False,
+    "SAMPLE_RATE": 100,
+    "SLOW_THRESHOLD_MS": None,
+    "DIRECTORY": "profiles",
+    "MAX_PROFILES": 50,
+    "BACKEND": "cprofile",
+}
+
+_request_counter = itertools.count(1)
+
+
+class OrderCounts(TypedDict):
+    boxes: int
+    glands: int
+    terminals: int
+
+
+class ProfileMetadata(TypedDict):
+    profile_id: str
+    backend: str
+    reason: str
+    path: str
+    method: str
+    status_code: int | None
+    duration_ms: float
+    created_at: str
+    counts: OrderCounts
+
+
+def get_profiling_settings() -> dict[str, Any]:
+    """
+    Zwraca ustawienia profilowania uzupełnione o wartości domyślne.
+    """
+    return {**DEFAULT_PROFILING_SETTINGS, **getattr(settings, "CALCULATOR_PROFILING", {})}
+
+
+def get_profiles_directory(profiling_settings: dict[str, Any] | None = None) -> Path:
+    """
+    Zwraca katalog bufora profili (ścieżki względne liczone są od BASE_DIR).
+    """
+    profiling_settings = profiling_settings or get_profiling_settings()
+    directory = Path(profiling_settings["DIRECTORY"])
+    if not directory.is_absolute():
+        directory = Path(settings.BASE_DIR) / directory
+
+    return directory
+
+
+def count_order_items(data: Any) -> OrderCounts:
+    """
+    Zlicza obudowy, dławiki i terminale w surowych danych zamówienia.
+
+    Dane pochodzą z żądania, więc mogą być niepoprawne - wtedy niepoprawne
+    elementy są pomijane zamiast zgłaszać wyjątek.
+
+    Parametry:
+        data: Dane żądania (zwykle request.data).
+    """
+    counts: OrderCounts = {"boxes": 0, "glands": 0, "terminals": 0}
+    if not isinstance(data, dict):
+        return counts
+
+    for box in data.get("saveBox") or []:
+        if not isinstance(box, dict):
+            continue
+
+        counts["boxes"] += _as_int(box.get("quantity"))
+        config = box.get("currentConfig") or {}
+        if not isinstance(config, dict):
+            continue
+
+        for side in config.get("glands") or []:
+            if isinstance(side, dict):
+                counts["glands"] += sum(
+                    _as_int(item.get("quantity"))
+                    for item in side.get("items") or []
+                    if isinstance(item, dict)
+                )
+
+        counts["terminals"] += sum(
+            _as_int(item.get("quantity"))
+            for item in config.get("terminals") or []
+            if isinstance(item, dict)
+        )
+
+    return counts
+
+
+def _as_int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class _Profiler:
+    """
+    Wspólny interfejs dla cProfile i (opcjonalnego) pyinstrument.
+    """
+
+    def __init__(self, backend: str):
+        self.backend = backend
+        self._profiler: Any = None
+
+        if backend == "pyinstrument":
+            try:
+                from pyinstrument import Profiler  # type: ignore[import-not-found]
+            except ImportError:
+                logger.warning("pyinstrument is not installed, falling back to cProfile")
+                self.backend = "cprofile"
+            else:
+                self._profiler = Profiler()
+
+        if self.backend == "cprofile":
+            self._profiler = cProfile.Profile()
+
+    def start(self) -> None:
+        if self.backend == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self) -> None:
+        if self.backend == "pyinstrument":
+            self._profiler.stop()
+        else:
+            self._profiler.disable()
+
+    def dump(self, path: Path) -> None:
+        if self.backend == "pyinstrument":
+            path.write_text(self._profiler.output_text(unicode=True), encoding="utf-8")
+        else:
+            self._profiler.dump_stats(path)
+
+
+def profile_request(view: Callable) -> Callable:
+    """
+    Dekorator profilujący widok API kalkulatora.
+
+    Należy go umieścić pod ``@api_view``, tak aby widok otrzymał obiekt
+    ``Request`` z DRF i licznik elementów zamówienia mógł odczytać ``request.data``.
+    Gdy profilowanie jest wyłączone, dekorator jedynie wywołuje widok.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        profiling_settings = get_profiling_settings()
+        if not profiling_settings["ENABLED"]:
+            return view(request, *args, **kwargs)
+
+        sample_rate = max(int(profiling_settings["SAMPLE_RATE"] or 0), 0)
+        sampled = sample_rate > 0 and next(_request_counter) % sample_rate == 0
+        slow_threshold_ms = profiling_settings["SLOW_THRESHOLD_MS"]
+
+        # Żądanie, które nie jest próbkowane, profilujemy tylko wtedy, gdy może
+        # okazać się wolne - profilera nie da się włączyć wstecz.
+        if not sampled and slow_threshold_ms is None:
+            return view(request, *args, **kwargs)
+
+        profiler = _Profiler(profiling_settings["BACKEND"])
+        started_at = time.perf_counter()
+        profiler.start()
+        try:
+            response = view(request, *args, **kwargs)
+        finally:
+            profiler.stop()
+        duration_ms = (time.perf_counter() - started_at) * 1000
+
+        if sampled:
+            reason = "sampled"
+        elif duration_ms >= slow_threshold_ms:
+            reason = "slow"
+        else:
+            return response
+
+        try:
+            _store_profile(profiler, profiling_settings, {
+                "backend": profiler.backend,
+                "reason": reason,
+                "path": request.path,
+                "method": request.method,
+                "status_code": getattr(response, "status_code", None),
+                "duration_ms": round(duration_ms, 3),
+                "counts": count_order_items(getattr(request, "data", None)),
+            })
+        except Exception:
+            # Profilowanie nie może psuć obsługi żądania.
+            logger.exception("Could not store request profile")
+
+        return response
+
+    return wrapper
+
+
+def _store_profile(profiler: _Profiler, profiling_settings: dict[str, Any], metadata: dict) -> None:
+    """
+    Zapisuje profil z metadanymi i usuwa najstarsze profile ponad limit bufora.
+    """
+    directory = get_profiles_directory(profiling_settings)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    created_at = datetime.now(timezone.utc)
+    profile_id = f"{created_at:%Y%m%dT%H%M%S%f}-{time.monotonic_ns() % 1_000_000:06d}"
+
+    profiler.dump(directory / f"{profile_id}{PROFILE_SUFFIX}")
+    (directory / f"{profile_id}{METADATA_SUFFIX}").write_text(
+        json.dumps({"profile_id": profile_id, "created_at": created_at.isoformat(), **metadata}),
+        encoding="utf-8",
+    )
+
+    _trim_ring_buffer(directory, int(profiling_settings["MAX_PROFILES"]))
+
+
+def _trim_ring_buffer(directory: Path, max_profiles: int) -> None:
+    metadata_files = sorted(directory.glob(f"*{METADATA_SUFFIX}"))
+    for metadata_file in metadata_files[:max(len(metadata_files) - max_profiles, 0)]:
+        metadata_file.unlink(missing_ok=True)
+        metadata_file.with_suffix(PROFILE_SUFFIX).unlink(missing_ok=True)
+
+
+def list_profiles(directory: Path | None = None) -> list[ProfileMetadata]:
+    """
+    Zwraca metadane zapisanych profili, od najnowszego.
+    """
+    directory = directory or get_profiles_directory()
+    if not directory.exists():
+        return []
+
+    profiles = []
+    for metadata_file in sorted(directory.glob(f"*{METADATA_SUFFIX}"), reverse=True):
+        try:
+            profiles.append(json.loads(metadata_file.read_text(encoding="utf-8")))
+        except (OSError, json.JSONDecodeError):
+            logger.warning("Skipping unreadable profile metadata: %s", metadata_file)
+
+    return profiles
+
+
+def summarize_profile(profile_path: Path, limit: int = 20, sort_by: str = "cumulative") -> str:
+    """
+    Zwraca tekstowe podsumowanie profilu (najkosztowniejsze funkcje).
+
+    Parametry:
+        profile_path (Path): Ścieżka do pliku profilu.
+        limit (int): Liczba wierszy w podsumowaniu.
+        sort_by (str): Klucz sortowania pstats (np. "cumulative", "tottime").
+    """
+    import pstats
+
+    try:
+        stream = io.StringIO()
+        stats = pstats.Stats(str(profile_path), stream=stream)
+    except (TypeError, ValueError, EOFError):
+        # Profil zapisany przez pyinstrument jest już tekstem.
+        return profile_path.read_text(encoding="utf-8")
+
+    stats.sort_stats(sort_by).print_stats(limit)
+    return stream.getvalue()
@@ -0,0 +1,62 @@
+"""
+Ustawienia połączeń SQLite dla równoległych zapisów.
+
+Domyślny dziennik (rollback journal) blokuje całą bazę na czas zapisu, także
+przed czytelnikami, więc równoległe create_order kończą się błędem
+"database is locked". Przy każdym nowym połączeniu (sygnał connection_created)
+ustawiane są PRAGMA:
+
+- journal_mode=WAL - czytelnicy nie czekają na zapis, zapisujący nie czekają na czytelników,
+- synchronous=NORMAL - w trybie WAL bezpieczne przy awarii procesu, fsync tylko przy checkpoint,
+- mmap_size - odczyt stron bazy przez mapowanie pamięci zamiast read(),
+- busy_timeout - oczekiwanie na blokadę zapisu zamiast natychmiastowego błędu.
+"""
+
+from typing import Any
+
+from django.conf import settings
+
+
+DEFAULT_SQLITE_SETTINGS = {
+    "ENABLED": True,
+    "JOURNAL_MODE": "wal",
+    "SYNCHRONOUS": "normal",
+    "MMAP_SIZE": 256 * 1024 * 1024,
+    "BUSY_TIMEOUT_MS": 5000,
+}
+
+
+def get_sqlite_settings() -> dict[str, Any]:
+    """
+    Zwraca ustawienia połączeń SQLite uzupełnione o wartości domyślne.
+    """
+    return {**DEFAULT_SQLITE_SETTINGS, **getattr(settings, "CALCULATOR_SQLITE", {})}
+
+
+def sqlite_pragmas(sqlite_settings: dict[str, Any]) -> list[str]:
+    """
+    Zwraca polecenia PRAGMA dla ustawień (pomijając wartości None).
+    """
+    pragmas = {
+        "busy_timeout": sqlite_settings["BUSY_TIMEOUT_MS"],
+        "journal_mode": sqlite_settings["JOURNAL_MODE"],
+        "synchronous": sqlite_settings["SYNCHRONOUS"],
+        "mmap_size": sqlite_settings["MMAP_SIZE"],
+    }
+    return [f"PRAGMA {name}={value}" for name, value in pragmas.items() if value is not None]
+
+
+def configure_sqlite_connection(sender, connection, **kwargs) -> None:
+    """
+    Odbiornik sygnału connection_created - ustawia PRAGMA nowego połączenia SQLite.
+    """
+    if connection.vendor != "sqlite":
+        return
+
+    sqlite_settings = get_sqlite_settings()
+    if not sqlite_settings["ENABLED"]:
+        return
+
+    with connection.cursor() as cursor:
+        for pragma in sqlite_pragmas(sqlite_settings):
+            cursor.execute(pragma)
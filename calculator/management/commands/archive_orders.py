@@ -0,0 +1,88 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from calculator.models import SimpleOrder
+from calculator.services.order_archive import (
+    archivable_orders,
+    archive_alias,
+    archive_cutoff,
+    archive_order_chunk,
+    get_order_archive_settings,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Przenosi zamówienia starsze niż podana liczba pełnych miesięcy (z ich emailami) "
+        "do bazy archiwum, paczkami w osobnych transakcjach."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Dodaje argumenty do komendy zarządzania.
+
+        Parametry
+            parser: obiekt parsera argumentów
+        """
+        archive_settings = get_order_archive_settings()
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=archive_settings["MONTHS"],
+            help=(
+                "Archiwizuj zamówienia sprzed tylu pełnych miesięcy "
+                f"(domyślnie {archive_settings['MONTHS']})"
+            ),
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=archive_settings["CHUNK_SIZE"],
+            help=(
+                "Liczba zamówień przenoszonych w jednej transakcji "
+                f"(domyślnie {archive_settings['CHUNK_SIZE']})"
+            ),
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Nie przenoś danych - wypisz tylko liczbę zamówień do archiwizacji",
+        )
+
+    def handle(self, *args, **options):
+        if options["months"] < 1:
+            raise CommandError("--months musi być większe od 0")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size musi być większe od 0")
+
+        alias = archive_alias()
+        if alias is None:
+            raise CommandError(
+                f"Brak bazy '{get_order_archive_settings()['DATABASE']}' w DATABASES"
+            )
+        if SimpleOrder._meta.db_table not in connections[alias].introspection.table_names():
+            raise CommandError(
+                f"Baza '{alias}' nie ma tabel zamówień - "
+                f"uruchom: python manage.py migrate --database {alias}"
+            )
+
+        cutoff = archive_cutoff(options["months"])
+        pending = archivable_orders(cutoff).count()
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Zamówienia sprzed {cutoff:%Y-%m-%d} do archiwum '{alias}': {pending}"
+        ))
+        if options["dry_run"] or not pending:
+            return
+
+        archived = 0
+        started = time.perf_counter()
+        while moved := archive_order_chunk(cutoff, options["chunk_size"], alias):
+            archived += moved
+            self.stdout.write(f"Przeniesiono zamówień: {archived}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Zarchiwizowano {archived} zamówień w {time.perf_counter() - started:.1f} s; "
+            f"w bazie bieżącej zostało {SimpleOrder.objects.count()}"
+        ))
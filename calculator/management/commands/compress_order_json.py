@@ -0,0 +1,141 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, models, transaction
+from django.db.models import Sum
+from django.db.models.functions import Cast, Coalesce, Length
+
+from calculator.fields import get_compressed_json_settings
+from calculator.models import SimpleOrder
+
+
+JSON_FIELDS = ("order_data", "geometry_validation_errors")
+
+
+class Command(BaseCommand):
+    help = (
+        "Przepisuje pola JSON zamówień (order_data, geometry_validation_errors) "
+        "w formacie CompressedJSONField, paczkami, i raportuje rozmiar oraz czas skanu tabeli."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Dodaje argumenty do komendy zarządzania.
+
+        Parametry
+            parser: obiekt parsera argumentów
+        """
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Liczba zamówień przepisywanych w jednej transakcji (domyślnie 500)",
+        )
+        parser.add_argument(
+            "--vacuum",
+            action="store_true",
+            help="Po przepisaniu wykonaj VACUUM (SQLite), aby zmniejszyć plik bazy",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Nie przepisuj danych - wypisz tylko rozmiar i czas skanu tabeli",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        if chunk_size < 1:
+            raise CommandError("--chunk-size musi być większe od 0")
+
+        compression = get_compressed_json_settings()
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Kompresja JSON zamówień (włączona: {compression['ENABLED']}, "
+            f"algorytm: {compression['ALGORITHM']}, próg: {compression['THRESHOLD_BYTES']} B)"
+        ))
+        before = self._table_stats()
+        self._write_stats("Przed", before)
+        if options["dry_run"]:
+            return
+
+        rewritten = 0
+        last_pk = None
+        while True:
+            queryset = SimpleOrder.objects.order_by("pk")
+            if last_pk is not None:
+                queryset = queryset.filter(pk__gt=last_pk)
+            rows = list(queryset.values_list("pk", *JSON_FIELDS)[:chunk_size])
+            if not rows:
+                break
+
+            with transaction.atomic():
+                SimpleOrder.objects.bulk_update(
+                    [SimpleOrder(pk=pk, **dict(zip(JSON_FIELDS, values))) for pk, *values in rows],
+                    JSON_FIELDS,
+                )
+            rewritten += len(rows)
+            last_pk = rows[-1][0]
+            self.stdout.write(f"Przepisano zamówień: {rewritten}")
+
+        if options["vacuum"] and connection.vendor == "sqlite":
+            connection.cursor().execute("VACUUM")
+
+        after = self._table_stats()
+        self._write_stats("Po", after)
+        if before["json_bytes"]:
+            ratio = after["json_bytes"] / before["json_bytes"]
+            self.stdout.write(self.style.SUCCESS(
+                f"Dane JSON: {ratio:.2f}x rozmiaru przed kompresją"
+            ))
+
+    def _table_stats(self) -> dict:
+        """
+        Zwraca liczbę zamówień, rozmiar danych JSON i tabeli oraz czasy pełnego skanu.
+        """
+        started = time.perf_counter()
+        totals = SimpleOrder.objects.aggregate(
+            orders=models.Count("pk"),
+            **{
+                field: Coalesce(Sum(Length(Cast(field, models.BinaryField()))), 0)
+                for field in JSON_FIELDS
+            },
+        )
+        sql_scan = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for _ in SimpleOrder.objects.values_list(*JSON_FIELDS).iterator(chunk_size=2000):
+            pass
+        orm_scan = time.perf_counter() - started
+
+        return {
+            "orders": totals["orders"],
+            "json_bytes": sum(totals[field] for field in JSON_FIELDS),
+            "table_bytes": self._sqlite_table_size(),
+            "sql_scan_ms": sql_scan * 1000,
+            "orm_scan_ms": orm_scan * 1000,
+        }
+
+    @staticmethod
+    def _sqlite_table_size() -> int | None:
+        # Wirtualna tabela dbstat jest dostępna tylko w SQLite skompilowanym
+        # z SQLITE_ENABLE_DBSTAT_VTAB.
+        if connection.vendor != "sqlite":
+            return None
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT SUM(pgsize) FROM dbstat WHERE name = %s", [SimpleOrder._meta.db_table]
+                )
+                return cursor.fetchone()[0]
+        except OperationalError:
+            return None
+
+    def _write_stats(self, label: str, stats: dict):
+        table_size = (
+            f"{stats['table_bytes'] / 1024:.0f} KiB" if stats["table_bytes"] is not None else "n/d"
+        )
+        self.stdout.write(
+            f"{label}: zamówień {stats['orders']}, "
+            f"dane JSON {stats['json_bytes'] / 1024:.0f} KiB, "
+            f"tabela {table_size}, skan SQL {stats['sql_scan_ms']:.1f} ms, "
+            f"odczyt przez ORM {stats['orm_scan_ms']:.1f} ms"
+        )
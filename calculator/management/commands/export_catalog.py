@@ -0,0 +1,62 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from calculator.services.catalog_file import load_catalog_file, write_catalog_file
+from calculator.services.catalog_snapshot import build_catalog_snapshot, load_catalog_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Eksportuje migawkę katalogu do pliku binarnego, z którego procesy robocze "
+        "wczytują katalog bez zapytań do bazy (CALCULATOR_CATALOG_FILE)."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Dodaje argumenty do komendy zarządzania.
+
+        Parametry
+            parser: obiekt parsera argumentów
+        """
+        parser.add_argument(
+            "--output",
+            type=str,
+            help="Ścieżka pliku (domyślnie CALCULATOR_CATALOG_FILE)",
+        )
+
+    def handle(self, *args, **options):
+        path = options["output"] or getattr(settings, "CALCULATOR_CATALOG_FILE", None)
+        if not path:
+            raise CommandError("Podaj --output lub ustaw CALCULATOR_CATALOG_FILE")
+
+        catalog = load_catalog_snapshot()
+        size = write_catalog_file(catalog, path)
+
+        # Kontrola: wersja wyliczona z wczytanych rekordów musi być równa zapisanej.
+        loaded = load_catalog_file(path)
+        rebuilt = build_catalog_snapshot(
+            list(loaded.enclosures.values()),
+            list(loaded.glands.values()),
+            list(loaded.terminals.values()),
+        )
+        if rebuilt.version != catalog.version:
+            raise CommandError(
+                f"Plik {path} nie odtwarza katalogu "
+                f"(wersja {rebuilt.version} zamiast {catalog.version})"
+            )
+
+        durations = []
+        for _ in range(20):
+            started = time.perf_counter()
+            load_catalog_file(path)
+            durations.append(time.perf_counter() - started)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Zapisano katalog {catalog.version} do {path}: {size} B, "
+            f"obudowy={len(catalog.enclosures)} dławiki={len(catalog.glands)} "
+            f"terminale={len(catalog.terminals)}, "
+            f"wczytanie {statistics.median(durations) * 1_000_000:.0f} µs (mediana)"
+        ))
@@ -0,0 +1,93 @@
+import datetime
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router
+
+from calculator.models import SimpleOrder
+from calculator.services.order_export import EXPORT_FORMATS, OrderExportFilter, iter_export
+from mysite.db_router import reporting_reads
+
+
+def _date(value: str) -> datetime.date:
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Niepoprawna data (oczekiwano YYYY-MM-DD): {value}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Eksportuje zamówienia z pozycjami obudów, dławików i terminali do CSV lub XLSX, "
+        "strumieniowo (pamięć nie zależy od liczby zamówień)."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Dodaje argumenty do komendy zarządzania.
+
+        Parametry
+            parser: obiekt parsera argumentów
+        """
+        parser.add_argument(
+            "--format",
+            choices=EXPORT_FORMATS,
+            default="csv",
+            help="Format pliku (domyślnie csv)",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            help="Ścieżka pliku wynikowego (domyślnie standardowe wyjście)",
+        )
+        parser.add_argument(
+            "--date-from",
+            type=str,
+            help="Tylko zamówienia utworzone od tego dnia (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--date-to",
+            type=str,
+            help="Tylko zamówienia utworzone do tego dnia włącznie (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--enclosure",
+            type=str,
+            help="Tylko zamówienia zawierające obudowę o tym kodzie",
+        )
+        parser.add_argument(
+            "--include-archived",
+            action="store_true",
+            help="Dołącz zamówienia z archiwum (archive_orders)",
+        )
+
+    def handle(self, *args, **options):
+        export_filter = OrderExportFilter(
+            date_from=_date(options["date_from"]) if options["date_from"] else None,
+            date_to=_date(options["date_to"]) if options["date_to"] else None,
+            enclosure_code=options["enclosure"],
+            include_archived=options["include_archived"],
+        )
+
+        with reporting_reads():
+            using = router.db_for_read(SimpleOrder)
+        chunks = iter_export(options["format"], export_filter, using=using)
+        binary = options["format"] == "xlsx"
+
+        if not options["output"]:
+            # XLSX to plik binarny - zapis bezpośrednio do bufora standardowego wyjścia.
+            stream = sys.stdout.buffer if binary else sys.stdout
+            for chunk in chunks:
+                stream.write(chunk)
+            stream.flush()
+            return
+
+        if binary:
+            file = open(options["output"], mode="wb")
+        else:
+            file = open(options["output"], mode="w", encoding="utf-8", newline="")
+        with file:
+            for chunk in chunks:
+                file.write(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f"Eksport zapisany do pliku: {options['output']}"))
@@ -0,0 +1,74 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from calculator.domain.order import OrderData
+from calculator.models import SimpleOrder
+from calculator.services.catalog_snapshot import load_catalog_snapshot
+from calculator.services.cnc_generator import CNCProgramGenerator
+from calculator.services.order_archive import order_history
+
+
+class Command(BaseCommand):
+    help = "Generuje program CNC (G-code) do wiercenia otworów dławików dla zamówienia."
+
+    def add_arguments(self, parser):
+        """
+        Dodaje argumenty do komendy zarządzania.
+
+        Parametry
+            parser: obiekt parsera argumentów
+        """
+        parser.add_argument("order_id", type=str, help="ID zamówienia")
+        parser.add_argument(
+            "--output",
+            type=str,
+            help="Ścieżka pliku wynikowego (domyślnie standardowe wyjście)",
+        )
+        parser.add_argument(
+            "--expand-quantity",
+            action="store_true",
+            help="Powtórz sekcję obudowy dla każdej sztuki (program dla całej serii)",
+        )
+        parser.add_argument(
+            "--thickness",
+            type=float,
+            default=2.0,
+            help="Grubość ścianki w mm (domyślnie 2.0)",
+        )
+        parser.add_argument(
+            "--speed",
+            type=int,
+            default=3000,
+            help="Prędkość wrzeciona w RPM (domyślnie 3000)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            orders = order_history(include_archived=True).only("id", "order_data")
+            order = orders.get(pk=options["order_id"])
+        except (SimpleOrder.DoesNotExist, ValueError):
+            raise CommandError(f"Nie znaleziono zamówienia: {options['order_id']}")
+        except Exception as exception:
+            raise CommandError(f"Nieprawidłowe ID zamówienia: {exception}") from exception
+
+        lines = CNCProgramGenerator().generate_order_gcode(
+            OrderData.from_dict(order.order_data),
+            load_catalog_snapshot(),
+            material_thickness=options["thickness"],
+            drill_speed=options["speed"],
+            expand_quantity=options["expand_quantity"],
+        )
+
+        if not options["output"]:
+            for line in lines:
+                sys.stdout.write(f"{line}\n")
+            return
+
+        with open(options["output"], mode="w", encoding="utf-8") as file:
+            for line in lines:
+                file.write(f"{line}\n")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Program CNC zapisany do pliku: {options['output']}")
+        )
@@ -7,6 +7,12 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
 from calculator.models import Enclosure
+from calculator.services.catalog_import import (
+    CatalogImportPlan,
+    apply_catalog_import,
+    plan_catalog_import,
+)
+from calculator.services.price_lists import parse_effective_from, record_price_list
 
 
 class Command(BaseCommand):
@@ -24,6 +30,16 @@ class Command(BaseCommand):
             type=str,
             help="Ścieżka do pliku JSON (np. fixtures/enclosures.json)",
         )
+        parser.add_argument(
+            "--effective-from",
+            type=str,
+            help="Od kiedy obowiązują importowane ceny (YYYY-MM-DD lub ISO 8601, domyślnie teraz)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Nie zapisuj zmian - wypisz tylko nowe, zmienione i brakujące produkty",
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(
@@ -38,7 +54,36 @@ class Command(BaseCommand):
             self.style.MIGRATE_HEADING("Zapisywanie danych obudów elektrycznych do bazy danych...")
         )
 
-        self._save_enclosure_data(enclosure_fixtures)
+        try:
+            effective_from = (
+                parse_effective_from(options["effective_from"])
+                if options["effective_from"] else None
+            )
+        except ValueError as exception:
+            raise CommandError(str(exception))
+
+        plan = self._plan_import(enclosure_fixtures)
+        self.stdout.write(f"Obudowy - {plan.summary()}")
+
+        if options["dry_run"]:
+            for line in plan.diff_lines():
+                self.stdout.write(line)
+            self.stdout.write("Tryb --dry-run: baza danych nie została zmieniona.")
+            return
+
+        if plan.has_changes:
+            # Import i wersja cennika w jednej transakcji - ceny w katalogu i w historii
+            # zmieniają się razem.
+            with transaction.atomic():
+                self._save_enclosure_data(plan)
+                version = record_price_list(
+                    effective_from, source=f"import_enclosures {options['file_path']}"
+                )
+
+            if version is not None:
+                self.stdout.write(
+                    f"Zapisano wersję cennika {version.pk} obowiązującą od {version.effective_from}"
+                )
 
         self.stdout.write(
             self.style.SUCCESS('Import obudów elektronicznych zakończony pomyślnie.')
@@ -67,58 +112,71 @@ class Command(BaseCommand):
 
         return data
 
-    def _save_enclosure_data(self, enclosure_data: list[dict]):
+    def _plan_import(self, enclosure_data: list[dict]) -> CatalogImportPlan:
         """
-        Zapisuje dane obudów elektrycznych do bazy danych.
+        Porównuje dane obudów elektrycznych z pliku z bazą danych.
 
         Parametry
             enclosure_data (list[dict]): Lista danymi obudów elektrycznych.
         """
         try:
-            with transaction.atomic():
-                for item in enclosure_data:
-                    try:
-                        name = item["name"]
-                        code = item["code"]
-                        dimension_width = item["dimension_width"]
-                        dimension_height = item["dimension_height"]
-                        dimension_depth = item["dimension_depth"]
-                        price = item["price"]
-                    except KeyError as e:
-                        raise CommandError(
-                            f"Brak wymaganych pól w danych obudowy: {e}"
-                        )
-
-                    mounting_areas = item.get("mounting_areas", {})
-
-                    mounting_area_top = mounting_areas.get("top", {})
-                    mounting_area_down = mounting_areas.get("down", {})
-                    mounting_area_left = mounting_areas.get("left", {})
-                    mounting_area_right = mounting_areas.get("right", {})
-
-                    enclosure_terminals = item.get("enclosure_terminals")
-
-                    Enclosure.objects.update_or_create(
-                        code=code,  # kod produktu (traktuje go jako unikalny identyfikator)
-                        defaults={
-                            "name": name,
-                            "dimension_width": dimension_width,
-                            "dimension_height": dimension_height,
-                            "dimension_depth": dimension_depth,
-                            "price": price,
-
-                            "mounting_area_top_x": mounting_area_top.get("x"),
-                            "mounting_area_top_y": mounting_area_top.get("y"),
-                            "mounting_area_down_x": mounting_area_down.get("x"),
-                            "mounting_area_down_y": mounting_area_down.get("y"),
-                            "mounting_area_left_x": mounting_area_left.get("x"),
-                            "mounting_area_left_y": mounting_area_left.get("y"),
-                            "mounting_area_right_x": mounting_area_right.get("x"),
-                            "mounting_area_right_y": mounting_area_right.get("y"),
-
-                            "enclosure_terminals": enclosure_terminals,
-                        },
+            records = []
+            for item in enclosure_data:
+                try:
+                    name = item["name"]
+                    code = item["code"]
+                    dimension_width = item["dimension_width"]
+                    dimension_height = item["dimension_height"]
+                    dimension_depth = item["dimension_depth"]
+                    price = item["price"]
+                except KeyError as e:
+                    raise CommandError(
+                        f"Brak wymaganych pól w danych obudowy: {e}"
                     )
+
+                mounting_areas = item.get("mounting_areas", {})
+
+                mounting_area_top = mounting_areas.get("top", {})
+                mounting_area_down = mounting_areas.get("down", {})
+                mounting_area_left = mounting_areas.get("left", {})
+                mounting_area_right = mounting_areas.get("right", {})
+
+                records.append({
+                    "code": code,  # kod produktu (traktuje go jako unikalny identyfikator)
+                    "name": name,
+                    "dimension_width": dimension_width,
+                    "dimension_height": dimension_height,
+                    "dimension_depth": dimension_depth,
+                    "price": price,
+
+                    "mounting_area_top_x": mounting_area_top.get("x"),
+                    "mounting_area_top_y": mounting_area_top.get("y"),
+                    "mounting_area_down_x": mounting_area_down.get("x"),
+                    "mounting_area_down_y": mounting_area_down.get("y"),
+                    "mounting_area_left_x": mounting_area_left.get("x"),
+                    "mounting_area_left_y": mounting_area_left.get("y"),
+                    "mounting_area_right_x": mounting_area_right.get("x"),
+                    "mounting_area_right_y": mounting_area_right.get("y"),
+
+                    "enclosure_terminals": item.get("enclosure_terminals"),
+                })
+
+            return plan_catalog_import(Enclosure, "code", records)
+
+        except Exception as exception:
+            raise CommandError(
+                f"Import obudów elektrycznych nie powiódł się. Powód: {exception}"
+            ) from exception
+
+    def _save_enclosure_data(self, plan: CatalogImportPlan):
+        """
+        Zapisuje nowe i zmienione obudowy elektryczne do bazy danych.
+
+        Parametry
+            plan (CatalogImportPlan): Różnica między plikiem a bazą danych.
+        """
+        try:
+            apply_catalog_import(plan)
         except Exception as exception:
             raise CommandError(
                 f"Import obudów elektrycznych nie powiódł się. Powód: {exception}"
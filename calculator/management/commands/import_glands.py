@@ -7,6 +7,12 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
 from calculator.models import Gland
+from calculator.services.catalog_import import (
+    CatalogImportPlan,
+    apply_catalog_import,
+    plan_catalog_import,
+)
+from calculator.services.price_lists import parse_effective_from, record_price_list
 
 
 class Command(BaseCommand):
@@ -25,6 +31,16 @@ class Command(BaseCommand):
             type=str,
             help="Ścieżka do pliku JSON (np. fixtures/enclosures.json)",
         )
+        parser.add_argument(
+            "--effective-from",
+            type=str,
+            help="Od kiedy obowiązują importowane ceny (YYYY-MM-DD lub ISO 8601, domyślnie teraz)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Nie zapisuj zmian - wypisz tylko nowe, zmienione i brakujące produkty",
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(
@@ -39,7 +55,36 @@ class Command(BaseCommand):
             self.style.MIGRATE_HEADING("Zapisywanie danych dławików kablowych do bazy danych...")
         )
 
-        self._save_enclosure_data(enclosure_fixtures)
+        try:
+            effective_from = (
+                parse_effective_from(options["effective_from"])
+                if options["effective_from"] else None
+            )
+        except ValueError as exception:
+            raise CommandError(str(exception))
+
+        plan = self._plan_import(enclosure_fixtures)
+        self.stdout.write(f"Dławiki - {plan.summary()}")
+
+        if options["dry_run"]:
+            for line in plan.diff_lines():
+                self.stdout.write(line)
+            self.stdout.write("Tryb --dry-run: baza danych nie została zmieniona.")
+            return
+
+        if plan.has_changes:
+            # Import i wersja cennika w jednej transakcji - ceny w katalogu i w historii
+            # zmieniają się razem.
+            with transaction.atomic():
+                self._save_enclosure_data(plan)
+                version = record_price_list(
+                    effective_from, source=f"import_glands {options['file_path']}"
+                )
+
+            if version is not None:
+                self.stdout.write(
+                    f"Zapisano wersję cennika {version.pk} obowiązującą od {version.effective_from}"
+                )
 
         self.stdout.write(
             self.style.SUCCESS('Import dławików kablowych zakończony pomyślnie.')
@@ -68,44 +113,49 @@ class Command(BaseCommand):
 
         return data
 
-    def _save_enclosure_data(self, enclosure_data: list[dict]):
+    def _plan_import(self, enclosure_data: list[dict]) -> CatalogImportPlan:
         """
-        Zapisuje dane dławików kablowych do bazy danych.
+        Porównuje dane dławików kablowych z pliku z bazą danych.
 
         Parametry
             enclosure_data (list[dict]): Lista danymi dławików kablowych.
         """
         try:
-            with transaction.atomic():
-                for item in enclosure_data:
-                    try:
-                        size = item["size"]
-                        diameter_mm = item["diameter_mm"]
-                        physical_diameter_mm = item["physical_diameter_mm"]
-                        cable_range_min = item["cable_range_min"]
-                        cable_range_max = item["cable_range_max"]
-                        material = item["material"]
-                        price = item["price"]
-                        catalog_number = item["catalog_number"]
-                    except KeyError as e:
-                        raise CommandError(
-                            f"Brak wymaganych pól w danych dławika kablowego: {e}"
-                        )
-
-                    Gland.objects.update_or_create(
+            records = []
+            for item in enclosure_data:
+                try:
+                    records.append({
                         # numer katalogowy (traktuje go jako unikalny identyfikator)
-                        catalog_number=catalog_number,
-                        defaults={
-                            "size": size,
-                            "diameter_mm": diameter_mm,
-                            "physical_diameter_mm": physical_diameter_mm,
-                            "cable_range_min": cable_range_min,
-                            "cable_range_max": cable_range_max,
-                            "material": material,
-                            "price": price,
-                        },
+                        "catalog_number": item["catalog_number"],
+                        "size": item["size"],
+                        "diameter_mm": item["diameter_mm"],
+                        "physical_diameter_mm": item["physical_diameter_mm"],
+                        "cable_range_min": item["cable_range_min"],
+                        "cable_range_max": item["cable_range_max"],
+                        "material": item["material"],
+                        "price": item["price"],
+                    })
+                except KeyError as e:
+                    raise CommandError(
+                        f"Brak wymaganych pól w danych dławika kablowego: {e}"
                     )
 
+            return plan_catalog_import(Gland, "catalog_number", records)
+
+        except Exception as exception:
+            raise CommandError(
+                f"Import dławików kablowych nie powiódł się. Powód: {exception}"
+            ) from exception
+
+    def _save_enclosure_data(self, plan: CatalogImportPlan):
+        """
+        Zapisuje nowe i zmienione dławiki kablowe do bazy danych.
+
+        Parametry
+            plan (CatalogImportPlan): Różnica między plikiem a bazą danych.
+        """
+        try:
+            apply_catalog_import(plan)
         except Exception as exception:
             raise CommandError(
                 f"Import dławików kablowych nie powiódł się. Powód: {exception}"
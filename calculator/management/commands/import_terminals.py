@@ -7,6 +7,12 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
 from calculator.models import Terminal
+from calculator.services.catalog_import import (
+    CatalogImportPlan,
+    apply_catalog_import,
+    plan_catalog_import,
+)
+from calculator.services.price_lists import parse_effective_from, record_price_list
 
 
 class Command(BaseCommand):
@@ -25,6 +31,16 @@ class Command(BaseCommand):
             type=str,
             help="Ścieżka do pliku JSON (np. fixtures/terminals.json)",
         )
+        parser.add_argument(
+            "--effective-from",
+            type=str,
+            help="Od kiedy obowiązują importowane ceny (YYYY-MM-DD lub ISO 8601, domyślnie teraz)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Nie zapisuj zmian - wypisz tylko nowe, zmienione i brakujące produkty",
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(
@@ -40,7 +56,36 @@ class Command(BaseCommand):
                 "Zapisywanie danych terminali elektrycznych do bazy danych...")
         )
 
-        self._save_enclosure_data(enclosure_fixtures)
+        try:
+            effective_from = (
+                parse_effective_from(options["effective_from"])
+                if options["effective_from"] else None
+            )
+        except ValueError as exception:
+            raise CommandError(str(exception))
+
+        plan = self._plan_import(enclosure_fixtures)
+        self.stdout.write(f"Terminale - {plan.summary()}")
+
+        if options["dry_run"]:
+            for line in plan.diff_lines():
+                self.stdout.write(line)
+            self.stdout.write("Tryb --dry-run: baza danych nie została zmieniona.")
+            return
+
+        if plan.has_changes:
+            # Import i wersja cennika w jednej transakcji - ceny w katalogu i w historii
+            # zmieniają się razem.
+            with transaction.atomic():
+                self._save_enclosure_data(plan)
+                version = record_price_list(
+                    effective_from, source=f"import_terminals {options['file_path']}"
+                )
+
+            if version is not None:
+                self.stdout.write(
+                    f"Zapisano wersję cennika {version.pk} obowiązującą od {version.effective_from}"
+                )
 
         self.stdout.write(
             self.style.SUCCESS('Import terminali elektrycznych zakończony pomyślnie.')
@@ -69,42 +114,48 @@ class Command(BaseCommand):
 
         return data
 
-    def _save_enclosure_data(self, enclosure_data: list[dict]):
+    def _plan_import(self, enclosure_data: list[dict]) -> CatalogImportPlan:
         """
-        Zapisuje dane terminali elektrycznych do bazy danych.
+        Porównuje dane terminali elektrycznych z pliku z bazą danych.
 
         Parametry
             enclosure_data (list[dict]): Lista danymi terminali elektrycznych.
         """
         try:
-            with transaction.atomic():
-                for item in enclosure_data:
-                    try:
-                        wire_cross_section = item["wire_cross_section"]
-                        width_mm = item["width_mm"]
-                        color = item["color"]
-                        voltage = item["voltage"]
-                        price = item["price"]
-                        current = item["current"]
-                        catalog_number = item["catalog_number"]
-                    except KeyError as e:
-                        raise CommandError(
-                            f"Brak wymaganych pól w danych dławika kablowego: {e}"
-                        )
-
-                    Terminal.objects.update_or_create(
+            records = []
+            for item in enclosure_data:
+                try:
+                    records.append({
                         # numer katalogowy (traktuje go jako unikalny identyfikator)
-                        catalog_number=catalog_number,
-                        defaults={
-                            "wire_cross_section": wire_cross_section,
-                            "width_mm": width_mm,
-                            "color": color,
-                            "voltage": voltage,
-                            "price": price,
-                            "current": current,
-                        },
+                        "catalog_number": item["catalog_number"],
+                        "wire_cross_section": item["wire_cross_section"],
+                        "width_mm": item["width_mm"],
+                        "color": item["color"],
+                        "voltage": item["voltage"],
+                        "price": item["price"],
+                        "current": item["current"],
+                    })
+                except KeyError as e:
+                    raise CommandError(
+                        f"Brak wymaganych pól w danych terminala: {e}"
                     )
 
+            return plan_catalog_import(Terminal, "catalog_number", records)
+
+        except Exception as exception:
+            raise CommandError(
+                f"Import terminali elektrycznych nie powiódł się. Powód: {exception}"
+            ) from exception
+
+    def _save_enclosure_data(self, plan: CatalogImportPlan):
+        """
+        Zapisuje nowe i zmienione terminale elektryczne do bazy danych.
+
+        Parametry
+            plan (CatalogImportPlan): Różnica między plikiem a bazą danych.
+        """
+        try:
+            apply_catalog_import(plan)
         except Exception as exception:
             raise CommandError(
                 f"Import terminali elektrycznych nie powiódł się. Powód: {exception}"
@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from calculator.models import OrderItemIndex, SimpleOrder
+from calculator.services.order_item_index import order_item_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Przebudowuje indeks pozycji zamówień (OrderItemIndex) - np. dla zamówień "
+        "zapisanych przed jego wprowadzeniem."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Dodaje argumenty do komendy zarządzania.
+
+        Parametry
+            parser: obiekt parsera argumentów
+        """
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Liczba zamówień indeksowanych w jednej transakcji (domyślnie 500)",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Alias bazy z zamówieniami, np. archive (domyślnie default)",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size, using = options["chunk_size"], options["database"]
+        if chunk_size < 1:
+            raise CommandError("--chunk-size musi być większe od 0")
+        if using not in connections.settings:
+            raise CommandError(f"Brak bazy '{using}' w DATABASES")
+
+        indexed = rows = 0
+        last_pk = None
+        started = time.perf_counter()
+        while True:
+            queryset = SimpleOrder.objects.using(using).order_by("pk")
+            if last_pk is not None:
+                queryset = queryset.filter(pk__gt=last_pk)
+            orders = [
+                SimpleOrder(pk=pk, order_data=order_data)
+                for pk, order_data in queryset.values_list("pk", "order_data")[:chunk_size]
+            ]
+            if not orders:
+                break
+
+            items = [row for order in orders for row in order_item_rows(order)]
+            with transaction.atomic(using=using):
+                OrderItemIndex.objects.using(using).filter(
+                    order_id__in=[order.pk for order in orders]
+                ).delete()
+                OrderItemIndex.objects.using(using).bulk_create(items)
+
+            indexed += len(orders)
+            rows += len(items)
+            last_pk = orders[-1].pk
+            self.stdout.write(f"Zaindeksowano zamówień: {indexed}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indeks pozycji ({using}): {indexed} zamówień, {rows} pozycji "
+            f"w {time.perf_counter() - started:.1f} s"
+        ))
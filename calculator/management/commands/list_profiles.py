@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from calculator.infrastructure.profiling import (
+    PROFILE_SUFFIX,
+    get_profiles_directory,
+    list_profiles,
+    summarize_profile,
+)
+
+
+class Command(BaseCommand):
+    help = "Wyświetla profile żądań API zapisane przez hook profilujący (CALCULATOR_PROFILING)."
+
+    def add_arguments(self, parser):
+        """
+        Dodaje argumenty do komendy zarządzania.
+
+        Parametry
+            parser: obiekt parsera argumentów
+        """
+        parser.add_argument(
+            "profile_id",
+            nargs="?",
+            help="Identyfikator profilu do podsumowania (bez niego wyświetlana jest lista profili)",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=20,
+            help="Liczba funkcji w podsumowaniu profilu (domyślnie 20)",
+        )
+        parser.add_argument(
+            "--sort",
+            default="cumulative",
+            help="Klucz sortowania pstats, np. cumulative lub tottime (domyślnie cumulative)",
+        )
+
+    def handle(self, *args, **options):
+        directory = get_profiles_directory()
+        profiles = list_profiles(directory)
+
+        if options["profile_id"]:
+            self._print_profile_summary(directory, profiles, options)
+            return
+
+        if not profiles:
+            self.stdout.write(f"Brak zapisanych profili w katalogu: {directory}")
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Zapisane profile ({len(profiles)}):"))
+        for profile in profiles:
+            counts = profile["counts"]
+            self.stdout.write(
+                f"{profile['profile_id']}  {profile['method']} {profile['path']}  "
+                f"{profile['duration_ms']:.1f} ms  [{profile['reason']}]  "
+                f"obudowy={counts['boxes']} dławiki={counts['glands']} "
+                f"terminale={counts['terminals']}"
+            )
+
+        durations = sorted(profile["duration_ms"] for profile in profiles)
+        self.stdout.write(
+            f"Czas trwania: min {durations[0]:.1f} ms, "
+            f"mediana {durations[len(durations) // 2]:.1f} ms, "
+            f"max {durations[-1]:.1f} ms"
+        )
+
+    def _print_profile_summary(self, directory, profiles, options):
+        """
+        Wyświetla metadane i najkosztowniejsze funkcje wybranego profilu.
+        """
+        profile_id = options["profile_id"]
+        metadata = next((p for p in profiles if p["profile_id"] == profile_id), None)
+        profile_path = directory / f"{profile_id}{PROFILE_SUFFIX}"
+
+        if metadata is None or not profile_path.exists():
+            raise CommandError(f"Nie znaleziono profilu: {profile_id}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{metadata['method']} {metadata['path']} - {metadata['duration_ms']:.1f} ms "
+            f"({metadata['backend']}, {metadata['reason']})"
+        ))
+        self.stdout.write(summarize_profile(profile_path, options["limit"], options["sort"]))
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from calculator.models import PriceListVersion
+from calculator.services.price_lists import parse_effective_from, record_price_list
+
+
+class Command(BaseCommand):
+    help = (
+        "Zapisuje aktualne ceny katalogu jako nową wersję cennika (np. pierwszą wersję "
+        "albo po zmianie cen poza komendami importu)."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Dodaje argumenty do komendy zarządzania.
+
+        Parametry
+            parser: obiekt parsera argumentów
+        """
+        parser.add_argument(
+            "--effective-from",
+            type=str,
+            help="Od kiedy obowiązują ceny (YYYY-MM-DD lub ISO 8601, domyślnie teraz)",
+        )
+        parser.add_argument(
+            "--source",
+            type=str,
+            default="record_price_list",
+            help="Opis źródła cen zapisywany z wersją",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            effective_from = (
+                parse_effective_from(options["effective_from"])
+                if options["effective_from"] else None
+            )
+        except ValueError as exception:
+            raise CommandError(str(exception))
+
+        version = record_price_list(effective_from, source=options["source"])
+        if version is None:
+            self.stdout.write("Ceny katalogu nie różnią się od obowiązującego cennika")
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Zapisano wersję cennika {version.pk} obowiązującą od {version.effective_from} "
+                f"({version.entries.count()} cen)"
+            ))
+
+        for existing in PriceListVersion.objects.order_by("effective_from", "id"):
+            self.stdout.write(f"  {existing} - {existing.source or 'bez opisu'}")
@@ -0,0 +1,258 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime
+from decimal import Decimal
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from calculator.models import SimpleOrder
+from calculator.services.catalog_snapshot import load_catalog_snapshot
+from calculator.services.price_lists import (
+    PriceListNotFound,
+    PriceListTimeline,
+    price_list_catalog,
+)
+from calculator.services.pricing import (
+    PriceBreakdown,
+    init_pricing_worker,
+    price_orders_chunk,
+)
+
+
+PRICE_FIELDS = ("total_price", "enclosures_price", "glands_price", "terminals_price")
+
+
+class Command(BaseCommand):
+    help = (
+        "Przelicza ceny zapisanych zamówień według aktualnego katalogu "
+        "lub cenników obowiązujących w dniu utworzenia zamówień. "
+        "Zamówienia są czytane strumieniowo i wyceniane paczkami w puli procesów."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Dodaje argumenty do komendy zarządzania.
+
+        Parametry
+            parser: obiekt parsera argumentów
+        """
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Liczba zamówień w jednej paczce (domyślnie 2000)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Liczba procesów wyceniających; 1 oznacza wycenę w bieżącym procesie",
+        )
+        parser.add_argument(
+            "--created-after",
+            type=str,
+            help="Przelicz tylko zamówienia utworzone od podanej daty (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--as-of-created",
+            action="store_true",
+            help="Wyceń każde zamówienie według wersji cennika z dnia jego utworzenia",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Nie zapisuj zmian - wypisz tylko różnice cen",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        workers = options["workers"]
+        if chunk_size < 1 or workers < 1:
+            raise CommandError("--chunk-size i --workers muszą być większe od 0")
+
+        self.dry_run = options["dry_run"]
+        self.stats = {"checked": 0, "changed": 0, "failed": 0}
+
+        catalog = load_catalog_snapshot()
+        queryset = self._get_queryset(options["created_after"])
+        self.timeline = None
+        price_lists = {}
+        if options["as_of_created"]:
+            # Jedna migawka na wersję cennika obowiązującą w okresie przeliczanych zamówień.
+            self.timeline = PriceListTimeline()
+            period = queryset.aggregate(start=Min("created_at"), end=Max("created_at"))
+            if period["start"] is not None:
+                price_lists = {
+                    version_id: price_list_catalog(version_id, catalog)
+                    for version_id in self.timeline.versions_between(period["start"], period["end"])
+                }
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"Przeliczanie zamówień według cenników z dnia utworzenia "
+                f"(wersje: {', '.join(map(str, price_lists)) or 'brak'})..."
+            ))
+        else:
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(
+                    f"Przeliczanie zamówień według katalogu {catalog.version}..."
+                )
+            )
+
+        orders = (
+            queryset
+            .values_list("id", "order_data", "created_at", "catalog_version", *PRICE_FIELDS)
+            .iterator(chunk_size=chunk_size)
+        )
+        chunks = iter(lambda: list(islice(orders, chunk_size)), [])
+        # Wersja katalogu zapisywana z nowymi cenami (None - aktualny katalog).
+        self.catalog_versions = {
+            None: catalog.version,
+            **{version_id: snapshot.version for version_id, snapshot in price_lists.items()},
+        }
+
+        if workers == 1:
+            init_pricing_worker(catalog, price_lists)
+            for chunk in chunks:
+                groups, current_prices = self._split_chunk(chunk)
+                for price_list, orders_to_price in groups.items():
+                    self._apply_results(
+                        price_orders_chunk(orders_to_price, price_list),
+                        current_prices,
+                        self.catalog_versions[price_list],
+                    )
+        else:
+            self._reprice_in_pool(chunks, catalog, price_lists, workers)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Sprawdzono zamówień: {self.stats['checked']}, "
+            f"{'do zmiany' if self.dry_run else 'zmienionych'}: {self.stats['changed']}, "
+            f"błędów: {self.stats['failed']}."
+        ))
+
+    def _get_queryset(self, created_after: str | None):
+        queryset = SimpleOrder.objects.order_by("pk")
+        if created_after:
+            try:
+                date = datetime.strptime(created_after, "%Y-%m-%d")
+            except ValueError:
+                raise CommandError(f"Nieprawidłowy format daty: {created_after}")
+            queryset = queryset.filter(created_at__gte=timezone.make_aware(date))
+
+        return queryset
+
+    def _reprice_in_pool(self, chunks, catalog, price_lists, workers: int):
+        """
+        Wycenia paczki w puli procesów, trzymając w pamięci najwyżej 2 paczki na proces.
+        """
+        # Procesy potomne nie mogą dziedziczyć otwartych połączeń z bazą.
+        connections.close_all()
+
+        max_in_flight = workers * 2
+        in_flight: dict[Future, tuple[dict, str]] = {}
+
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=init_pricing_worker, initargs=(catalog, price_lists)
+        ) as executor:
+            for chunk in chunks:
+                groups, current_prices = self._split_chunk(chunk)
+                for price_list, orders_to_price in groups.items():
+                    future = executor.submit(price_orders_chunk, orders_to_price, price_list)
+                    in_flight[future] = (current_prices, self.catalog_versions[price_list])
+
+                while len(in_flight) >= max_in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for finished in done:
+                        self._apply_results(finished.result(), *in_flight.pop(finished))
+
+            for finished in list(in_flight):
+                self._apply_results(finished.result(), *in_flight.pop(finished))
+
+    def _split_chunk(self, chunk: list[tuple]) -> tuple[dict[int | None, list[tuple]], dict]:
+        """
+        Rozdziela wiersze paczki na dane do wyceny (id, order_data) pogrupowane według
+        wersji cennika (None - aktualny katalog) i aktualne ceny zamówień (według id)
+        razem z wersją katalogu, z której pochodzą.
+        """
+        groups: dict[int | None, list[tuple]] = {}
+        current_prices = {}
+        missing = []
+        for order_id, order_data, created_at, catalog_version, *prices in chunk:
+            current_prices[order_id] = (tuple(prices), catalog_version)
+            price_list = None
+            if self.timeline is not None:
+                try:
+                    price_list = self.timeline.version_at(created_at)
+                except PriceListNotFound as exception:
+                    missing.append((order_id, None, str(exception)))
+                    continue
+            groups.setdefault(price_list, []).append((order_id, order_data))
+
+        self._apply_results(missing, current_prices, None)
+        return groups, current_prices
+
+    def _apply_results(self, results, current_prices: dict, catalog_version: str | None):
+        """
+        Porównuje nowe ceny z aktualnymi i zapisuje zmienione zamówienia jednym bulk_update.
+
+        Razem z cenami zapisywana jest wersja katalogu (lub cennika), z której pochodzą -
+        duplikowanie zamówień porównuje ją z aktualnym katalogiem.
+        """
+        changed_orders = []
+        now = timezone.now()
+
+        for order_id, breakdown, error in results:
+            self.stats["checked"] += 1
+            if breakdown is None:
+                self.stats["failed"] += 1
+                self.stderr.write(f"{order_id}: nie można przeliczyć ceny. Powód: {error}")
+                continue
+
+            new_prices = self._as_price_fields(breakdown)
+            old_prices, old_version = current_prices[order_id]
+            if new_prices == old_prices and catalog_version == old_version:
+                continue
+
+            self.stats["changed"] += 1
+            if self.dry_run:
+                if new_prices == old_prices:
+                    self.stdout.write(
+                        f"{order_id}: ceny bez zmian, wersja katalogu "
+                        f"{old_version or '-'} -> {catalog_version}"
+                    )
+                else:
+                    self.stdout.write(
+                        f"{order_id}: {old_prices[0]} -> {new_prices[0]} PLN "
+                        f"(obudowy {old_prices[1]} -> {new_prices[1]}, "
+                        f"dławiki {old_prices[2]} -> {new_prices[2]}, "
+                        f"terminale {old_prices[3]} -> {new_prices[3]})"
+                    )
+                continue
+
+            changed_orders.append(SimpleOrder(
+                id=order_id,
+                updated_at=now,
+                catalog_version=catalog_version,
+                **dict(zip(PRICE_FIELDS, new_prices)),
+            ))
+
+        if changed_orders:
+            with transaction.atomic():
+                SimpleOrder.objects.bulk_update(
+                    changed_orders, [*PRICE_FIELDS, "catalog_version", "updated_at"]
+                )
+
+    @staticmethod
+    def _as_price_fields(breakdown: PriceBreakdown) -> tuple[Decimal, ...]:
+        cents = Decimal('0.01')
+        return tuple(
+            value.quantize(cents)
+            for value in (
+                breakdown.total_price,
+                breakdown.enclosures_price,
+                breakdown.glands_price,
+                breakdown.terminals_price,
+            )
+        )
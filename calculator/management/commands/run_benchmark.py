@@ -0,0 +1,59 @@
+import argparse
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from calculator.benchmarks import BENCHMARKS, BenchmarkReport, get_benchmark
+
+
+class Command(BaseCommand):
+    help = "Uruchamia benchmark wydajności kalkulatora (opcje: run_benchmark <nazwa> -h)."
+
+    def add_arguments(self, parser):
+        """
+        Dodaje argumenty do komendy zarządzania.
+
+        Opcje benchmarku są parsowane dopiero w handle() - importowany jest tylko
+        wybrany moduł (import wszystkich zaburzałby np. benchmark startup).
+
+        Parametry
+            parser: obiekt parsera argumentów
+        """
+        parser.add_argument("benchmark", choices=list(BENCHMARKS), help="Nazwa benchmarku")
+        parser.add_argument(
+            "benchmark_options",
+            nargs=argparse.REMAINDER,
+            help="Opcje benchmarku (lista: run_benchmark <nazwa> -h)",
+        )
+
+    def handle(self, *args, **options):
+        name = options["benchmark"]
+        benchmark = get_benchmark(name)
+        parser = CommandParser(
+            prog=f"run_benchmark {name}",
+            description=(benchmark.__doc__ or "").strip().split("\n")[0],
+            called_from_command_line=self._called_from_command_line,
+        )
+        if hasattr(benchmark, "add_arguments"):
+            benchmark.add_arguments(parser)
+        options.update(vars(parser.parse_args(options.pop("benchmark_options"))))
+
+        report = benchmark.run(**options)
+        self._print_report(report)
+        if report.failures:
+            raise CommandError("; ".join(report.failures))
+
+    def _print_report(self, report: BenchmarkReport):
+        rows = [[str(value) for value in row] for row in report.rows]
+        widths = [
+            max(len(column), *(len(row[index]) for row in rows)) if rows else len(column)
+            for index, column in enumerate(report.columns)
+        ]
+
+        self.stdout.write(self.style.MIGRATE_HEADING(report.title))
+        self.stdout.write(
+            "  ".join(column.ljust(width) for column, width in zip(report.columns, widths))
+        )
+        for row in rows:
+            self.stdout.write("  ".join(value.ljust(width) for value, width in zip(row, widths)))
+        for note in report.notes:
+            self.stdout.write(f"* {note}")
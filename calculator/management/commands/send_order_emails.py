@@ -0,0 +1,73 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from calculator.services.email_service import (
+    OrderEmailService,
+    get_order_emails_settings,
+    open_mail_connection,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Wysyła oczekujące emaile z kolejki zamówień paczkami przez jedno połączenie SMTP."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Dodaje argumenty do komendy zarządzania.
+
+        Parametry
+            parser: obiekt parsera argumentów
+        """
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=get_order_emails_settings()["BATCH_SIZE"],
+            help="Liczba emaili wysyłanych w jednej paczce",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Działaj jako proces roboczy - po opróżnieniu kolejki czekaj na nowe emaile",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Przerwa w sekundach między sprawdzeniami pustej kolejki (z --loop)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size musi być większe od 0")
+
+        service = OrderEmailService()
+        connection = open_mail_connection()
+        total_sent = total_failed = 0
+
+        try:
+            while True:
+                result = service.send_pending(connection, batch_size)
+                total_sent += result.sent
+                total_failed += result.failed
+
+                if result.sent or result.failed:
+                    self.stdout.write(
+                        f"Wysłano: {result.sent}, błędów: {result.failed}"
+                    )
+                    continue
+
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wysyłka zakończona. Wysłano: {total_sent}, błędów: {total_failed}."
+        ))
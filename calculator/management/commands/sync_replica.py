@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Kopiuje bazę główną SQLite do pliku repliki (lokalny odpowiednik replikacji, "
+        "zob. mysite.db_router)."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Dodaje argumenty do komendy zarządzania.
+
+        Parametry
+            parser: obiekt parsera argumentów
+        """
+        parser.add_argument(
+            "--replica",
+            default="replica",
+            help="Alias bazy repliki w DATABASES (domyślnie replica)",
+        )
+
+    def handle(self, *args, **options):
+        alias = options["replica"]
+        if alias not in connections.settings:
+            raise CommandError(f"Brak bazy '{alias}' w DATABASES")
+
+        primary, replica = connections[DEFAULT_DB_ALIAS], connections[alias]
+        if primary.vendor != "sqlite" or replica.vendor != "sqlite":
+            raise CommandError(
+                "sync_replica obsługuje tylko SQLite - "
+                "replikację innych baz konfiguruje się w serwerze bazy"
+            )
+        if str(primary.settings_dict["NAME"]) == str(replica.settings_dict["NAME"]):
+            self.stdout.write(
+                f"Replika '{alias}' wskazuje na plik bazy głównej - nie ma czego kopiować"
+            )
+            return
+
+        primary.ensure_connection()
+        replica.ensure_connection()
+        started = time.perf_counter()
+        # Backup API SQLite - spójna kopia bez blokowania zapisów do bazy głównej
+        # na cały czas kopiowania.
+        primary.connection.backup(replica.connection, pages=1024)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Skopiowano {primary.settings_dict['NAME']} -> {replica.settings_dict['NAME']} "
+            f"w {(time.perf_counter() - started) * 1000:.0f} ms"
+        ))
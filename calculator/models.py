@@ -2,6 +2,8 @@ from django.db import models
 from decimal import Decimal
 import uuid
 
+from calculator.fields import CompressedJSONField
+
 
 class Enclosure(models.Model):
     """
@@ -25,6 +27,7 @@ class Enclosure(models.Model):
         mounting_area_right_y: Współrzędna Y prawego obszaru montażowego (FloatField, null=True).
 
         enclosure_terminals: Pojemność terminali w formacie JSON (JSONField, null=True). 
+        content_hash: Skrót SHA-256 danych z ostatniego importu (CharField, max 64).
     """
     name = models.CharField(max_length=200)
     code = models.CharField(max_length=50, unique=True)
@@ -44,6 +47,8 @@ class Enclosure(models.Model):
 
     enclosure_terminals = models.JSONField(null=True)
 
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+
 
 class Gland(models.Model):
     """
@@ -58,6 +63,7 @@ class Gland(models.Model):
         material: Materiał dławika (CharField, max 20) - "PA" lub "Brass".
         price: Cena dławika (DecimalField).
         catalog_number: Numer katalogowy dławika (CharField, max 50).
+        content_hash: Skrót SHA-256 danych z ostatniego importu (CharField, max 64).
     """
     class Material(models.TextChoices):
         """
@@ -75,6 +81,8 @@ class Gland(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     catalog_number = models.CharField(max_length=50)
 
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+
 
 class Terminal(models.Model):
     """
@@ -88,6 +96,7 @@ class Terminal(models.Model):
         current: Prąd terminala w amperach (FloatField).
         price: Cena terminala (DecimalField).
         catalog_number: Numer katalogowy terminala (CharField, max 50).
+        content_hash: Skrót SHA-256 danych z ostatniego importu (CharField, max 64).
     """
     wire_cross_section = models.CharField(max_length=10)
     width_mm = models.FloatField()
@@ -97,6 +106,8 @@ class Terminal(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     catalog_number = models.CharField(max_length=50)
 
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+
 
 class SimpleOrder(models.Model):
     """
@@ -128,7 +139,7 @@ class SimpleOrder(models.Model):
     )
 
     # Dane zamówienia (JSON)
-    order_data = models.JSONField(
+    order_data = CompressedJSONField(
         help_text="Kompletne dane zamówienia (obudowy, dławiki, terminale)"
     )
 
@@ -161,13 +172,20 @@ class SimpleOrder(models.Model):
         help_text="Suma cen terminali"
     )
 
+    catalog_version = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        help_text="Wersja katalogu użyta do wyceny (zob. CatalogSnapshot.version)"
+    )
+
     # Status walidacji geometrycznej
     geometry_validation_passed = models.BooleanField(
         default=False,
         help_text="Czy walidacja geometryczna przeszła pomyślnie"
     )
 
-    geometry_validation_errors = models.JSONField(
+    geometry_validation_errors = CompressedJSONField(
         null=True,
         blank=True,
         help_text="Błędy walidacji geometrycznej (jeśli były)"
@@ -189,6 +207,10 @@ class SimpleOrder(models.Model):
         verbose_name = 'Zamówienie (Simple)'
         verbose_name_plural = 'Zamówienia (Simple)'
         ordering = ['-created_at']
+        indexes = [
+            # Listy zamówień (ordering) i wybór zamówień do archiwum (archive_orders).
+            models.Index(fields=['created_at']),
+        ]
 
     def __str__(self):
         return f"Order {self.id} - {self.customer_name} - {self.total_price} PLN"
@@ -217,3 +239,220 @@ class SimpleOrder(models.Model):
         self.total_price = Decimal('0.00')
         # TODO: Implementacja dla kandydata
         pass
+
+
+class OrderEmailOutbox(models.Model):
+    """
+    Kolejka (outbox) emaili dotyczących zamówień.
+
+    Wpis powstaje w tej samej transakcji co zamówienie, a wysyłką zajmuje się
+    osobny proces (komenda send_order_emails), dzięki czemu czas odpowiedzi API
+    nie zależy od serwera SMTP.
+    """
+
+    class Kind(models.TextChoices):
+        ORDER_CONFIRMATION = "order_confirmation"
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        SENDING = "sending"
+        SENT = "sent"
+        FAILED = "failed"
+
+    order = models.ForeignKey(
+        SimpleOrder,
+        on_delete=models.CASCADE,
+        related_name="emails",
+        help_text="Zamówienie, którego dotyczy email"
+    )
+    kind = models.CharField(
+        max_length=50,
+        choices=Kind.choices,
+        default=Kind.ORDER_CONFIRMATION,
+        help_text="Rodzaj wiadomości"
+    )
+    recipient = models.EmailField(
+        help_text="Adres odbiorcy"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        help_text="Status wysyłki"
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        help_text="Liczba nieudanych prób wysyłki"
+    )
+    last_error = models.TextField(
+        blank=True,
+        null=True,
+        help_text="Ostatni błąd wysyłki"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="Data i czas dodania do kolejki"
+    )
+    claimed_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="Data i czas pobrania do wysyłki (status sending)"
+    )
+    sent_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="Data i czas wysłania"
+    )
+
+    class Meta:
+        db_table = 'order_email_outbox'
+        verbose_name = 'Email zamówienia (outbox)'
+        verbose_name_plural = 'Emaile zamówień (outbox)'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} -> {self.recipient} ({self.status})"
+
+
+class OrderItemIndex(models.Model):
+    """
+    Indeks pozycji zamówień: kody obudów, rozmiary dławików i terminali.
+
+    order_data jest zapisywane jako skompresowany BLOB, więc baza nie może go
+    przeszukać (JSON1, indeksy wyrażeń). Każde zamówienie ma tu po jednym
+    wierszu na różną pozycję; wyszukiwanie zamówień z daną obudową lub dławikiem
+    korzysta z indeksu (kind, code, variant) zamiast dekodować wszystkie zamówienia.
+    Wiersze tworzy calculator.services.order_item_index przy zapisie zamówienia.
+    """
+
+    class Kind(models.TextChoices):
+        ENCLOSURE = "enclosure"
+        GLAND = "gland"
+        TERMINAL = "terminal"
+
+    order = models.ForeignKey(
+        SimpleOrder,
+        on_delete=models.CASCADE,
+        related_name="item_index",
+        help_text="Zamówienie zawierające pozycję"
+    )
+    kind = models.CharField(
+        max_length=20,
+        choices=Kind.choices,
+        help_text="Rodzaj pozycji"
+    )
+    code = models.CharField(
+        max_length=100,
+        help_text="Kod obudowy albo rozmiar dławika / terminala"
+    )
+    variant = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        help_text="Materiał dławika lub kolor terminala (puste dla obudów)"
+    )
+
+    class Meta:
+        db_table = 'order_item_index'
+        verbose_name = 'Pozycja zamówienia (indeks)'
+        verbose_name_plural = 'Pozycje zamówień (indeks)'
+        constraints = [
+            # Indeks wyszukiwania: order_id na końcu - zapytanie o zamówienia
+            # z daną pozycją jest odczytywane w całości z indeksu.
+            models.UniqueConstraint(
+                fields=['kind', 'code', 'variant', 'order'],
+                name='order_item_index_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.code} {self.variant} -> {self.order_id}"
+
+
+class PriceListVersion(models.Model):
+    """
+    Wersja cennika obudów, dławików i terminali (tylko do dopisywania).
+
+    Import produktów nadpisuje ceny w tabelach katalogu, a każda zmiana cen
+    dopisuje nową wersję z kompletem cen (PriceListEntry). Cena "na dzień" to
+    cena z najnowszej wersji o effective_from nie późniejszym niż ten dzień
+    (zob. calculator.services.price_lists). Zapisanych wersji nie zmienia się.
+    """
+    effective_from = models.DateTimeField(
+        db_index=True,
+        help_text="Od kiedy obowiązują ceny tej wersji"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="Data i czas zapisania wersji"
+    )
+    source = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        help_text="Źródło wersji, np. komenda importu i plik"
+    )
+
+    class Meta:
+        db_table = 'price_list_versions'
+        verbose_name = 'Wersja cennika'
+        verbose_name_plural = 'Wersje cennika'
+        ordering = ['effective_from', 'id']
+
+    def __str__(self):
+        return f"Cennik {self.pk} od {self.effective_from:%Y-%m-%d %H:%M}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Price list versions are append-only")
+        super().save(*args, **kwargs)
+
+
+class PriceListEntry(models.Model):
+    """
+    Cena jednego produktu w wersji cennika.
+
+    Atrybuty:
+        kind: Rodzaj produktu.
+        code: Kod obudowy, rozmiar dławika lub przekrój przewodu terminala.
+        variant: Materiał dławika lub kolor terminala (puste dla obudów).
+        price: Cena produktu w tej wersji.
+    """
+
+    class Kind(models.TextChoices):
+        ENCLOSURE = "enclosure"
+        GLAND = "gland"
+        TERMINAL = "terminal"
+
+    version = models.ForeignKey(
+        PriceListVersion,
+        on_delete=models.PROTECT,
+        related_name="entries",
+        help_text="Wersja cennika"
+    )
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    code = models.CharField(max_length=100)
+    variant = models.CharField(max_length=100, blank=True, default='')
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        db_table = 'price_list_entries'
+        verbose_name = 'Cena w cenniku'
+        verbose_name_plural = 'Ceny w cenniku'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['version', 'kind', 'code', 'variant'],
+                name='price_list_entry_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.code} {self.variant}: {self.price}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Price list entries are append-only")
+        super().save(*args, **kwargs)
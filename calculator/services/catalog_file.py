@@ -0,0 +1,319 @@
+"""
+Binarny plik migawki katalogu.
+
+Plik pozwala procesom roboczym wczytać katalog bez zapytań do bazy i bez
+tworzenia instancji modeli. Jest czytany przez mmap, a kolumny liczbowe są
+rozpakowywane w całości przez ``memoryview.cast``, bez parsowania rekord po rekordzie.
+Każdy proces buduje z nich własne rekordy migawki (mapowanie jest zamykane po
+wczytaniu), więc pamięć katalogu nie jest współdzielona między procesami.
+
+Format (little-endian):
+    nagłówek   HEADER: magic "WCAT", wersja formatu, wersja katalogu (16 B ASCII),
+               liczby napisów, obudów, dławików, terminali i pozycji pojemności
+    katalog    offsety kolumn (uint64) w kolejności COLUMNS
+    kolumny    tablice liczb (format ``array``), wyrównane do 8 bajtów
+
+Napisy (kody, nazwy, rozmiary, materiały, kolory, numery katalogowe) są
+zapisane raz w tablicy napisów (offsety + UTF-8), a kolumny zawierają ich
+indeksy. Ceny są zapisane w groszach (int64), brak obszaru montażowego jako NaN.
+"""
+
+import math
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from decimal import Decimal
+from pathlib import Path
+from typing import Literal
+
+from calculator.services.catalog_snapshot import (
+    MOUNTING_SIDES,
+    CatalogSnapshot,
+    EnclosureRecord,
+    GlandRecord,
+    TerminalRecord,
+)
+
+
+MAGIC = b"WCAT"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHH16sIIIII")
+ALIGNMENT = 8
+
+# Typy elementów kolumn w formacie modułu array (i memoryview.cast).
+Typecode = Literal["B", "I", "Q", "d", "i", "q"]
+
+# (nazwa kolumny, typ elementu w formacie modułu array, tabela wyznaczająca liczbę elementów)
+COLUMNS: tuple[tuple[str, Typecode, str], ...] = (
+    ("string_offsets", "Q", "strings+1"),
+    ("string_data", "B", "string_bytes"),
+    ("enclosure_code", "I", "enclosures"),
+    ("enclosure_name", "I", "enclosures"),
+    ("enclosure_price", "q", "enclosures"),
+    ("enclosure_width", "i", "enclosures"),
+    ("enclosure_height", "i", "enclosures"),
+    ("enclosure_depth", "i", "enclosures"),
+    *(
+        (f"enclosure_{side}_{axis}", "d", "enclosures")
+        for side in MOUNTING_SIDES
+        for axis in ("x", "y")
+    ),
+    ("enclosure_capacity_start", "I", "enclosures+1"),
+    ("capacity_size", "I", "capacities"),
+    ("capacity_count", "i", "capacities"),
+    ("gland_size", "I", "glands"),
+    ("gland_material", "I", "glands"),
+    ("gland_price", "q", "glands"),
+    ("gland_diameter", "i", "glands"),
+    ("gland_physical_diameter", "i", "glands"),
+    ("gland_cable_min", "d", "glands"),
+    ("gland_cable_max", "d", "glands"),
+    ("gland_catalog_number", "I", "glands"),
+    ("terminal_size", "I", "terminals"),
+    ("terminal_color", "I", "terminals"),
+    ("terminal_price", "q", "terminals"),
+    ("terminal_width", "d", "terminals"),
+    ("terminal_voltage", "i", "terminals"),
+    ("terminal_current", "d", "terminals"),
+    ("terminal_catalog_number", "I", "terminals"),
+)
+
+
+class CatalogFileError(ValueError):
+    """
+    Plik migawki katalogu jest uszkodzony lub ma nieobsługiwany format.
+    """
+
+
+def _to_cents(price: Decimal) -> int:
+    cents = price.scaleb(2)
+    if cents != cents.to_integral_value():
+        raise CatalogFileError(f"Cena {price} ma więcej niż dwa miejsca po przecinku")
+    return int(cents)
+
+
+def _from_cents(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.indexes: dict[str, int] = {}
+
+    def __call__(self, value: str) -> int:
+        return self.indexes.setdefault(value, len(self.indexes))
+
+
+def encode_catalog(catalog: CatalogSnapshot) -> bytes:
+    """
+    Zwraca migawkę katalogu w formacie binarnym.
+    """
+    strings = _StringTable()
+    enclosures = list(catalog.enclosures.values())
+    glands = list(catalog.glands.values())
+    terminals = list(catalog.terminals.values())
+
+    columns: dict[str, list] = {name: [] for name, _, _ in COLUMNS if name != "string_data"}
+    columns["enclosure_capacity_start"].append(0)
+    for enclosure in enclosures:
+        columns["enclosure_code"].append(strings(enclosure.code))
+        columns["enclosure_name"].append(strings(enclosure.name))
+        columns["enclosure_price"].append(_to_cents(enclosure.price))
+        columns["enclosure_width"].append(enclosure.dimension_width)
+        columns["enclosure_height"].append(enclosure.dimension_height)
+        columns["enclosure_depth"].append(enclosure.dimension_depth)
+        for side in MOUNTING_SIDES:
+            x, y = enclosure.mounting_areas.get(side, (math.nan, math.nan))
+            columns[f"enclosure_{side}_x"].append(x)
+            columns[f"enclosure_{side}_y"].append(y)
+        for size, count in enclosure.terminal_capacity.items():
+            columns["capacity_size"].append(strings(size))
+            columns["capacity_count"].append(count)
+        columns["enclosure_capacity_start"].append(len(columns["capacity_size"]))
+
+    for gland in glands:
+        columns["gland_size"].append(strings(gland.size))
+        columns["gland_material"].append(strings(gland.material))
+        columns["gland_price"].append(_to_cents(gland.price))
+        columns["gland_diameter"].append(gland.diameter_mm)
+        columns["gland_physical_diameter"].append(gland.physical_diameter_mm)
+        columns["gland_cable_min"].append(gland.cable_range_min)
+        columns["gland_cable_max"].append(gland.cable_range_max)
+        columns["gland_catalog_number"].append(strings(gland.catalog_number))
+
+    for terminal in terminals:
+        columns["terminal_size"].append(strings(terminal.wire_cross_section))
+        columns["terminal_color"].append(strings(terminal.color))
+        columns["terminal_price"].append(_to_cents(terminal.price))
+        columns["terminal_width"].append(terminal.width_mm)
+        columns["terminal_voltage"].append(terminal.voltage)
+        columns["terminal_current"].append(terminal.current)
+        columns["terminal_catalog_number"].append(strings(terminal.catalog_number))
+
+    string_data = bytearray()
+    columns["string_offsets"].append(0)
+    for value in strings.indexes:
+        string_data += value.encode("utf-8")
+        columns["string_offsets"].append(len(string_data))
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, 0, catalog.version.encode("ascii").ljust(16, b"\0"),
+        len(strings.indexes), len(enclosures), len(glands), len(terminals),
+        len(columns["capacity_size"]),
+    )
+    directory_size = 8 * len(COLUMNS)
+    position = _align(len(header) + directory_size)
+    offsets = []
+    body = bytearray()
+    for name, typecode, _ in COLUMNS:
+        data = string_data if name == "string_data" else array(typecode, columns[name]).tobytes()
+        offsets.append(position + len(body))
+        body += data
+        body += b"\0" * (_align(len(body)) - len(body))
+
+    directory = struct.pack(f"<{len(COLUMNS)}Q", *offsets)
+    padding = b"\0" * (position - len(header) - directory_size)
+    return header + directory + padding + bytes(body)
+
+
+def _align(size: int) -> int:
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+def write_catalog_file(catalog: CatalogSnapshot, path: str | os.PathLike) -> int:
+    """
+    Zapisuje migawkę katalogu do pliku (atomowo - przez plik tymczasowy i zamianę nazwy).
+
+    Zwraca rozmiar pliku w bajtach.
+    """
+    data = encode_catalog(catalog)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", delete=False) as tmp:
+        tmp.write(data)
+        tmp.flush()
+        os.fsync(tmp.fileno())
+    os.replace(tmp.name, path)
+
+    return len(data)
+
+
+def load_catalog_file(path: str | os.PathLike) -> CatalogSnapshot:
+    """
+    Wczytuje migawkę katalogu z pliku binarnego (mmap, bez zapytań do bazy).
+
+    Rzuca CatalogFileError, jeśli plik nie jest poprawnym plikiem migawki.
+    """
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            return _decode_catalog(view)
+        finally:
+            view.release()
+
+
+def _decode_catalog(view: memoryview) -> CatalogSnapshot:
+    if len(view) < HEADER.size:
+        raise CatalogFileError("Plik migawki katalogu jest za krótki")
+
+    (magic, format_version, _reserved, version, string_count,
+     enclosure_count, gland_count, terminal_count, capacity_count) = HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise CatalogFileError("To nie jest plik migawki katalogu")
+    if format_version != FORMAT_VERSION:
+        raise CatalogFileError(f"Nieobsługiwana wersja formatu migawki: {format_version}")
+
+    offsets = struct.unpack_from(f"<{len(COLUMNS)}Q", view, HEADER.size)
+    lengths = {
+        "strings+1": string_count + 1,
+        "enclosures": enclosure_count,
+        "enclosures+1": enclosure_count + 1,
+        "glands": gland_count,
+        "terminals": terminal_count,
+        "capacities": capacity_count,
+    }
+    string_bytes = 0
+    string_data = b""
+    columns: dict[str, list] = {}
+    for (name, typecode, length_key), offset in zip(COLUMNS, offsets):
+        length = string_bytes if name == "string_data" else lengths[length_key]
+        size = length * struct.calcsize(typecode)
+        if offset + size > len(view):
+            raise CatalogFileError(f"Kolumna {name} wykracza poza plik")
+
+        with view[offset:offset + size] as column, column.cast(typecode) as values:
+            if name == "string_data":
+                string_data = bytes(values)
+            else:
+                columns[name] = values.tolist()
+        if name == "string_offsets":
+            string_bytes = columns[name][-1]
+
+    string_offsets = columns["string_offsets"]
+    strings = [
+        string_data[string_offsets[index]:string_offsets[index + 1]].decode("utf-8")
+        for index in range(string_count)
+    ]
+
+    capacity_start = columns["enclosure_capacity_start"]
+    enclosures = []
+    for index in range(enclosure_count):
+        mounting_areas = {}
+        for side in MOUNTING_SIDES:
+            x = columns[f"enclosure_{side}_x"][index]
+            y = columns[f"enclosure_{side}_y"][index]
+            if not (math.isnan(x) or math.isnan(y)):
+                mounting_areas[side] = (x, y)
+
+        enclosures.append(EnclosureRecord(
+            code=strings[columns["enclosure_code"][index]],
+            name=strings[columns["enclosure_name"][index]],
+            price=_from_cents(columns["enclosure_price"][index]),
+            dimension_width=columns["enclosure_width"][index],
+            dimension_height=columns["enclosure_height"][index],
+            dimension_depth=columns["enclosure_depth"][index],
+            mounting_areas=mounting_areas,
+            terminal_capacity={
+                strings[columns["capacity_size"][position]]: columns["capacity_count"][position]
+                for position in range(capacity_start[index], capacity_start[index + 1])
+            },
+        ))
+
+    glands = [
+        GlandRecord(
+            size=strings[columns["gland_size"][index]],
+            material=strings[columns["gland_material"][index]],
+            price=_from_cents(columns["gland_price"][index]),
+            diameter_mm=columns["gland_diameter"][index],
+            physical_diameter_mm=columns["gland_physical_diameter"][index],
+            cable_range_min=columns["gland_cable_min"][index],
+            cable_range_max=columns["gland_cable_max"][index],
+            catalog_number=strings[columns["gland_catalog_number"][index]],
+        )
+        for index in range(gland_count)
+    ]
+
+    terminals = [
+        TerminalRecord(
+            wire_cross_section=strings[columns["terminal_size"][index]],
+            color=strings[columns["terminal_color"][index]],
+            price=_from_cents(columns["terminal_price"][index]),
+            width_mm=columns["terminal_width"][index],
+            voltage=columns["terminal_voltage"][index],
+            current=columns["terminal_current"][index],
+            catalog_number=strings[columns["terminal_catalog_number"][index]],
+        )
+        for index in range(terminal_count)
+    ]
+
+    return CatalogSnapshot(
+        enclosures={enclosure.code: enclosure for enclosure in enclosures},
+        glands={(gland.size, gland.material): gland for gland in glands},
+        terminals={
+            (terminal.wire_cross_section, terminal.color): terminal for terminal in terminals
+        },
+        version=version.rstrip(b"\0").decode("ascii"),
+    )
@@ -0,0 +1,188 @@
+"""
+Przyrostowy import katalogu produktów (obudowy, dławiki, terminale).
+
+Każdy rekord z pliku dostaje skrót treści (content_hash) liczony z wartości
+pól po normalizacji polami modelu (to_python, a liczby dziesiętne zaokrąglone
+do decimal_places pola), np. "2.50" i 2.5 dla ceny dają ten sam skrót.
+Plan importu czyta istniejące wiersze jednym zapytaniem i porównuje skróty
+według klucza (code lub catalog_number). Niezmienione wiersze są pomijane.
+Nowe wiersze trafiają do bazy przez bulk_create, a zmienione przez
+bulk_update. Wiersze zapisane przed wprowadzeniem skrótu (pusty
+content_hash) są raz zapisywane ponownie, żeby uzupełnić skrót.
+
+Produkty, których nie ma w pliku, są tylko raportowane jako usunięte -
+import ich nie kasuje, bo mogą do nich odwoływać się zapisane zamówienia.
+
+bulk_create i bulk_update nie wysyłają sygnałów post_save, dlatego po
+zatwierdzeniu transakcji migawka katalogu jest unieważniana jawnie.
+"""
+
+import dataclasses
+import hashlib
+import json
+from decimal import Decimal
+from typing import Any, Iterable, Iterator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, models, transaction
+
+from calculator.services.catalog_snapshot import invalidate_catalog_snapshot
+
+
+DEFAULT_CATALOG_IMPORT_SETTINGS = {
+    "BATCH_SIZE": 500,
+}
+
+
+def get_catalog_import_settings() -> dict[str, Any]:
+    """
+    Zwraca ustawienia importu katalogu uzupełnione o wartości domyślne.
+    """
+    return {
+        **DEFAULT_CATALOG_IMPORT_SETTINGS,
+        **getattr(settings, "CALCULATOR_CATALOG_IMPORT", {}),
+    }
+
+
+def content_hash(values: dict[str, Any]) -> str:
+    """
+    Zwraca skrót SHA-256 znormalizowanych wartości pól rekordu.
+    """
+    payload = json.dumps(
+        values, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def normalize_value(field: models.Field, value: Any) -> Any:
+    """
+    Zamienia wartość z pliku na wartość pola modelu w postaci zapisywanej w bazie.
+    """
+    value = field.to_python(value)
+    if isinstance(field, models.DecimalField) and value is not None:
+        value = value.quantize(Decimal(1).scaleb(-field.decimal_places))
+    return value
+
+
+@dataclasses.dataclass(slots=True)
+class CatalogImportPlan:
+    """
+    Różnica między plikiem importu a tabelą katalogu.
+
+    Atrybuty:
+        model: Model katalogu (Enclosure, Gland lub Terminal).
+        key_field: Pole identyfikujące produkt ("code" lub "catalog_number").
+        fields: Pola zapisywane z pliku.
+        added: Nowe (niezapisane) obiekty.
+        changed: Zmienione obiekty (z pk) i lista zmian (pole, stara wartość, nowa wartość).
+        removed: Klucze produktów z bazy, których nie ma w pliku.
+        unchanged: Liczba pominiętych, niezmienionych wierszy.
+        using: Alias bazy danych z katalogiem.
+    """
+    model: type[models.Model]
+    key_field: str
+    fields: list[str]
+    added: list[models.Model] = dataclasses.field(default_factory=list)
+    changed: list[tuple[models.Model, list[tuple[str, Any, Any]]]] = dataclasses.field(
+        default_factory=list
+    )
+    removed: list[str] = dataclasses.field(default_factory=list)
+    unchanged: int = 0
+    using: str = DEFAULT_DB_ALIAS
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.changed)
+
+    def summary(self) -> str:
+        return (
+            f"nowe: {len(self.added)}, zmienione: {len(self.changed)}, "
+            f"bez zmian: {self.unchanged}, brak w pliku: {len(self.removed)}"
+        )
+
+    def diff_lines(self) -> Iterator[str]:
+        """
+        Zwraca różnicę w formacie "+ nowy", "~ zmieniony: pole stara -> nowa", "- brak w pliku".
+        """
+        for instance in self.added:
+            yield f"+ {getattr(instance, self.key_field)}"
+        for instance, changes in self.changed:
+            described = ", ".join(f"{field} {old} -> {new}" for field, old, new in changes)
+            yield f"~ {getattr(instance, self.key_field)}: {described or 'uzupełniono skrót'}"
+        for key in self.removed:
+            yield f"- {key} (pozostaje w bazie)"
+
+
+def plan_catalog_import(
+    model: type[models.Model],
+    key_field: str,
+    records: Iterable[dict[str, Any]],
+    using: str = DEFAULT_DB_ALIAS,
+) -> CatalogImportPlan:
+    """
+    Porównuje rekordy z pliku z tabelą katalogu (jedno zapytanie).
+
+    Parametry:
+        model: Model katalogu.
+        key_field (str): Pole identyfikujące produkt.
+        records (Iterable[dict]): Wartości pól modelu (z key_field) dla każdego produktu.
+            Przy powtórzonym kluczu obowiązuje ostatni rekord, jak przy update_or_create.
+        using (str): Alias bazy danych z katalogiem.
+    """
+    normalized: dict[str, dict[str, Any]] = {}
+    fields: list[str] = []
+    for record in records:
+        if not fields:
+            fields = [name for name in record if name != key_field]
+        values = {
+            name: normalize_value(model._meta.get_field(name), value)
+            for name, value in record.items()
+        }
+        normalized[values[key_field]] = values
+
+    plan = CatalogImportPlan(model=model, key_field=key_field, fields=fields, using=using)
+    existing: dict[str, dict[str, Any]] = {}
+    for row in model.objects.using(using).values("pk", "content_hash", key_field, *fields):
+        if row[key_field] in existing:
+            raise model.MultipleObjectsReturned(
+                f"{model.__name__}: wiele wierszy z {key_field}={row[key_field]}"
+            )
+        existing[row[key_field]] = row
+
+    for key, values in normalized.items():
+        digest = content_hash(values)
+        row = existing.pop(key, None)
+        if row is None:
+            plan.added.append(model(**values, content_hash=digest))
+        elif row["content_hash"] == digest:
+            plan.unchanged += 1
+        else:
+            changes = [
+                (name, row[name], values[name]) for name in fields if row[name] != values[name]
+            ]
+            plan.changed.append((model(pk=row["pk"], **values, content_hash=digest), changes))
+
+    plan.removed = sorted(existing)
+    return plan
+
+
+def apply_catalog_import(plan: CatalogImportPlan, batch_size: int | None = None) -> None:
+    """
+    Zapisuje nowe i zmienione wiersze planu (bulk_create + bulk_update).
+
+    Parametry:
+        plan (CatalogImportPlan): Plan z plan_catalog_import.
+        batch_size (int | None): Liczba wierszy w jednym zapytaniu (domyślnie z ustawień).
+    """
+    batch_size = batch_size or get_catalog_import_settings()["BATCH_SIZE"]
+    objects = plan.model.objects.using(plan.using)
+    with transaction.atomic(using=plan.using):
+        if plan.added:
+            objects.bulk_create(plan.added, batch_size=batch_size)
+        if plan.changed:
+            objects.bulk_update(
+                [instance for instance, _ in plan.changed],
+                [*plan.fields, "content_hash"],
+                batch_size=batch_size,
+            )
+        transaction.on_commit(invalidate_catalog_snapshot, using=plan.using)
@@ -0,0 +1,262 @@
+"""
+Migawka katalogu produktów (obudowy, dławiki, terminale) w pamięci.
+
+Migawka jest ładowana trzema zapytaniami i pozwala wyceniać dowolną liczbę
+zamówień bez kolejnych zapytań do bazy. Jest niemutowalna i daje się
+serializować (pickle), więc można ją przekazać do procesów roboczych.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Mapping
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from calculator.domain.services.enclosure_index import EnclosureIndex
+
+
+MOUNTING_SIDES = ("top", "down", "left", "right")
+
+
+@dataclass(frozen=True)
+class EnclosureRecord:
+    code: str
+    name: str
+    price: Decimal
+    dimension_width: int
+    dimension_height: int
+    dimension_depth: int
+    mounting_areas: Mapping[str, tuple[float, float]]
+    terminal_capacity: Mapping[str, int]
+
+
+@dataclass(frozen=True)
+class GlandRecord:
+    size: str
+    material: str
+    price: Decimal
+    diameter_mm: int
+    physical_diameter_mm: int
+    cable_range_min: float
+    cable_range_max: float
+    catalog_number: str
+
+
+@dataclass(frozen=True)
+class TerminalRecord:
+    wire_cross_section: str
+    color: str
+    price: Decimal
+    width_mm: float
+    voltage: int
+    current: float
+    catalog_number: str
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    Niemutowalna migawka katalogu.
+
+    Atrybuty:
+        enclosures: Obudowy według kodu.
+        glands: Dławiki według pary (rozmiar, materiał).
+        terminals: Terminale według pary (przekrój przewodu, kolor).
+        version: Skrót zawartości katalogu - zmienia się przy każdej zmianie ceny lub wymiarów.
+        enclosure_index: Indeks obudów po wymiarach (budowany razem z migawką).
+    """
+    enclosures: Mapping[str, EnclosureRecord]
+    glands: Mapping[tuple[str, str], GlandRecord]
+    terminals: Mapping[tuple[str, str], TerminalRecord]
+    version: str
+    enclosure_index: EnclosureIndex[EnclosureRecord] = field(
+        init=False, compare=False, repr=False
+    )
+
+    def __post_init__(self):
+        object.__setattr__(self, "enclosure_index", EnclosureIndex(self.enclosures.values()))
+
+
+def build_catalog_snapshot(
+    enclosures: list[EnclosureRecord],
+    glands: list[GlandRecord],
+    terminals: list[TerminalRecord],
+) -> CatalogSnapshot:
+    """
+    Buduje migawkę z rekordów produktów i wylicza jej wersję.
+
+    Przy zduplikowanych kluczach wygrywa pierwszy rekord (rekordy z bazy są
+    sortowane po id), tak aby wynik był deterministyczny.
+    """
+    enclosures_by_code: dict[str, EnclosureRecord] = {}
+    for enclosure in enclosures:
+        enclosures_by_code.setdefault(enclosure.code, enclosure)
+
+    glands_by_key: dict[tuple[str, str], GlandRecord] = {}
+    for gland in glands:
+        glands_by_key.setdefault((gland.size, gland.material), gland)
+
+    terminals_by_key: dict[tuple[str, str], TerminalRecord] = {}
+    for terminal in terminals:
+        terminals_by_key.setdefault((terminal.wire_cross_section, terminal.color), terminal)
+
+    return CatalogSnapshot(
+        enclosures=enclosures_by_code,
+        glands=glands_by_key,
+        terminals=terminals_by_key,
+        version=_compute_version(enclosures_by_code, glands_by_key, terminals_by_key),
+    )
+
+
+def _record_key(item: tuple[str | tuple[str, str], object]) -> str | tuple[str, str]:
+    return item[0]
+
+
+def _compute_version(
+    enclosures: Mapping[str, EnclosureRecord],
+    glands: Mapping[tuple[str, str], GlandRecord],
+    terminals: Mapping[tuple[str, str], TerminalRecord],
+) -> str:
+    digest = hashlib.sha256()
+    for records in (enclosures.items(), glands.items(), terminals.items()):
+        for _, record in sorted(records, key=_record_key):
+            digest.update(repr(record).encode("utf-8"))
+        digest.update(b"\x00")
+
+    return digest.hexdigest()[:16]
+
+
+def load_catalog_snapshot(using: str | None = None) -> CatalogSnapshot:
+    """
+    Ładuje migawkę katalogu z bazy danych (trzy zapytania).
+
+    Parametry:
+        using (str | None): Alias bazy danych (domyślnie wybiera router, np. replika).
+    """
+    from calculator.models import Enclosure, Gland, Terminal
+
+    enclosures = [
+        EnclosureRecord(
+            code=enclosure.code,
+            name=enclosure.name,
+            price=Decimal(enclosure.price),
+            dimension_width=enclosure.dimension_width,
+            dimension_height=enclosure.dimension_height,
+            dimension_depth=enclosure.dimension_depth,
+            mounting_areas={
+                side: (getattr(enclosure, f"mounting_area_{side}_x"),
+                       getattr(enclosure, f"mounting_area_{side}_y"))
+                for side in MOUNTING_SIDES
+                if getattr(enclosure, f"mounting_area_{side}_x") is not None
+                and getattr(enclosure, f"mounting_area_{side}_y") is not None
+            },
+            terminal_capacity=dict(enclosure.enclosure_terminals or {}),
+        )
+        for enclosure in Enclosure.objects.db_manager(using).order_by("id")
+    ]
+
+    glands = [
+        GlandRecord(
+            size=gland.size,
+            material=gland.material,
+            price=Decimal(gland.price),
+            diameter_mm=gland.diameter_mm,
+            physical_diameter_mm=gland.physical_diameter_mm,
+            cable_range_min=gland.cable_range_min,
+            cable_range_max=gland.cable_range_max,
+            catalog_number=gland.catalog_number,
+        )
+        for gland in Gland.objects.db_manager(using).order_by("id")
+    ]
+
+    terminals = [
+        TerminalRecord(
+            wire_cross_section=terminal.wire_cross_section,
+            color=terminal.color,
+            price=Decimal(terminal.price),
+            width_mm=terminal.width_mm,
+            voltage=terminal.voltage,
+            current=terminal.current,
+            catalog_number=terminal.catalog_number,
+        )
+        for terminal in Terminal.objects.db_manager(using).order_by("id")
+    ]
+
+    return build_catalog_snapshot(enclosures, glands, terminals)
+
+
+# Migawka współdzielona przez żądania w obrębie procesu.
+# Jest unieważniana sygnałami przy zapisie produktów (zob. calculator/signals.py)
+# oraz po upływie CALCULATOR_CATALOG_CACHE_SECONDS - zmiany wykonane w innych
+# procesach lub przez QuerySet.update() nie wysyłają sygnałów.
+# Jeśli ustawiono CALCULATOR_CATALOG_FILE, migawka jest czytana z pliku
+# (python manage.py export_catalog) i wczytywana ponownie po jego podmianie.
+
+_cached_snapshot: CatalogSnapshot | None = None
+_cached_at = 0.0
+_cached_file_mtime: int | None = None
+_cache_lock = threading.Lock()
+
+
+def get_catalog_snapshot() -> CatalogSnapshot:
+    """
+    Zwraca migawkę katalogu z pamięci procesu, ładując ją ponownie gdy jest przeterminowana.
+    """
+    global _cached_snapshot, _cached_at, _cached_file_mtime
+
+    catalog_file = getattr(settings, "CALCULATOR_CATALOG_FILE", None)
+    if catalog_file:
+        # Import lokalny - catalog_file korzysta z rekordów tego modułu.
+        from calculator.services.catalog_file import load_catalog_file
+
+        with _cache_lock:
+            mtime = os.stat(catalog_file).st_mtime_ns
+            if _cached_snapshot is None or mtime != _cached_file_mtime:
+                _cached_snapshot = load_catalog_file(catalog_file)
+                _cached_file_mtime = mtime
+
+            return _cached_snapshot
+
+    max_age = getattr(settings, "CALCULATOR_CATALOG_CACHE_SECONDS", 60)
+    with _cache_lock:
+        if _cached_snapshot is None or time.monotonic() - _cached_at > max_age:
+            _cached_snapshot = load_catalog_snapshot()
+            _cached_at = time.monotonic()
+
+        return _cached_snapshot
+
+
+def refresh_catalog_snapshot() -> CatalogSnapshot:
+    """
+    Ładuje aktualną migawkę katalogu z bazy głównej i zapisuje ją w pamięci procesu.
+
+    Dla operacji, które nie mogą użyć migawki sprzed CALCULATOR_CATALOG_CACHE_SECONDS
+    (np. import katalogu w innym procesie nie unieważnia pamięci tego procesu).
+    Przy CALCULATOR_CATALOG_FILE źródłem katalogu jest plik, więc zwraca get_catalog_snapshot().
+    """
+    global _cached_snapshot, _cached_at
+
+    if getattr(settings, "CALCULATOR_CATALOG_FILE", None):
+        return get_catalog_snapshot()
+
+    snapshot = load_catalog_snapshot(using=DEFAULT_DB_ALIAS)
+    with _cache_lock:
+        _cached_snapshot = snapshot
+        _cached_at = time.monotonic()
+
+    return snapshot
+
+
+def invalidate_catalog_snapshot(**kwargs) -> None:
+    """
+    Unieważnia migawkę katalogu w bieżącym procesie (może służyć jako odbiornik sygnału).
+    """
+    global _cached_snapshot
+
+    with _cache_lock:
+        _cached_snapshot = None
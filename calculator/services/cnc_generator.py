@@ -0,0 +1,180 @@
+"""
+Generator programów CNC (G-code) do wiercenia otworów dławików.
+
+Program jest zwracany strumieniowo (generator linii), więc program dla
+całej serii produkcyjnej można zapisać wprost do pliku lub odpowiedzi HTTP
+bez budowania go w pamięci.
+"""
+
+from itertools import groupby
+from typing import Iterable, Iterator
+
+from calculator.domain.order import OrderData
+from calculator.domain.services.drill_path import optimize_drill_path
+from calculator.domain.services.gland_layout_validator import GlandLayout, GlandPosition
+from calculator.services.catalog_snapshot import CatalogSnapshot
+from calculator.services.geometry import compute_box_gland_layouts, glands_data_from_catalog
+
+
+class CNCProgramGenerator:
+    """
+    Generator programów CNC dla otworów dławików.
+
+    Otwory każdej ścianki są grupowane według średnicy wiertła (jedna zmiana
+    narzędzia na średnicę), a w obrębie grupy wiercone w kolejności wyznaczonej
+    heurystyką najbliższego sąsiada poprawioną algorytmem 2-opt.
+    """
+
+    SAFE_HEIGHT = 5.0  # mm nad materiałem
+    FEED_RATE = 100  # mm/min
+    BREAKTHROUGH = 0.5  # mm poniżej materiału
+
+    def generate_gcode(
+        self,
+        layouts: Iterable[GlandLayout],
+        material_thickness: float = 2.0,  # mm
+        drill_speed: int = 3000  # RPM
+    ) -> Iterator[str]:
+        """
+        Generuje G-code dla wiercenia otworów na ściankach jednej obudowy.
+
+        Parametry:
+            layouts (Iterable[GlandLayout]): Rozmieszczenie dławików na ściankach.
+            material_thickness (float): Grubość ścianki w mm.
+            drill_speed (int): Prędkość wrzeciona w RPM.
+        """
+        yield from self._program_header()
+        yield from self._box_body(layouts, material_thickness, drill_speed, current_tool=[None])
+        yield from self._program_footer()
+
+    def generate_order_gcode(
+        self,
+        order: OrderData,
+        catalog: CatalogSnapshot,
+        material_thickness: float = 2.0,
+        drill_speed: int = 3000,
+        expand_quantity: bool = False,
+    ) -> Iterator[str]:
+        """
+        Generuje jeden program dla wszystkich obudów zamówienia.
+
+        Rozmieszczenie dławików jest liczone raz na konfigurację obudowy. Przy
+        ``expand_quantity`` sekcja obudowy jest powtarzana ``quantity`` razy
+        (program dla całej serii), w przeciwnym razie występuje raz z komentarzem o ilości.
+        Kolejność wiercenia zależy tylko od wiertła założonego przed sekcją, więc
+        kolejne sztuki odtwarzają linie policzone dla pierwszej sztuki z tym wiertłem.
+        """
+        glands_data = glands_data_from_catalog(catalog)
+        current_tool: list[float | None] = [None]
+
+        yield from self._program_header()
+
+        for box_number, box in enumerate(order.save_box, 1):
+            enclosure = catalog.enclosures.get(box.code)
+            if enclosure is None:
+                yield f"(ERROR: unknown enclosure {box.code} - box {box_number} skipped)"
+                continue
+
+            layouts = compute_box_gland_layouts(box, enclosure, glands_data)
+            invalid = [layout for layout in layouts if not layout.is_valid]
+            if invalid:
+                yield f"(ERROR: box {box_number} skipped - {invalid[0].message})"
+                continue
+
+            # wiertło przed sekcją -> (linie sekcji, wiertło po sekcji)
+            bodies: dict[float | None, tuple[list[str], float | None]] = {}
+            repeats = box.quantity if expand_quantity else 1
+            for unit in range(1, repeats + 1):
+                yield ""
+                if expand_quantity:
+                    yield f"(Box {box_number} - {enclosure.code} - unit {unit}/{repeats})"
+                else:
+                    yield f"(Box {box_number} - {enclosure.code} - quantity {box.quantity})"
+
+                start_tool = current_tool[0]
+                if start_tool not in bodies:
+                    lines = list(
+                        self._box_body(layouts, material_thickness, drill_speed, current_tool)
+                    )
+                    bodies[start_tool] = (lines, current_tool[0])
+                lines, current_tool[0] = bodies[start_tool]
+                yield from lines
+
+        yield from self._program_footer()
+
+    def _program_header(self) -> Iterator[str]:
+        yield "G21 (Millimeter mode)"
+        yield "G90 (Absolute positioning)"
+        yield f"G00 Z{self.SAFE_HEIGHT:.1f} (Safe height)"
+
+    def _program_footer(self) -> Iterator[str]:
+        yield ""
+        yield "M05 (Spindle off)"
+        yield "M30 (End program)"
+
+    def _box_body(
+        self,
+        layouts: Iterable[GlandLayout],
+        material_thickness: float,
+        drill_speed: int,
+        current_tool: list[float | None],
+    ) -> Iterator[str]:
+        """
+        Generuje wiercenie wszystkich ścianek obudowy.
+
+        ``current_tool`` to jednoelementowa lista z aktualnie założonym wiertłem -
+        współdzielona między obudowami, aby pomijać zbędne zmiany narzędzia.
+        """
+        depth = material_thickness + self.BREAKTHROUGH
+        hole_number = 0
+
+        for layout in layouts:
+            if not layout.positions:
+                continue
+
+            yield ""
+            yield f"M00 (Mount side {layout.side})"
+
+            for hole_diameter, positions in self._group_by_tool(layout.positions, current_tool[0]):
+                if hole_diameter != current_tool[0]:
+                    yield "M05 (Spindle off)"
+                    yield f"T{self._tool_number(hole_diameter)} M06 (Drill {hole_diameter:g} mm)"
+                    yield f"M03 S{drill_speed} (Spindle on)"
+                    current_tool[0] = hole_diameter
+
+                points = [(position.x, position.y) for position in positions]
+                for index in optimize_drill_path(points):
+                    hole_number += 1
+                    position = positions[index]
+                    yield f"(Hole {hole_number} - {position.size})"
+                    yield f"G00 X{position.x:.3f} Y{position.y:.3f}"
+                    yield f"G01 Z-{depth:.3f} F{self.FEED_RATE}"
+                    yield f"G00 Z{self.SAFE_HEIGHT:.1f}"
+
+    @staticmethod
+    def _group_by_tool(
+        positions: Iterable[GlandPosition], current_tool: float | None
+    ) -> list[tuple[float, list[GlandPosition]]]:
+        """
+        Grupuje otwory według średnicy wiertła.
+
+        Grupa dla aktualnie założonego wiertła idzie pierwsza, a pozostałe są
+        ułożone tak, aby kolejna ścianka zaczynała od wiertła, na którym skończyła poprzednia.
+        """
+        ordered = sorted(positions, key=lambda position: position.hole_diameter)
+        groups = [
+            (diameter, list(group))
+            for diameter, group in groupby(ordered, key=lambda position: position.hole_diameter)
+        ]
+        if current_tool is not None and groups and groups[-1][0] == current_tool:
+            groups.reverse()
+
+        groups.sort(key=lambda group: group[0] != current_tool)
+        return groups
+
+    @staticmethod
+    def _tool_number(hole_diameter: float) -> int:
+        """
+        Numer narzędzia w magazynie - wiertło o średnicy N mm leży w gnieździe N.
+        """
+        return int(round(hole_diameter))
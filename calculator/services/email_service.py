@@ -0,0 +1,193 @@
+"""
+Emaile z potwierdzeniem zamówienia.
+
+Zamówienia nie wysyłają emaili synchronicznie - ``enqueue_order_confirmations``
+zapisuje wpisy do kolejki (OrderEmailOutbox) w transakcji tworzącej zamówienie,
+a ``OrderEmailService.send_pending`` wysyła je paczkami przez jedno połączenie SMTP,
+poza transakcją bazy danych.
+"""
+
+import datetime
+import logging
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import DEFAULT_DB_ALIAS, connection as db_connection, transaction
+from django.db.models import F, Q
+from django.template.loader import get_template
+from django.utils import timezone
+
+from calculator.models import OrderEmailOutbox, SimpleOrder
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ORDER_EMAILS_SETTINGS = {
+    "ENABLED": True,
+    "BATCH_SIZE": 100,
+    "MAX_ATTEMPTS": 5,
+    "CLAIM_TIMEOUT_SECONDS": 600,
+}
+
+
+def get_order_emails_settings() -> dict[str, Any]:
+    """
+    Zwraca ustawienia emaili zamówień uzupełnione o wartości domyślne.
+    """
+    return {**DEFAULT_ORDER_EMAILS_SETTINGS, **getattr(settings, "CALCULATOR_ORDER_EMAILS", {})}
+
+
+def enqueue_order_confirmations(
+    orders: Iterable[SimpleOrder], using: str = DEFAULT_DB_ALIAS
+) -> list[OrderEmailOutbox]:
+    """
+    Dodaje emaile z potwierdzeniem zamówień do kolejki.
+
+    Należy ją wywołać w tej samej transakcji, w której zapisywane są zamówienia.
+
+    Parametry:
+        orders (Iterable[SimpleOrder]): Zapisane zamówienia.
+        using (str): Alias bazy danych, w której zapisano zamówienia.
+    """
+    if not get_order_emails_settings()["ENABLED"]:
+        return []
+
+    return OrderEmailOutbox.objects.using(using).bulk_create([
+        OrderEmailOutbox(
+            order=order,
+            kind=OrderEmailOutbox.Kind.ORDER_CONFIRMATION,
+            recipient=order.customer_email,
+        )
+        for order in orders
+    ])
+
+
+@dataclass(frozen=True)
+class SendResult:
+    sent: int
+    failed: int
+
+
+class OrderEmailService:
+    """Serwis wysyłania emaili o zamówieniach."""
+
+    def __init__(self):
+        # Szablony są kompilowane raz na instancję serwisu, a nie przy każdym emailu.
+        self.text_template = get_template("emails/order_confirmation.txt")
+        self.html_template = get_template("emails/order_confirmation.html")
+
+    def build_order_confirmation(
+        self, order: SimpleOrder, recipient: str | None = None
+    ) -> EmailMultiAlternatives:
+        """
+        Buduje email z potwierdzeniem zamówienia (wersja tekstowa i HTML).
+        """
+        order_data: dict[str, Any] = order.order_data or {}
+        context = {
+            "order": order,
+            "boxes": order_data.get("saveBox", []),
+        }
+        message = EmailMultiAlternatives(
+            subject=f"Potwierdzenie zamówienia #{order.id}",
+            body=self.text_template.render(context),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[recipient or order.customer_email],
+        )
+        message.attach_alternative(self.html_template.render(context), "text/html")
+
+        return message
+
+    def send_order_confirmation(self, order: SimpleOrder, connection=None) -> None:
+        """
+        Wysyła pojedynczy email z potwierdzeniem zamówienia (z pominięciem kolejki).
+        """
+        message = self.build_order_confirmation(order)
+        if connection is None:
+            message.send(fail_silently=False)
+        else:
+            connection.send_messages([message])
+
+    def send_pending(self, connection, batch_size: int | None = None) -> SendResult:
+        """
+        Wysyła jedną paczkę oczekujących emaili przez podane (otwarte) połączenie.
+
+        Wpisy są pobierane krótką transakcją (status sending), a wysyłka odbywa się
+        poza transakcją - blokada zapisu SQLite nie czeka na serwer SMTP. Każdy email
+        jest wysyłany osobno przez to samo połączenie i od razu oznaczany jako
+        wysłany albo nieudany, więc błąd jednego adresu nie powoduje ponownej
+        wysyłki emaili już doręczonych.
+
+        Parametry:
+            connection: Połączenie zwrócone przez django.core.mail.get_connection().
+            batch_size (int | None): Maksymalna liczba emaili w paczce.
+        """
+        email_settings = get_order_emails_settings()
+        entries = self._claim_pending(batch_size or email_settings["BATCH_SIZE"], email_settings)
+
+        sent = failed = 0
+        for entry in entries:
+            message = self.build_order_confirmation(entry.order, entry.recipient)
+            try:
+                connection.send_messages([message])
+            except Exception as exception:
+                failed += 1
+                logger.error(f"Could not send order email {entry.pk}: {exception}")
+                OrderEmailOutbox.objects.filter(pk=entry.pk).update(
+                    attempts=F("attempts") + 1,
+                    last_error=str(exception),
+                    claimed_at=None,
+                    status=(
+                        OrderEmailOutbox.Status.FAILED
+                        if entry.attempts + 1 >= email_settings["MAX_ATTEMPTS"]
+                        else OrderEmailOutbox.Status.PENDING
+                    ),
+                )
+            else:
+                sent += 1
+                OrderEmailOutbox.objects.filter(pk=entry.pk).update(
+                    status=OrderEmailOutbox.Status.SENT, sent_at=timezone.now()
+                )
+
+        return SendResult(sent=sent, failed=failed)
+
+    def _claim_pending(self, batch_size: int, email_settings: dict) -> list[OrderEmailOutbox]:
+        """
+        Oznacza paczkę oczekujących wpisów jako wysyłane (status sending) i je zwraca.
+
+        Wpisy pozostawione w statusie sending dłużej niż CLAIM_TIMEOUT_SECONDS
+        (np. po awarii procesu roboczego) są pobierane ponownie.
+        """
+        now = timezone.now()
+        stale = now - datetime.timedelta(seconds=email_settings["CLAIM_TIMEOUT_SECONDS"])
+
+        with transaction.atomic():
+            queryset = (
+                OrderEmailOutbox.objects
+                .filter(
+                    Q(status=OrderEmailOutbox.Status.PENDING)
+                    | Q(status=OrderEmailOutbox.Status.SENDING, claimed_at__lt=stale)
+                )
+                .select_related("order")
+                .order_by("created_at")
+            )
+            if db_connection.features.has_select_for_update_skip_locked:
+                queryset = queryset.select_for_update(skip_locked=True, of=("self",))
+            entries = list(queryset[:batch_size])
+
+            OrderEmailOutbox.objects.filter(pk__in=[entry.pk for entry in entries]).update(
+                status=OrderEmailOutbox.Status.SENDING, claimed_at=now
+            )
+
+        return entries
+
+
+def open_mail_connection():
+    """
+    Otwiera połączenie z backendem poczty, które można użyć dla wielu paczek.
+    """
+    connection = get_connection(fail_silently=False)
+    connection.open()
+
+    return connection
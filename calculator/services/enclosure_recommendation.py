@@ -0,0 +1,197 @@
+"""
+Rekomendacja najtańszych obudów mieszczących zadaną konfigurację.
+
+Dla każdej obudowy wstępnie liczone są ograniczenia (raz na wersję katalogu):
+użyteczna powierzchnia ścianek, największa średnica dławika mieszcząca się na
+ściance oraz pojemność terminali. Konfiguracja jest porównywana z tymi
+ograniczeniami i tylko obudowy, które je spełniają, przechodzą pełne
+rozmieszczenie dławików. Kandydaci pochodzą z indeksu obudów (EnclosureIndex),
+są sprawdzani od najtańszego, a wyszukiwanie kończy się po znalezieniu
+wymaganej liczby pasujących obudów.
+"""
+
+import math
+import threading
+from dataclasses import dataclass, field
+from typing import Mapping
+
+from calculator.domain.order import CurrentConfig, SaveBox
+from calculator.domain.services.gland_layout_validator import GlandLayoutValidator
+from calculator.domain.services.terminal_capacity_validator import count_terminals_by_size
+from calculator.services.catalog_snapshot import CatalogSnapshot, EnclosureRecord
+from calculator.services.geometry import (
+    BoxGeometryResult,
+    glands_by_side,
+    gland_layout_validator,
+    glands_data_from_catalog,
+    validate_box_geometry,
+)
+
+
+@dataclass(frozen=True)
+class EnclosureBounds:
+    """
+    Wstępnie policzone ograniczenia obudowy.
+
+    Atrybuty:
+        usable_area: Użyteczna powierzchnia ścianek (po odjęciu marginesów) według ścianki.
+        max_gland_diameter: Największa średnica dławika mieszcząca się na ściance.
+        terminal_capacity: Pojemność terminali według przekroju.
+    """
+    enclosure: EnclosureRecord
+    usable_area: Mapping[str, float]
+    max_gland_diameter: Mapping[str, float]
+    terminal_capacity: Mapping[str, int]
+
+
+@dataclass(frozen=True)
+class ConfigRequirements:
+    """
+    Minimalne wymagania konfiguracji wobec obudowy.
+
+    Atrybuty:
+        min_area: Dolne ograniczenie zajmowanej powierzchni według ścianki - suma pól
+            kół dławików (koła nie mogą na siebie nachodzić w żadnym układzie).
+        max_diameter: Największa średnica dławika według ścianki.
+        terminals: Liczba terminali według przekroju.
+    """
+    min_area: Mapping[str, float]
+    max_diameter: Mapping[str, float]
+    terminals: Mapping[str, int]
+
+
+@dataclass
+class RecommendationResult:
+    recommendations: list[BoxGeometryResult] = field(default_factory=list)
+    candidates: int = 0
+    pruned: int = 0
+    laid_out: int = 0
+
+
+_bounds_cache: dict[str, dict[str, EnclosureBounds]] = {}
+_bounds_lock = threading.Lock()
+
+
+def get_enclosure_bounds(catalog: CatalogSnapshot) -> dict[str, EnclosureBounds]:
+    """
+    Zwraca ograniczenia obudów według kodu (liczone raz na wersję katalogu).
+    """
+    with _bounds_lock:
+        bounds = _bounds_cache.get(catalog.version)
+        if bounds is None:
+            bounds = {
+                code: _compute_bounds(enclosure) for code, enclosure in catalog.enclosures.items()
+            }
+            _bounds_cache.clear()
+            _bounds_cache[catalog.version] = bounds
+
+        return bounds
+
+
+def _compute_bounds(enclosure: EnclosureRecord) -> EnclosureBounds:
+    margin = 2 * GlandLayoutValidator.EDGE_MARGIN
+    usable_area = {}
+    max_gland_diameter = {}
+
+    for side, (width, height) in enclosure.mounting_areas.items():
+        usable_width = max(width - margin, 0.0)
+        usable_height = max(height - margin, 0.0)
+        usable_area[side] = usable_width * usable_height
+        max_gland_diameter[side] = min(usable_width, usable_height)
+
+    return EnclosureBounds(
+        enclosure=enclosure,
+        usable_area=usable_area,
+        max_gland_diameter=max_gland_diameter,
+        terminal_capacity=dict(enclosure.terminal_capacity),
+    )
+
+
+def compute_requirements(
+    current_config: CurrentConfig, glands_data: Mapping[str, Mapping]
+) -> ConfigRequirements:
+    """
+    Wylicza wymagania konfiguracji (currentConfig) wobec obudowy.
+    """
+    min_area = {}
+    max_diameter = {}
+
+    for side, items in glands_by_side(current_config.glands).items():
+        diameters = [
+            (float(glands_data[item.size]['physical_diameter_mm']), item.quantity)
+            for item in items
+            if item.quantity > 0
+        ]
+        min_area[side] = sum(
+            math.pi / 4 * diameter * diameter * quantity for diameter, quantity in diameters
+        )
+        max_diameter[side] = max((diameter for diameter, _ in diameters), default=0.0)
+
+    return ConfigRequirements(
+        min_area=min_area,
+        max_diameter=max_diameter,
+        terminals=count_terminals_by_size(current_config.terminals),
+    )
+
+
+def satisfies_bounds(bounds: EnclosureBounds, requirements: ConfigRequirements) -> bool:
+    """
+    Sprawdza konieczne (ale nie wystarczające) warunki zmieszczenia konfiguracji.
+    """
+    for side, min_area in requirements.min_area.items():
+        if side not in bounds.usable_area:
+            return False
+        if requirements.max_diameter[side] > bounds.max_gland_diameter[side]:
+            return False
+        if min_area > bounds.usable_area[side]:
+            return False
+
+    return all(
+        required <= bounds.terminal_capacity.get(size, 0)
+        for size, required in requirements.terminals.items()
+    )
+
+
+def recommend_enclosures(
+    current_config: CurrentConfig, catalog: CatalogSnapshot, limit: int = 3
+) -> RecommendationResult:
+    """
+    Zwraca najtańsze obudowy, w których zmieści się konfiguracja.
+
+    Parametry:
+        current_config (CurrentConfig): Konfiguracja - dławiki według ścianek i terminale.
+        catalog (CatalogSnapshot): Migawka katalogu.
+        limit (int): Maksymalna liczba rekomendacji.
+
+    Rzuca KeyError, jeśli konfiguracja zawiera nieznany rozmiar dławika.
+    """
+    glands_data = glands_data_from_catalog(catalog)
+    requirements = compute_requirements(current_config, glands_data)
+    box = SaveBox(code='', quantity=1, current_config=current_config)
+    validator = gland_layout_validator()
+    result = RecommendationResult()
+
+    # Indeks odrzuca obudowy bez wymaganych ścianek lub ze ściankami mniejszymi
+    # niż największy dławik; pozostałe ograniczenia są sprawdzane na kandydatach.
+    margin = 2 * GlandLayoutValidator.EDGE_MARGIN
+    candidates = catalog.enclosure_index.query(mounting_areas={
+        side: (diameter + margin, diameter + margin)
+        for side, diameter in requirements.max_diameter.items()
+    })
+    enclosure_bounds = get_enclosure_bounds(catalog)
+
+    for enclosure in candidates:
+        bounds = enclosure_bounds[enclosure.code]
+        result.candidates += 1
+        if not satisfies_bounds(bounds, requirements):
+            result.pruned += 1
+            continue
+
+        result.laid_out += 1
+        geometry = validate_box_geometry(0, box, bounds.enclosure, glands_data, validator)
+        if geometry.is_valid:
+            result.recommendations.append(geometry)
+            if len(result.recommendations) >= limit:
+                break
+
+    return result
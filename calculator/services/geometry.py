@@ -0,0 +1,207 @@
+"""
+Walidacja geometryczna konfiguracji obudów na podstawie migawki katalogu.
+"""
+
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping
+
+from django.conf import settings
+
+from calculator.domain.order import GlandItem, GlandSide, OrderData, SaveBox
+from calculator.domain.services.gland_layout_validator import (
+    GlandLayout,
+    GlandLayoutValidator,
+    MountingArea,
+)
+from calculator.domain.services.terminal_capacity_validator import validate_terminal_capacity
+from calculator.services.catalog_snapshot import CatalogSnapshot, EnclosureRecord
+
+
+DEFAULT_GLAND_LAYOUT_SETTINGS = {
+    "MODE": GlandLayoutValidator.MODE_FFD,
+    "TIME_BUDGET_MS": 50,
+}
+
+
+def get_gland_layout_settings() -> dict[str, Any]:
+    """
+    Zwraca ustawienia rozmieszczenia dławików uzupełnione o wartości domyślne.
+    """
+    return {**DEFAULT_GLAND_LAYOUT_SETTINGS, **getattr(settings, "CALCULATOR_GLAND_LAYOUT", {})}
+
+
+def gland_layout_validator() -> GlandLayoutValidator:
+    """
+    Tworzy walidator rozmieszczenia dławików w trybie z ustawień (CALCULATOR_GLAND_LAYOUT).
+    """
+    layout_settings = get_gland_layout_settings()
+    return GlandLayoutValidator(
+        mode=layout_settings["MODE"],
+        time_budget=layout_settings["TIME_BUDGET_MS"] / 1000,
+    )
+
+
+def glands_data_from_catalog(catalog: CatalogSnapshot) -> dict[str, dict[str, float]]:
+    """
+    Zwraca wymiary dławików według rozmiaru (w formacie oczekiwanym przez GlandLayoutValidator).
+
+    Wymiary dławika zależą tylko od rozmiaru, więc materiał jest pomijany.
+    """
+    glands_data: dict[str, dict[str, float]] = {}
+    for (size, _material), gland in catalog.glands.items():
+        glands_data.setdefault(size, {
+            "physical_diameter_mm": gland.physical_diameter_mm,
+            "diameter_mm": gland.diameter_mm,
+        })
+
+    return glands_data
+
+
+def glands_by_side(glands: Iterable[GlandSide]) -> dict[str, list[GlandItem]]:
+    """
+    Grupuje dławiki według ścianki (ta sama ścianka może wystąpić w konfiguracji kilka razy).
+    """
+    items_by_side: dict[str, list[GlandItem]] = {}
+    for side_data in glands:
+        items_by_side.setdefault(side_data.side, []).extend(side_data.items)
+
+    return items_by_side
+
+
+def compute_box_gland_layouts(
+    box: SaveBox,
+    enclosure: EnclosureRecord,
+    glands_data: Mapping[str, Mapping],
+    validator: GlandLayoutValidator | None = None,
+) -> list[GlandLayout]:
+    """
+    Rozmieszcza dławiki na każdej ściance obudowy wskazanej w konfiguracji.
+
+    Parametry:
+        box (SaveBox): Obudowa z konfiguracją z zamówienia.
+        enclosure (EnclosureRecord): Obudowa z migawki katalogu.
+        glands_data (Mapping): Wymiary dławików według rozmiaru.
+        validator (GlandLayoutValidator | None): Walidator (domyślnie według ustawień).
+    """
+    validator = validator or gland_layout_validator()
+    layouts = []
+
+    for side, items in glands_by_side(box.current_config.glands).items():
+        area = enclosure.mounting_areas.get(side)
+        if area is None:
+            layouts.append(GlandLayout(
+                side, False, f"Obudowa {enclosure.code} nie ma obszaru montażowego: {side}"
+            ))
+            continue
+
+        layouts.append(validator.compute_layout(
+            items, MountingArea(width=area[0], height=area[1], side=side), glands_data
+        ))
+
+    return layouts
+
+
+@dataclass(frozen=True)
+class BoxGeometryResult:
+    """
+    Wynik walidacji geometrycznej jednej obudowy z zamówienia.
+    """
+    box_index: int
+    code: str
+    layouts: list[GlandLayout]
+    terminals_valid: bool
+    terminals_message: str
+    terminal_details: dict
+
+    @property
+    def is_valid(self) -> bool:
+        return self.terminals_valid and all(layout.is_valid for layout in self.layouts)
+
+    @property
+    def errors(self) -> list[str]:
+        errors = [layout.message for layout in self.layouts if not layout.is_valid]
+        if not self.terminals_valid:
+            errors.append(self.terminals_message)
+
+        return errors
+
+
+def validate_box_geometry(
+    box_index: int,
+    box: SaveBox,
+    enclosure: EnclosureRecord,
+    glands_data: Mapping[str, Mapping],
+    validator: GlandLayoutValidator | None = None,
+) -> BoxGeometryResult:
+    """
+    Sprawdza rozmieszczenie dławików i pojemność terminali jednej obudowy.
+    """
+    terminals_valid, terminals_message, terminal_details = validate_terminal_capacity(
+        box.current_config.terminals, enclosure.terminal_capacity
+    )
+
+    return BoxGeometryResult(
+        box_index=box_index,
+        code=enclosure.code,
+        layouts=compute_box_gland_layouts(box, enclosure, glands_data, validator),
+        terminals_valid=terminals_valid,
+        terminals_message=terminals_message,
+        terminal_details=terminal_details,
+    )
+
+
+def validate_order_geometry(order: OrderData, catalog: CatalogSnapshot) -> list[BoxGeometryResult]:
+    """
+    Waliduje geometrię wszystkich obudów zamówienia.
+
+    Przy włączonej puli (CALCULATOR_GEOMETRY_POOL["ENABLED"], zob.
+    calculator.services.geometry_pool) zamówienia z dużą liczbą obudów są walidowane
+    w puli procesów.
+
+    Parametry:
+        order (OrderData): Dane zamówienia.
+        catalog (CatalogSnapshot): Migawka katalogu z wymiarami produktów.
+    """
+    # Import lokalny - geometry_pool korzysta z funkcji tego modułu.
+    from calculator.services import geometry_pool
+
+    results = []
+    boxes = []
+    for box_index, box in enumerate(order.save_box):
+        if box.code in catalog.enclosures:
+            boxes.append((box_index, box))
+        else:
+            results.append(BoxGeometryResult(
+                box_index, box.code, [], False,
+                f"Nie znaleziono obudowy o kodzie: {box.code}", {},
+            ))
+
+    if geometry_pool.should_use_pool(len(boxes)):
+        try:
+            results.extend(geometry_pool.validate_boxes_in_pool(boxes, catalog))
+            boxes = []
+        except BrokenProcessPool:
+            # Awaria procesu roboczego - walidacja w bieżącym procesie.
+            pass
+
+    glands_data = glands_data_from_catalog(catalog)
+    validator = gland_layout_validator()
+    for box_index, box in boxes:
+        results.append(validate_box_geometry(
+            box_index, box, catalog.enclosures[box.code], glands_data, validator
+        ))
+
+    results.sort(key=lambda result: result.box_index)
+    return results
+
+
+def geometry_errors(results: Iterable[BoxGeometryResult]) -> list[dict[str, Any]]:
+    """
+    Zwraca błędy walidacji w formacie zapisywanym w SimpleOrder.geometry_validation_errors.
+    """
+    return [
+        {"box": result.box_index, "code": result.code, "errors": result.errors}
+        for result in results
+        if not result.is_valid
+    ]
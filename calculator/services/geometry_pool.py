@@ -0,0 +1,197 @@
+"""
+Równoległa walidacja geometryczna dużych zamówień.
+
+Rozmieszczenie dławików każdej obudowy jest niezależną pracą obliczeniową,
+więc zamówienia z co najmniej MIN_BOXES obudowami są dzielone na paczki
+i walidowane w trwałej puli procesów (ProcessPoolExecutor). Procesy robocze
+otrzymują migawkę katalogu i ustawienia rozmieszczenia raz, przy starcie
+(initializer); pula jest tworzona ponownie dopiero po zmianie wersji katalogu,
+a poprzednia kończy już przyjęte paczki (równoległe żądania nie tracą wyników).
+Pula jest domyślnie wyłączona (ENABLED) - każdy proces serwera uruchamia
+własne procesy robocze, więc włączenie wymaga dobrania WORKERS do wdrożenia.
+Małe zamówienia (i wszystkie zamówienia na maszynie z jednym procesorem)
+są walidowane w bieżącym procesie - koszt komunikacji międzyprocesowej
+przewyższyłby zysk.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from typing import Any, Iterable, Mapping
+
+from django.conf import settings
+
+from calculator.domain.order import SaveBox
+from calculator.domain.services.gland_layout_validator import GlandLayoutValidator
+from calculator.services.catalog_snapshot import CatalogSnapshot
+from calculator.services.geometry import (
+    BoxGeometryResult,
+    get_gland_layout_settings,
+    glands_data_from_catalog,
+    validate_box_geometry,
+)
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GEOMETRY_POOL_SETTINGS = {
+    "ENABLED": False,
+    "WORKERS": None,  # None - liczba procesorów
+    "MIN_BOXES": 64,
+    "CHUNK_SIZE": 16,
+}
+
+_pool: ProcessPoolExecutor | None = None
+_pool_key: tuple | None = None
+_pool_lock = threading.Lock()
+
+_worker_catalog: CatalogSnapshot | None = None
+_worker_glands_data: dict | None = None
+_worker_validator: GlandLayoutValidator | None = None
+
+
+def get_geometry_pool_settings() -> dict[str, Any]:
+    """
+    Zwraca ustawienia puli walidacji geometrycznej uzupełnione o wartości domyślne.
+    """
+    return {**DEFAULT_GEOMETRY_POOL_SETTINGS, **getattr(settings, "CALCULATOR_GEOMETRY_POOL", {})}
+
+
+def should_use_pool(box_count: int) -> bool:
+    """
+    Sprawdza, czy zamówienie o podanej liczbie obudów jest walidowane w puli procesów.
+    """
+    pool_settings = get_geometry_pool_settings()
+    return (
+        pool_settings["ENABLED"]
+        and box_count >= pool_settings["MIN_BOXES"]
+        and pool_worker_count(pool_settings) > 1
+    )
+
+
+def pool_worker_count(pool_settings: Mapping[str, Any]) -> int:
+    """
+    Zwraca liczbę procesów puli (WORKERS lub liczba procesorów).
+    """
+    return pool_settings["WORKERS"] or os.cpu_count() or 1
+
+
+def init_geometry_worker(catalog: CatalogSnapshot, mode: str, time_budget: float) -> None:
+    """
+    Inicjalizator procesu roboczego - zapamiętuje migawkę katalogu i wymiary dławików.
+    """
+    global _worker_catalog, _worker_glands_data, _worker_validator
+    _worker_catalog = catalog
+    _worker_glands_data = glands_data_from_catalog(catalog)
+    _worker_validator = GlandLayoutValidator(mode=mode, time_budget=time_budget)
+
+
+def validate_boxes_chunk(boxes: list[tuple[int, SaveBox]]) -> list[BoxGeometryResult]:
+    """
+    Waliduje paczkę obudów w procesie roboczym.
+
+    Parametry:
+        boxes (list): Pary (indeks obudowy w zamówieniu, obudowa z konfiguracją).
+    """
+    if _worker_catalog is None or _worker_glands_data is None:
+        raise RuntimeError("Geometry worker was not initialized with a catalog snapshot")
+
+    return [
+        validate_box_geometry(
+            box_index,
+            box,
+            _worker_catalog.enclosures[box.code],
+            _worker_glands_data,
+            _worker_validator,
+        )
+        for box_index, box in boxes
+    ]
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+def get_geometry_pool(catalog: CatalogSnapshot) -> ProcessPoolExecutor:
+    """
+    Zwraca trwałą pulę procesów dla wersji katalogu (tworząc i rozgrzewając ją w razie potrzeby).
+    """
+    global _pool, _pool_key
+
+    pool_settings = get_geometry_pool_settings()
+    layout_settings = get_gland_layout_settings()
+    workers = pool_worker_count(pool_settings)
+    key = (catalog.version, workers, layout_settings["MODE"], layout_settings["TIME_BUDGET_MS"])
+
+    with _pool_lock:
+        if _pool is not None and _pool_key == key:
+            return _pool
+
+        if _pool is not None:
+            # Bez cancel_futures - paczki równoległych żądań w starej puli zostaną dokończone.
+            _pool.shutdown(wait=False)
+
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_geometry_worker,
+            initargs=(catalog, layout_settings["MODE"], layout_settings["TIME_BUDGET_MS"] / 1000),
+        )
+        _pool_key = key
+        # Uruchomienie wszystkich procesów od razu, a nie przy pierwszym dużym zamówieniu.
+        for future in [_pool.submit(_warm_up) for _ in range(workers)]:
+            future.result()
+
+        return _pool
+
+
+def shutdown_geometry_pool(pool: ProcessPoolExecutor | None = None) -> None:
+    """
+    Zamyka pulę procesów (np. przy zamykaniu procesu lub po awarii procesu roboczego).
+
+    Parametry:
+        pool (ProcessPoolExecutor | None): Pula do zamknięcia - jeśli została już zastąpiona
+            nową, nowa pula nie jest zamykana. None - bieżąca pula.
+    """
+    global _pool, _pool_key
+
+    with _pool_lock:
+        if pool is not None and pool is not _pool:
+            return
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        _pool_key = None
+
+
+atexit.register(shutdown_geometry_pool)
+
+
+def validate_boxes_in_pool(
+    boxes: Iterable[tuple[int, SaveBox]], catalog: CatalogSnapshot
+) -> list[BoxGeometryResult]:
+    """
+    Waliduje obudowy w puli procesów, paczkami po CHUNK_SIZE.
+
+    Parametry:
+        boxes (Iterable): Pary (indeks obudowy w zamówieniu, obudowa z konfiguracją) - tylko
+            obudowy istniejące w katalogu.
+        catalog (CatalogSnapshot): Migawka katalogu.
+
+    Zwraca wyniki w kolejności obudów. Rzuca BrokenProcessPool, jeśli proces roboczy
+    uległ awarii (pula jest wtedy zamykana i zostanie utworzona przy kolejnym wywołaniu).
+    """
+    chunk_size = get_geometry_pool_settings()["CHUNK_SIZE"]
+    boxes = iter(boxes)
+    chunks = iter(lambda: list(islice(boxes, chunk_size)), [])
+
+    pool = get_geometry_pool(catalog)
+    try:
+        return [result for chunk in pool.map(validate_boxes_chunk, chunks) for result in chunk]
+    except BrokenProcessPool:
+        logger.error("Geometry validation pool is broken, shutting it down", exc_info=True)
+        shutdown_geometry_pool(pool)
+        raise
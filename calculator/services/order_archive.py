@@ -0,0 +1,246 @@
+"""
+Archiwum starych zamówień w osobnej bazie danych.
+
+Komenda archive_orders przenosi zamówienia starsze niż MONTHS pełnych
+miesięcy (razem z indeksem pozycji i emailami z kolejki wysyłki) do bazy
+o aliasie DATABASE - domyślnie osobny plik SQLite. Tabela bieżąca zawiera
+wtedy tylko ostatnie miesiące, więc listy zamówień i eksport nie skanują
+całej historii. Zamówienia z niewysłanymi emailami zostają w tabeli
+bieżącej, dopóki send_order_emails ich nie obsłuży.
+
+Każda paczka jest najpierw zatwierdzana w archiwum, a dopiero potem
+usuwana z bazy bieżącej. Przerwany przebieg może więc zostawić paczkę
+w obu bazach - kolejny przebieg zapisuje ją w archiwum ponownie
+(zastępując kopię) i usuwa z bazy bieżącej.
+
+order_history(include_archived=True) zwraca zapytanie obejmujące obie bazy
+(domyślnie tylko bazę bieżącą). Archiwum zawiera wyłącznie zamówienia
+starsze od każdego zamówienia w tabeli bieżącej, więc kolejność po
+created_at zostaje zachowana przez proste połączenie wyników; inne
+sortowania obowiązują w obrębie każdej z baz osobno. Archiwum bez tabel
+(przed python manage.py migrate --database archive) jest traktowane jak puste.
+"""
+
+import datetime
+from typing import Any, Iterator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from calculator.models import OrderEmailOutbox, OrderItemIndex, SimpleOrder
+
+
+DEFAULT_ORDER_ARCHIVE_SETTINGS = {
+    "DATABASE": "archive",
+    "MONTHS": 12,
+    "CHUNK_SIZE": 500,
+}
+
+
+def get_order_archive_settings() -> dict[str, Any]:
+    """
+    Zwraca ustawienia archiwum zamówień uzupełnione o wartości domyślne.
+    """
+    return {**DEFAULT_ORDER_ARCHIVE_SETTINGS, **getattr(settings, "CALCULATOR_ORDER_ARCHIVE", {})}
+
+
+def archive_alias() -> str | None:
+    """
+    Zwraca alias bazy archiwum lub None, jeśli nie ma jej w DATABASES.
+    """
+    alias = get_order_archive_settings()["DATABASE"]
+    return alias if alias in settings.DATABASES else None
+
+
+def archive_ready(alias: str) -> bool:
+    """
+    Sprawdza, czy baza archiwum ma tabelę zamówień (migrate --database archive).
+    """
+    with connections[alias].cursor() as cursor:
+        tables = connections[alias].introspection.table_names(cursor)
+    return SimpleOrder._meta.db_table in tables
+
+
+def archive_cutoff(months: int, now: datetime.datetime | None = None) -> datetime.datetime:
+    """
+    Zwraca początek miesiąca sprzed ``months`` miesięcy (w lokalnej strefie czasowej).
+
+    Zamówienia utworzone przed tą chwilą trafiają do archiwum - zawsze całymi miesiącami.
+    """
+    now = timezone.localtime(now)
+    month_index = now.year * 12 + now.month - 1 - months
+    return now.replace(
+        year=month_index // 12,
+        month=month_index % 12 + 1,
+        day=1,
+        hour=0,
+        minute=0,
+        second=0,
+        microsecond=0,
+    )
+
+
+def archivable_orders(cutoff: datetime.datetime) -> QuerySet:
+    """
+    Zwraca zamówienia bazy bieżącej do przeniesienia (bez oczekujących emaili).
+    """
+    return (
+        SimpleOrder.objects.using(DEFAULT_DB_ALIAS)
+        .filter(created_at__lt=cutoff)
+        .exclude(emails__status__in=[
+            OrderEmailOutbox.Status.PENDING, OrderEmailOutbox.Status.SENDING
+        ])
+        .order_by("created_at", "pk")
+    )
+
+
+def _copy_rows(model, objects: list, using: str) -> None:
+    # Wstawienie "raw" (jak loaddata) - created_at/updated_at (auto_now_add/auto_now)
+    # zachowują wartości z bazy bieżącej zamiast czasu archiwizacji.
+    if not objects:
+        return
+    fields = model._meta.concrete_fields
+    batch_size = max(connections[using].ops.bulk_batch_size(fields, objects), 1)
+    for start in range(0, len(objects), batch_size):
+        model._base_manager._insert(
+            objects[start:start + batch_size], fields=fields, using=using, raw=True
+        )
+
+
+def archive_order_chunk(cutoff: datetime.datetime, chunk_size: int, using: str) -> int:
+    """
+    Przenosi do archiwum ``using`` jedną paczkę zamówień sprzed ``cutoff``.
+
+    Zwraca liczbę przeniesionych zamówień (0, gdy nie ma już czego archiwizować).
+    """
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        orders = list(archivable_orders(cutoff)[:chunk_size])
+        if not orders:
+            return 0
+        order_ids = [order.pk for order in orders]
+        emails = list(
+            OrderEmailOutbox.objects.using(DEFAULT_DB_ALIAS).filter(order_id__in=order_ids)
+        )
+        items = list(
+            OrderItemIndex.objects.using(DEFAULT_DB_ALIAS).filter(order_id__in=order_ids)
+        )
+
+        with transaction.atomic(using=using):
+            # Kopia z przerwanego wcześniej przebiegu jest zastępowana.
+            SimpleOrder.objects.using(using).filter(pk__in=order_ids).delete()
+            _copy_rows(SimpleOrder, orders, using)
+            _copy_rows(OrderEmailOutbox, emails, using)
+            _copy_rows(OrderItemIndex, items, using)
+
+        SimpleOrder.objects.using(DEFAULT_DB_ALIAS).filter(pk__in=order_ids).delete()
+    return len(orders)
+
+
+class OrderHistory:
+    """
+    Zapytanie o zamówienia obejmujące bazę bieżącą i archiwum.
+
+    Obsługuje podzbiór API QuerySet: filter(), exclude(), order_by(), only(),
+    defer(), values(), values_list(), count(), exists(), get(), first()
+    oraz iterację i wycinki [start:stop].
+    """
+
+    def __init__(self, querysets: list[QuerySet]):
+        self._querysets = querysets
+
+    def _chain(self, method: str, *args, **kwargs) -> "OrderHistory":
+        return OrderHistory(
+            [getattr(queryset, method)(*args, **kwargs) for queryset in self._querysets]
+        )
+
+    def filter(self, *args, **kwargs) -> "OrderHistory":
+        return self._chain("filter", *args, **kwargs)
+
+    def exclude(self, *args, **kwargs) -> "OrderHistory":
+        return self._chain("exclude", *args, **kwargs)
+
+    def order_by(self, *field_names) -> "OrderHistory":
+        return self._chain("order_by", *field_names)
+
+    def only(self, *fields) -> "OrderHistory":
+        return self._chain("only", *fields)
+
+    def defer(self, *fields) -> "OrderHistory":
+        return self._chain("defer", *fields)
+
+    def values(self, *fields, **expressions) -> "OrderHistory":
+        return self._chain("values", *fields, **expressions)
+
+    def values_list(self, *fields, **kwargs) -> "OrderHistory":
+        return self._chain("values_list", *fields, **kwargs)
+
+    def _ordered_querysets(self) -> list[QuerySet]:
+        # Archiwum zawiera starsze zamówienia: przy sortowaniu rosnąco po created_at
+        # jego wyniki idą pierwsze, w pozostałych przypadkach po bazie bieżącej.
+        query = self._querysets[0].query
+        ordering = query.order_by or (SimpleOrder._meta.ordering if query.default_ordering else [])
+        if ordering and ordering[0] == "created_at":
+            return list(reversed(self._querysets))
+        return self._querysets
+
+    def iterator(self, chunk_size: int = 2000) -> Iterator:
+        for queryset in self._ordered_querysets():
+            yield from queryset.iterator(chunk_size=chunk_size)
+
+    def __iter__(self) -> Iterator:
+        return self.iterator()
+
+    def __getitem__(self, key: slice) -> list:
+        if not isinstance(key, slice) or key.step is not None:
+            raise TypeError("OrderHistory supports only [start:stop] slices")
+        # LIMIT/OFFSET w każdej z baz; wiersze pominiętej bazy są tylko liczone.
+        offset = key.start or 0
+        limit = None if key.stop is None else max(key.stop - offset, 0)
+        results: list = []
+        for queryset in self._ordered_querysets():
+            if limit is not None and len(results) >= limit:
+                break
+            if offset:
+                size = queryset.count()
+                if size <= offset:
+                    offset -= size
+                    continue
+            end = None if limit is None else offset + limit - len(results)
+            results.extend(queryset[offset:end])
+            offset = 0
+        return results
+
+    def count(self) -> int:
+        return sum(queryset.count() for queryset in self._querysets)
+
+    def exists(self) -> bool:
+        return any(queryset.exists() for queryset in self._querysets)
+
+    def first(self):
+        return next(iter(self[:1]), None)
+
+    def get(self, *args, **kwargs):
+        for queryset in self._querysets:
+            try:
+                return queryset.get(*args, **kwargs)
+            except SimpleOrder.DoesNotExist:
+                continue
+        raise SimpleOrder.DoesNotExist("SimpleOrder matching query does not exist.")
+
+
+def order_history(include_archived: bool = False, using: str | None = None) -> OrderHistory:
+    """
+    Zwraca zapytanie o zamówienia z bazy bieżącej i (opcjonalnie) z archiwum.
+
+    Parametry:
+        include_archived (bool): Czy dołączyć zamówienia z archiwum.
+        using (str | None): Alias bazy bieżącej (domyślnie wybierany przez router).
+    """
+    hot = SimpleOrder.objects.all() if using is None else SimpleOrder.objects.using(using)
+    querysets = [hot]
+    alias = archive_alias()
+    if include_archived and alias is not None and archive_ready(alias):
+        querysets.append(SimpleOrder.objects.using(alias))
+    return OrderHistory(querysets)
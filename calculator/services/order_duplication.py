@@ -0,0 +1,86 @@
+"""
+Duplikowanie zamówień.
+
+Jeśli katalog nie zmienił się od wyceny zamówienia źródłowego (ta sama wersja
+migawki), kopia przejmuje zapisane ceny i wynik walidacji geometrycznej.
+Pełna wycena jest wykonywana tylko wtedy, gdy katalog się zmienił.
+
+Migawka musi odpowiadać bieżącej zawartości bazy (refresh_catalog_snapshot) -
+migawka z pamięci procesu może nie widzieć importu wykonanego w innym procesie
+i kopia przejęłaby nieaktualne ceny.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable
+
+from django.db import transaction
+
+from calculator.domain.order import OrderData
+from calculator.models import SimpleOrder
+from calculator.services.catalog_snapshot import CatalogSnapshot
+from calculator.services.email_service import enqueue_order_confirmations
+from calculator.services.order_item_index import index_order_items
+from calculator.services.order_quote import quote_order
+
+
+COPIED_FIELDS = (
+    "customer_name",
+    "customer_email",
+    "user_information",
+    "order_data",
+)
+
+STORED_QUOTE_FIELDS = (
+    "total_price",
+    "enclosures_price",
+    "glands_price",
+    "terminals_price",
+    "catalog_version",
+    "geometry_validation_passed",
+    "geometry_validation_errors",
+)
+
+
+@dataclass(frozen=True)
+class DuplicatedOrder:
+    source: SimpleOrder
+    order: SimpleOrder
+    repriced: bool
+
+
+def duplicate_orders(
+    sources: Iterable[SimpleOrder],
+    catalog: CatalogSnapshot,
+    customer_email: str | None = None,
+) -> list[DuplicatedOrder]:
+    """
+    Duplikuje zamówienia w jednej transakcji.
+
+    Parametry:
+        sources (Iterable[SimpleOrder]): Zamówienia źródłowe.
+        catalog (CatalogSnapshot): Migawka katalogu wczytana z bazy (refresh_catalog_snapshot).
+        customer_email (str | None): Nowy adres email klienta (domyślnie adres z zamówienia).
+    """
+    duplicates = []
+
+    for source in sources:
+        fields = {field: getattr(source, field) for field in COPIED_FIELDS}
+        if customer_email:
+            fields["customer_email"] = customer_email
+
+        repriced = source.catalog_version != catalog.version
+        if repriced:
+            fields.update(
+                quote_order(OrderData.from_dict(source.order_data), catalog).as_order_fields()
+            )
+        else:
+            fields.update({field: getattr(source, field) for field in STORED_QUOTE_FIELDS})
+
+        duplicates.append(DuplicatedOrder(source, SimpleOrder(**fields), repriced))
+
+    with transaction.atomic():
+        orders = SimpleOrder.objects.bulk_create([duplicate.order for duplicate in duplicates])
+        index_order_items(orders)
+        enqueue_order_confirmations(orders)
+
+    return duplicates
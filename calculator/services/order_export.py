@@ -0,0 +1,256 @@
+"""
+Eksport zamówień do CSV i XLSX dla działu sprzedaży.
+
+Każde zamówienie daje po jednym wierszu na obudowę oraz na każdą pozycję
+dławika i terminala w tej obudowie. Zamówienia są czytane przez
+``values_list().iterator()`` (bez instancji modelu, paczkami z kursora),
+a pliki są składane przyrostowo - generatory zwracają kolejne fragmenty,
+więc pamięć procesu nie zależy od liczby eksportowanych zamówień.
+
+Filtr kodu obudowy korzysta z indeksu pozycji zamówień (OrderItemIndex) -
+order_data jest skompresowanym BLOB-em, którego baza nie przeszukuje.
+
+XLSX jest zapisywany bez zewnętrznych bibliotek: arkusz z komórkami
+``inlineStr`` jest dopisywany do archiwum ZIP strumieniowo (zipfile
+z deskryptorem danych dla strumienia bez seek()).
+
+Tekst zaczynający się od znaku formuły (=, +, -, @, tabulator, CR) jest w obu formatach
+poprzedzany apostrofem, aby arkusz nie wykonał danych klienta jako formuły.
+"""
+
+import csv
+import datetime
+import io
+import re
+import zipfile
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Iterable, Iterator
+from xml.sax.saxutils import escape
+
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from calculator.domain.order import OrderData
+from calculator.services.order_archive import order_history
+from calculator.services.order_item_index import filter_orders_by_items
+
+
+EXPORT_COLUMNS = (
+    "order_id",
+    "created_at",
+    "customer_name",
+    "customer_email",
+    "total_price",
+    "box_no",
+    "enclosure_code",
+    "box_quantity",
+    "line_type",
+    "side",
+    "code",
+    "variant",
+    "quantity",
+)
+
+ORDER_FIELDS = ("id", "created_at", "customer_name", "customer_email", "total_price", "order_data")
+
+EXPORT_FORMATS = ("csv", "xlsx")
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Rozmiar paczki odczytu z bazy i fragmentu pliku zwracanego przez generatory.
+ITERATOR_CHUNK_SIZE = 500
+OUTPUT_CHUNK_BYTES = 64 * 1024
+
+_XML_ILLEGAL_CHARACTERS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+# Początki tekstu interpretowane przez arkusze kalkulacyjne jako formuła (CSV injection).
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+@dataclass(frozen=True, slots=True)
+class OrderExportFilter:
+    """
+    Filtry eksportu: zakres dat utworzenia (włącznie), kod obudowy i dołączenie archiwum.
+    """
+    date_from: datetime.date | None = None
+    date_to: datetime.date | None = None
+    enclosure_code: str | None = None
+    include_archived: bool = False
+
+
+def export_order_rows(
+    export_filter: OrderExportFilter, using: str = DEFAULT_DB_ALIAS
+) -> Iterator[tuple[Any, ...]]:
+    """
+    Zwraca kolejne wiersze eksportu (w kolejności EXPORT_COLUMNS).
+
+    Parametry:
+        export_filter (OrderExportFilter): Filtry zamówień.
+        using (str): Alias bazy bieżącej, z której czytane są zamówienia.
+    """
+    queryset = order_history(export_filter.include_archived, using=using).order_by(
+        "created_at", "id"
+    )
+    if export_filter.date_from is not None:
+        queryset = queryset.filter(created_at__date__gte=export_filter.date_from)
+    if export_filter.date_to is not None:
+        queryset = queryset.filter(created_at__date__lte=export_filter.date_to)
+    queryset = filter_orders_by_items(queryset, enclosure=export_filter.enclosure_code)
+
+    for order_id, created_at, name, email, total_price, order_data in (
+        queryset.values_list(*ORDER_FIELDS).iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    ):
+        boxes = OrderData.from_dict(order_data).save_box
+        order = (str(order_id), timezone.localtime(created_at), name, email, total_price)
+        for box_no, box in enumerate(boxes, start=1):
+            prefix = (*order, box_no, box.code, box.quantity)
+            yield (*prefix, "enclosure", "", box.code, box.name, box.quantity)
+            for side in box.current_config.glands:
+                for gland in side.items:
+                    yield (
+                        *prefix, "gland", side.side, gland.size, gland.material, gland.quantity
+                    )
+            for terminal in box.current_config.terminals:
+                yield (
+                    *prefix, "terminal", "", terminal.size, terminal.color or "", terminal.quantity
+                )
+
+
+def _cell_text(value: Any) -> str:
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=" ", timespec="seconds")
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return f"'{value}"
+    return "" if value is None else str(value)
+
+
+def iter_csv(rows: Iterable[tuple[Any, ...]]) -> Iterator[str]:
+    """
+    Zwraca plik CSV (z nagłówkiem EXPORT_COLUMNS) fragmentami po ok. OUTPUT_CHUNK_BYTES.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow([_cell_text(value) for value in row])
+        if buffer.tell() >= OUTPUT_CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Strumień bez seek(), z którego generator odbiera zapisane przez zipfile bajty.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._size += len(data)
+        return len(data)
+
+    def pending(self) -> int:
+        return self._size
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self._size = 0
+        return data
+
+
+_XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" '
+        'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+        'relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Orders" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+        'relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_row(row: Iterable[Any]) -> str:
+    cells = []
+    for value in row:
+        if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+            cells.append(f"<c><v>{value}</v></c>")
+        else:
+            text = escape(_XML_ILLEGAL_CHARACTERS.sub("", _cell_text(value)))
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f"<row>{''.join(cells)}</row>"
+
+
+def iter_xlsx(rows: Iterable[tuple[Any, ...]]) -> Iterator[bytes]:
+    """
+    Zwraca skoroszyt XLSX (arkusz "Orders" z nagłówkiem EXPORT_COLUMNS) fragmentami.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+
+        with archive.open("xl/worksheets/sheet1.xml", mode="w") as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData>'
+            )
+            sheet.write(_xlsx_row(EXPORT_COLUMNS).encode())
+            for row in rows:
+                sheet.write(_xlsx_row(row).encode())
+                if sink.pending() >= OUTPUT_CHUNK_BYTES:
+                    yield sink.drain()
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
+def iter_export(
+    export_format: str, export_filter: OrderExportFilter, using: str = DEFAULT_DB_ALIAS
+) -> Iterator[str | bytes]:
+    """
+    Zwraca plik eksportu zamówień w formacie ``csv`` lub ``xlsx`` fragmentami.
+    """
+    rows = export_order_rows(export_filter, using=using)
+    if export_format == "xlsx":
+        return iter_xlsx(rows)
+    return iter_csv(rows)
@@ -0,0 +1,114 @@
+"""
+Indeks pozycji zamówień (OrderItemIndex) i wyszukiwanie zamówień po pozycjach.
+
+order_data jest skompresowanym BLOB-em (CompressedJSONField), więc wyrażenia
+JSON1 i kolumny generowane nie mają czego indeksować. Zamiast tego przy
+zapisie zamówienia powstają wiersze OrderItemIndex - po jednym na różną
+obudowę, dławik (rozmiar + materiał) i terminal (rozmiar + kolor) - w tej
+samej transakcji co zamówienie. Filtr ``filter_orders_by_items`` zamienia
+warunek na podzapytanie po indeksie (kind, code, variant, order), więc baza
+nie dekoduje order_data. Zamówienia sprzed wprowadzenia indeksu uzupełnia
+komenda index_order_items.
+"""
+
+from typing import Any, Iterable, Protocol, Self, TypeVar
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import QuerySet
+
+from calculator.domain.order import OrderData
+from calculator.models import OrderItemIndex, SimpleOrder
+
+
+class FilterableOrders(Protocol):
+    """
+    Zapytanie o zamówienia z metodą filter() (QuerySet lub OrderHistory).
+    """
+
+    def filter(self, *args: Any, **kwargs: Any) -> Self: ...
+
+
+Orders = TypeVar("Orders", bound=FilterableOrders)
+
+
+def order_item_rows(order: SimpleOrder) -> list[OrderItemIndex]:
+    """
+    Zwraca (niezapisane) wiersze indeksu dla pozycji zamówienia, bez powtórzeń.
+    """
+    items = set()
+    for box in OrderData.from_dict(order.order_data).save_box:
+        items.add((OrderItemIndex.Kind.ENCLOSURE, box.code, ""))
+        for side in box.current_config.glands:
+            items.update(
+                (OrderItemIndex.Kind.GLAND, item.size, item.material) for item in side.items
+            )
+        items.update(
+            (OrderItemIndex.Kind.TERMINAL, item.size, item.color or "")
+            for item in box.current_config.terminals
+        )
+
+    return [
+        OrderItemIndex(order_id=order.pk, kind=kind, code=code, variant=variant)
+        for kind, code, variant in sorted(items)
+    ]
+
+
+def index_order_items(
+    orders: Iterable[SimpleOrder], using: str = DEFAULT_DB_ALIAS
+) -> list[OrderItemIndex]:
+    """
+    Zapisuje wiersze indeksu pozycji dla zapisanych zamówień.
+
+    Należy ją wywołać w tej samej transakcji, w której zapisywane są zamówienia.
+
+    Parametry:
+        orders (Iterable[SimpleOrder]): Zapisane zamówienia.
+        using (str): Alias bazy danych, w której zapisano zamówienia.
+    """
+    rows = [row for order in orders for row in order_item_rows(order)]
+    return OrderItemIndex.objects.using(using).bulk_create(rows, ignore_conflicts=True)
+
+
+def orders_with_item(kind: str, code: str, variant: str | None = None) -> QuerySet:
+    """
+    Zwraca podzapytanie z ID zamówień zawierających pozycję (dowolny wariant, gdy None).
+    """
+    items = OrderItemIndex.objects.filter(kind=kind, code=code)
+    if variant is not None:
+        items = items.filter(variant=variant)
+    return items.values("order_id")
+
+
+def filter_orders_by_items(
+    orders: Orders,
+    enclosure: str | None = None,
+    gland: str | None = None,
+    gland_material: str | None = None,
+    terminal: str | None = None,
+) -> Orders:
+    """
+    Zawęża zapytanie o zamówienia (QuerySet lub OrderHistory) do zamówień z pozycjami.
+
+    Parametry:
+        orders: Zapytanie o zamówienia.
+        enclosure (str | None): Kod obudowy.
+        gland (str | None): Rozmiar dławika, np. "M20".
+        gland_material (str | None): Materiał dławika (tylko razem z gland).
+        terminal (str | None): Rozmiar terminala.
+    """
+    if enclosure:
+        orders = orders.filter(pk__in=orders_with_item(OrderItemIndex.Kind.ENCLOSURE, enclosure))
+    if gland:
+        orders = orders.filter(
+            pk__in=orders_with_item(OrderItemIndex.Kind.GLAND, gland, gland_material or None)
+        )
+    if terminal:
+        orders = orders.filter(pk__in=orders_with_item(OrderItemIndex.Kind.TERMINAL, terminal))
+    return orders
+
+
+def explain_query_plan(queryset: QuerySet) -> list[str]:
+    """
+    Zwraca plan zapytania (EXPLAIN QUERY PLAN w SQLite) jako listę wierszy.
+    """
+    return queryset.explain().splitlines()
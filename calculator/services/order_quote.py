@@ -0,0 +1,66 @@
+"""
+Wycena zamówienia wraz z wynikiem walidacji - wspólna dla tworzenia i duplikowania zamówień.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+from calculator.domain.order import OrderData
+from calculator.services.catalog_snapshot import CatalogSnapshot
+from calculator.services.geometry import (
+    BoxGeometryResult,
+    geometry_errors,
+    validate_order_geometry,
+)
+from calculator.services.pricing import PriceBreakdown, calculate_order_price_breakdown
+
+
+@dataclass(frozen=True)
+class OrderQuote:
+    """
+    Wynik wyceny zamówienia według konkretnej wersji katalogu.
+    """
+    breakdown: PriceBreakdown
+    catalog_version: str
+    geometry_validation_passed: bool
+    geometry_validation_errors: list | None = None
+
+    def as_order_fields(self) -> dict[str, Any]:
+        """
+        Zwraca pola SimpleOrder wypełniane na podstawie wyceny.
+        """
+        return {
+            "total_price": self.breakdown.total_price,
+            "enclosures_price": self.breakdown.enclosures_price,
+            "glands_price": self.breakdown.glands_price,
+            "terminals_price": self.breakdown.terminals_price,
+            "catalog_version": self.catalog_version,
+            "geometry_validation_passed": self.geometry_validation_passed,
+            "geometry_validation_errors": self.geometry_validation_errors,
+        }
+
+
+def quote_order(
+    order: OrderData,
+    catalog: CatalogSnapshot,
+    geometry_results: list[BoxGeometryResult] | None = None,
+) -> OrderQuote:
+    """
+    Wycenia zamówienie i waliduje jego geometrię według podanej migawki katalogu.
+
+    Parametry:
+        order (OrderData): Dane zamówienia.
+        catalog (CatalogSnapshot): Migawka katalogu.
+        geometry_results (list | None): Wynik validate_order_geometry, jeśli już policzony.
+    """
+    breakdown = calculate_order_price_breakdown(order, catalog)
+    if geometry_results is None:
+        geometry_results = validate_order_geometry(order, catalog)
+    errors = geometry_errors(geometry_results)
+
+    return OrderQuote(
+        breakdown=breakdown,
+        catalog_version=catalog.version,
+        geometry_validation_passed=not errors,
+        geometry_validation_errors=errors or None,
+    )
@@ -0,0 +1,221 @@
+"""
+Zapis zamówień z grupowaniem transakcji (group commit).
+
+Przy włączonym CALCULATOR_ORDER_WRITER żądania nie otwierają własnej
+transakcji - zwalidowane i wycenione zamówienia trafiają do kolejki, a jeden
+wątek zapisujący wstawia je razem z emailami w kolejce wysyłki w jednej
+transakcji: gdy minie MAX_DELAY_MS od pierwszego zamówienia w paczce albo
+gdy zbierze się MAX_BATCH zamówień. Każde żądanie czeka na swoje zamówienie
+(Future), które jest rozwiązywane dopiero po zatwierdzeniu transakcji -
+odpowiedź z ID zamówienia oznacza zapis tak samo trwały jak bez grupowania.
+Gdy zapis paczki się nie powiedzie, zamówienia są zapisywane pojedynczo,
+więc błąd jednego zamówienia nie odrzuca pozostałych.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from calculator.models import SimpleOrder
+from calculator.services.email_service import enqueue_order_confirmations
+from calculator.services.order_item_index import index_order_items
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ORDER_WRITER_SETTINGS = {
+    "ENABLED": False,
+    "MAX_BATCH": 100,
+    "MAX_DELAY_MS": 5,
+    "TIMEOUT_SECONDS": 30,
+}
+
+_writer: "OrderWriter | None" = None
+_writer_lock = threading.Lock()
+
+
+def get_order_writer_settings() -> dict[str, Any]:
+    """
+    Zwraca ustawienia zapisu grupowego zamówień uzupełnione o wartości domyślne.
+    """
+    return {**DEFAULT_ORDER_WRITER_SETTINGS, **getattr(settings, "CALCULATOR_ORDER_WRITER", {})}
+
+
+class OrderWriter:
+    """
+    Wątek zapisujący zamówienia paczkami, każdą paczkę w jednej transakcji.
+
+    Wątek startuje przy pierwszym zamówieniu (także po fork() procesu serwera).
+    """
+
+    def __init__(
+        self, using: str = DEFAULT_DB_ALIAS, max_batch: int = 100, max_delay: float = 0.005
+    ):
+        self.using = using
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.written = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stopped = False
+
+    def submit(self, order: SimpleOrder) -> Future:
+        """
+        Dodaje niezapisane zamówienie do kolejki; Future zwraca je po zatwierdzeniu transakcji.
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("Order writer is stopped")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="order-writer", daemon=True)
+                self._thread.start()
+            self._queue.put((order, future))
+        return future
+
+    def write(self, order: SimpleOrder, timeout: float | None = None) -> SimpleOrder:
+        """
+        Zapisuje zamówienie i czeka na zatwierdzenie transakcji.
+
+        Po przekroczeniu timeout zamówienie, które wciąż czeka w kolejce, jest
+        anulowane (nie zostanie zapisane) i rzucany jest TimeoutError - ponowienie
+        żądania nie utworzy duplikatu. Jeśli zapis paczki już trwa, metoda czeka
+        na jego wynik.
+        """
+        future = self.submit(order)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            if future.cancel():
+                raise
+            return future.result()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Zapisuje zamówienia z kolejki i zatrzymuje wątek; kolejne submit() rzucają RuntimeError.
+        """
+        with self._lock:
+            self._stopped = True
+            thread = self._thread
+            self._queue.put(None)
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                if item is None:
+                    break
+
+                batch = [item]
+                deadline = time.monotonic() + self.max_delay
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+
+                self._flush(batch)
+        finally:
+            connections[self.using].close()
+
+    def _flush(self, batch: list[tuple[SimpleOrder, Future]]) -> None:
+        batch = [
+            (order, future) for order, future in batch if future.set_running_or_notify_cancel()
+        ]
+        if not batch:
+            return
+
+        try:
+            self._insert([order for order, _ in batch])
+        except Exception:
+            logger.warning(
+                "Group commit of %d orders failed, writing them one by one",
+                len(batch),
+                exc_info=True,
+            )
+            connections[self.using].close_if_unusable_or_obsolete()
+            for order, future in batch:
+                try:
+                    self._insert([order])
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(order)
+            return
+
+        for order, future in batch:
+            future.set_result(order)
+
+    def _insert(self, orders: list[SimpleOrder]) -> None:
+        with transaction.atomic(using=self.using):
+            SimpleOrder.objects.using(self.using).bulk_create(orders)
+            index_order_items(orders, using=self.using)
+            enqueue_order_confirmations(orders, using=self.using)
+
+        self.batches += 1
+        self.written += len(orders)
+
+
+def get_order_writer() -> OrderWriter:
+    """
+    Zwraca wątek zapisujący zamówienia procesu (tworząc go w razie potrzeby).
+    """
+    global _writer
+
+    with _writer_lock:
+        if _writer is None:
+            writer_settings = get_order_writer_settings()
+            _writer = OrderWriter(
+                max_batch=writer_settings["MAX_BATCH"],
+                max_delay=writer_settings["MAX_DELAY_MS"] / 1000,
+            )
+        return _writer
+
+
+def shutdown_order_writer() -> None:
+    """
+    Zapisuje zamówienia z kolejki i zatrzymuje wątek zapisujący (np. przy zamykaniu procesu).
+    """
+    global _writer
+
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop()
+
+
+atexit.register(shutdown_order_writer)
+
+
+def save_order(order: SimpleOrder) -> SimpleOrder:
+    """
+    Zapisuje nowe zamówienie razem z indeksem pozycji i emailem w kolejce wysyłki.
+
+    Przy włączonym CALCULATOR_ORDER_WRITER zapis odbywa się w paczce przez wątek
+    zapisujący, w przeciwnym razie w osobnej transakcji. Zwraca zapisane zamówienie.
+    """
+    writer_settings = get_order_writer_settings()
+    if writer_settings["ENABLED"]:
+        return get_order_writer().write(order, timeout=writer_settings["TIMEOUT_SECONDS"])
+
+    with transaction.atomic():
+        order.save(force_insert=True)
+        index_order_items([order])
+        enqueue_order_confirmations([order])
+    return order
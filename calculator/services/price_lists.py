@@ -0,0 +1,255 @@
+"""
+Wersjonowane cenniki i wycena zamówień "na dzień".
+
+Import produktów nadpisuje ceny w tabelach katalogu, dlatego po każdej
+zmianie cen ``record_price_list`` dopisuje nową wersję cennika
+(PriceListVersion + PriceListEntry) z kompletem cen i datą effective_from.
+Zapisane wersje się nie zmieniają.
+
+Wycena na dzień ``as_of`` używa migawki katalogu z cenami wersji
+obowiązującej w tym dniu. Migawka jest budowana raz na wersję (jedno
+zapytanie o ceny) i trzymana w pamięci procesu. Produkty, których nie ma
+w tej wersji cennika albo w aktualnym katalogu, nie mają ceny na ten dzień
+- wycena rzuca wtedy CatalogItemNotFound.
+
+Do wyceny wielu zamówień z różnych dni służy PriceListTimeline: lista
+wersji jest czytana jednym zapytaniem, a wersja dla daty jest wyszukiwana
+w pamięci.
+"""
+
+import bisect
+import dataclasses
+import datetime
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Mapping
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from calculator.domain.order import OrderData
+from calculator.models import PriceListEntry, PriceListVersion
+from calculator.services.catalog_snapshot import (
+    CatalogSnapshot,
+    build_catalog_snapshot,
+    get_catalog_snapshot,
+    load_catalog_snapshot,
+)
+from calculator.services.pricing import PriceBreakdown, calculate_order_price_breakdown
+
+
+DEFAULT_PRICE_LISTS_SETTINGS = {
+    "CACHE_SIZE": 32,
+}
+
+PriceKey = tuple[str, str, str]
+
+_CENTS = Decimal("0.01")
+
+_cached_catalogs: "OrderedDict[tuple[int, str], CatalogSnapshot]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class PriceListNotFound(LookupError):
+    """
+    Brak wersji cennika obowiązującej w podanym dniu.
+    """
+
+
+def get_price_lists_settings() -> dict[str, Any]:
+    """
+    Zwraca ustawienia cenników uzupełnione o wartości domyślne.
+    """
+    return {**DEFAULT_PRICE_LISTS_SETTINGS, **getattr(settings, "CALCULATOR_PRICE_LISTS", {})}
+
+
+def catalog_prices(catalog: CatalogSnapshot) -> dict[PriceKey, Decimal]:
+    """
+    Zwraca ceny produktów migawki katalogu w kształcie wpisów cennika.
+    """
+    prices = {
+        (PriceListEntry.Kind.ENCLOSURE, code, ""): record.price
+        for code, record in catalog.enclosures.items()
+    }
+    prices.update(
+        ((PriceListEntry.Kind.GLAND, size, material), record.price)
+        for (size, material), record in catalog.glands.items()
+    )
+    prices.update(
+        ((PriceListEntry.Kind.TERMINAL, size, color), record.price)
+        for (size, color), record in catalog.terminals.items()
+    )
+    return {key: price.quantize(_CENTS) for key, price in prices.items()}
+
+
+def load_price_list(version_id: int) -> dict[PriceKey, Decimal]:
+    """
+    Ładuje ceny wersji cennika (jedno zapytanie).
+    """
+    return {
+        (kind, code, variant): price
+        for kind, code, variant, price in PriceListEntry.objects.filter(
+            version_id=version_id
+        ).values_list("kind", "code", "variant", "price")
+    }
+
+
+def effective_version(as_of: datetime.datetime) -> PriceListVersion | None:
+    """
+    Zwraca wersję cennika obowiązującą w chwili ``as_of`` (lub None).
+    """
+    return (
+        PriceListVersion.objects.filter(effective_from__lte=as_of)
+        .order_by("-effective_from", "-id")
+        .first()
+    )
+
+
+def parse_effective_from(value: str) -> datetime.datetime:
+    """
+    Zamienia datę (YYYY-MM-DD) lub datę z czasem (ISO 8601) na chwilę w strefie czasowej.
+
+    Rzuca ValueError dla niepoprawnego formatu.
+    """
+    moment = parse_datetime(value)
+    if moment is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(f"Niepoprawna data: {value}")
+        moment = datetime.datetime.combine(date, datetime.time())
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def record_price_list(
+    effective_from: datetime.datetime | None = None, source: str = ""
+) -> PriceListVersion | None:
+    """
+    Dopisuje wersję cennika z aktualnymi cenami katalogu, jeśli różnią się od obowiązujących.
+
+    Parametry:
+        effective_from (datetime | None): Od kiedy obowiązują ceny (domyślnie teraz).
+        source (str): Opis źródła cen, np. komenda importu i plik.
+
+    Zwraca nową wersję albo None, gdy ceny w tym dniu są już takie same.
+    """
+    effective_from = effective_from or timezone.now()
+    # Z bazy głównej - import zapisuje ceny w tym samym połączeniu i transakcji,
+    # a replika (osobne połączenie) widzi tylko zatwierdzone dane.
+    prices = catalog_prices(load_catalog_snapshot(using=DEFAULT_DB_ALIAS))
+
+    with transaction.atomic():
+        current = effective_version(effective_from)
+        if current is not None and load_price_list(current.pk) == prices:
+            return None
+
+        version = PriceListVersion.objects.create(effective_from=effective_from, source=source)
+        PriceListEntry.objects.bulk_create([
+            PriceListEntry(version=version, kind=kind, code=code, variant=variant, price=price)
+            for (kind, code, variant), price in sorted(prices.items())
+        ])
+    return version
+
+
+def price_list_catalog(version_id: int, catalog: CatalogSnapshot | None = None) -> CatalogSnapshot:
+    """
+    Zwraca migawkę katalogu z cenami wersji cennika (z pamięci procesu, jeśli była już budowana).
+
+    Parametry:
+        version_id (int): ID wersji cennika.
+        catalog (CatalogSnapshot | None): Migawka z wymiarami produktów (domyślnie aktualna).
+    """
+    catalog = catalog or get_catalog_snapshot()
+    key = (version_id, catalog.version)
+    with _cache_lock:
+        if key in _cached_catalogs:
+            _cached_catalogs.move_to_end(key)
+            return _cached_catalogs[key]
+
+    snapshot = _with_prices(catalog, load_price_list(version_id))
+
+    with _cache_lock:
+        _cached_catalogs[key] = snapshot
+        while len(_cached_catalogs) > get_price_lists_settings()["CACHE_SIZE"]:
+            _cached_catalogs.popitem(last=False)
+    return snapshot
+
+
+def _with_prices(catalog: CatalogSnapshot, prices: Mapping[PriceKey, Decimal]) -> CatalogSnapshot:
+    enclosures = [
+        dataclasses.replace(record, price=prices[key])
+        for code, record in catalog.enclosures.items()
+        if (key := (PriceListEntry.Kind.ENCLOSURE, code, "")) in prices
+    ]
+    glands = [
+        dataclasses.replace(record, price=prices[key])
+        for (size, material), record in catalog.glands.items()
+        if (key := (PriceListEntry.Kind.GLAND, size, material)) in prices
+    ]
+    terminals = [
+        dataclasses.replace(record, price=prices[key])
+        for (size, color), record in catalog.terminals.items()
+        if (key := (PriceListEntry.Kind.TERMINAL, size, color)) in prices
+    ]
+    return build_catalog_snapshot(enclosures, glands, terminals)
+
+
+def catalog_as_of(as_of: datetime.datetime) -> CatalogSnapshot:
+    """
+    Zwraca migawkę katalogu z cenami obowiązującymi w chwili ``as_of``.
+
+    Rzuca PriceListNotFound, jeśli żadna wersja cennika nie obowiązywała w tej chwili.
+    """
+    version = effective_version(as_of)
+    if version is None:
+        raise PriceListNotFound(f"Brak cennika obowiązującego {as_of:%Y-%m-%d %H:%M}")
+    return price_list_catalog(version.pk)
+
+
+def price_order_as_of(order: OrderData, as_of: datetime.datetime) -> PriceBreakdown:
+    """
+    Wycenia zamówienie według cen obowiązujących w chwili ``as_of``.
+
+    Parametry:
+        order (OrderData): Dane zamówienia.
+        as_of (datetime): Chwila, z której pochodzą ceny (np. utworzenie zamówienia).
+    """
+    return calculate_order_price_breakdown(order, catalog_as_of(as_of))
+
+
+class PriceListTimeline:
+    """
+    Wersje cennika wczytane jednym zapytaniem - wyszukiwanie wersji dla daty bez zapytań.
+    """
+
+    def __init__(self, versions: list[tuple[int, datetime.datetime]] | None = None):
+        if versions is None:
+            versions = list(
+                PriceListVersion.objects.order_by("effective_from", "id")
+                .values_list("id", "effective_from")
+            )
+        self.versions = versions
+        self._effective_from = [effective_from for _, effective_from in versions]
+
+    def version_at(self, as_of: datetime.datetime) -> int:
+        """
+        Zwraca ID wersji obowiązującej w chwili ``as_of`` (PriceListNotFound, jeśli brak).
+        """
+        position = bisect.bisect_right(self._effective_from, as_of)
+        if position == 0:
+            raise PriceListNotFound(f"Brak cennika obowiązującego {as_of:%Y-%m-%d %H:%M}")
+        return self.versions[position - 1][0]
+
+    def versions_between(
+        self, start: datetime.datetime, end: datetime.datetime
+    ) -> list[int]:
+        """
+        Zwraca ID wersji obowiązujących w dowolnej chwili przedziału [start, end].
+        """
+        first = max(bisect.bisect_right(self._effective_from, start) - 1, 0)
+        last = bisect.bisect_right(self._effective_from, end)
+        return [version_id for version_id, _ in self.versions[first:last]]
@@ -0,0 +1,141 @@
+"""
+Wycena zamówień na podstawie migawki katalogu.
+
+Funkcje z tego modułu nie wykonują zapytań do bazy danych, więc mogą działać
+w procesach roboczych (zob. komenda ``reprice_orders``).
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Iterable, Mapping
+
+from calculator.domain.order import GlandSide, OrderData, TerminalItem
+from calculator.services.catalog_snapshot import CatalogSnapshot
+
+
+class CatalogItemNotFound(LookupError):
+    """
+    Produkt z zamówienia nie istnieje w katalogu.
+    """
+
+
+@dataclass(frozen=True)
+class PriceBreakdown:
+    enclosures_price: Decimal
+    glands_price: Decimal
+    terminals_price: Decimal
+
+    @property
+    def total_price(self) -> Decimal:
+        return self.enclosures_price + self.glands_price + self.terminals_price
+
+
+def calculate_order_price_breakdown(order: OrderData, catalog: CatalogSnapshot) -> PriceBreakdown:
+    """
+    Oblicza cenę zamówienia z podziałem na obudowy, dławiki i terminale.
+
+    Cena każdej obudowy wraz z konfiguracją jest mnożona przez jej ilość (quantity).
+
+    Parametry:
+        order (OrderData): Dane zamówienia.
+        catalog (CatalogSnapshot): Migawka katalogu z cenami.
+    """
+    enclosures_price = Decimal('0.00')
+    glands_price = Decimal('0.00')
+    terminals_price = Decimal('0.00')
+
+    for box in order.save_box:
+        enclosure = catalog.enclosures.get(box.code)
+        if enclosure is None:
+            raise CatalogItemNotFound(f"Nie znaleziono obudowy o kodzie: {box.code}")
+
+        enclosures_price += enclosure.price * box.quantity
+        glands_price += _glands_price(box.current_config.glands, catalog) * box.quantity
+        terminals_price += _terminals_price(box.current_config.terminals, catalog) * box.quantity
+
+    return PriceBreakdown(
+        enclosures_price=enclosures_price,
+        glands_price=glands_price,
+        terminals_price=terminals_price,
+    )
+
+
+def _glands_price(glands: Iterable[GlandSide], catalog: CatalogSnapshot) -> Decimal:
+    price = Decimal('0.00')
+
+    for side in glands:
+        for gland in side.items:
+            record = catalog.glands.get((gland.size, gland.material))
+            if record is None:
+                raise CatalogItemNotFound(
+                    f"Nie znaleziono dławika: {gland.size} ({gland.material})"
+                )
+            price += record.price * gland.quantity
+
+    return price
+
+
+def _terminals_price(terminals: Iterable[TerminalItem], catalog: CatalogSnapshot) -> Decimal:
+    price = Decimal('0.00')
+
+    for terminal in terminals:
+        record = (
+            catalog.terminals.get((terminal.size, terminal.color))
+            if terminal.color is not None else None
+        )
+        if record is None:
+            raise CatalogItemNotFound(
+                f"Nie znaleziono terminala: {terminal.size} ({terminal.color})"
+            )
+        price += record.price * terminal.quantity
+
+    return price
+
+
+# Wycena w procesach roboczych (ProcessPoolExecutor).
+# Migawka katalogu (i migawki wersji cennika) są przekazywane raz, w inicjalizatorze procesu.
+
+_worker_catalog: CatalogSnapshot | None = None
+_worker_price_lists: Mapping[int, CatalogSnapshot] = {}
+
+
+def init_pricing_worker(
+    catalog: CatalogSnapshot, price_lists: Mapping[int, CatalogSnapshot] | None = None
+) -> None:
+    """
+    Inicjalizator procesu roboczego - zapamiętuje współdzielone migawki katalogu.
+
+    Parametry:
+        catalog (CatalogSnapshot): Migawka z aktualnymi cenami.
+        price_lists (Mapping | None): Migawki z cenami wersji cennika według ID wersji.
+    """
+    global _worker_catalog, _worker_price_lists
+    _worker_catalog = catalog
+    _worker_price_lists = price_lists or {}
+
+
+def price_orders_chunk(
+    orders: list[tuple[Any, Mapping[str, Any]]], price_list: int | None = None
+) -> list[tuple[Any, PriceBreakdown | None, str | None]]:
+    """
+    Wycenia paczkę zamówień w procesie roboczym.
+
+    Parametry:
+        orders (list): Lista par (id zamówienia, order_data w kształcie JSON).
+        price_list (int | None): ID wersji cennika (domyślnie aktualne ceny katalogu).
+
+    Zwraca listę trójek (id zamówienia, wycena lub None, komunikat błędu lub None).
+    """
+    if _worker_catalog is None:
+        raise RuntimeError("Pricing worker was not initialized with a catalog snapshot")
+    catalog = _worker_catalog if price_list is None else _worker_price_lists[price_list]
+
+    results: list[tuple[Any, PriceBreakdown | None, str | None]] = []
+    for order_id, order_data in orders:
+        try:
+            breakdown = calculate_order_price_breakdown(OrderData.from_dict(order_data), catalog)
+            results.append((order_id, breakdown, None))
+        except (CatalogItemNotFound, AttributeError, KeyError, TypeError) as exception:
+            results.append((order_id, None, str(exception)))
+
+    return results
@@ -0,0 +1,82 @@
+"""
+Dobór produktów z katalogu do wymagań klienta (średnice kabli, obwody).
+
+Struktury wyszukiwania są budowane raz na wersję katalogu i współdzielone
+przez żądania w obrębie procesu.
+"""
+
+import threading
+from typing import Sequence
+
+from calculator.domain.services.gland_selector import GlandSelector
+from calculator.domain.services.terminal_selector import CircuitRequirement, TerminalSelector
+from calculator.services.catalog_snapshot import CatalogSnapshot, GlandRecord, TerminalRecord
+
+
+_gland_selectors: dict[tuple[str, str | None], GlandSelector[GlandRecord]] = {}
+_terminal_selectors: dict[str, TerminalSelector[TerminalRecord]] = {}
+_selectors_lock = threading.Lock()
+
+
+def get_gland_selector(
+    catalog: CatalogSnapshot, material: str | None = None
+) -> GlandSelector[GlandRecord]:
+    """
+    Zwraca indeks dławików (opcjonalnie tylko z danego materiału) dla wersji katalogu.
+    """
+    key = (catalog.version, material)
+    with _selectors_lock:
+        selector = _gland_selectors.get(key)
+        if selector is None:
+            if any(version != catalog.version for version, _ in _gland_selectors):
+                _gland_selectors.clear()
+
+            selector = GlandSelector(
+                gland for gland in catalog.glands.values()
+                if material is None or gland.material == material
+            )
+            _gland_selectors[key] = selector
+
+        return selector
+
+
+def select_glands_for_cables(
+    cable_diameters: Sequence[float], catalog: CatalogSnapshot, material: str | None = None
+) -> list[GlandRecord | None]:
+    """
+    Zwraca najtańszy pasujący dławik dla każdego kabla (None, gdy żaden nie pasuje).
+
+    Parametry:
+        cable_diameters (Sequence[float]): Zewnętrzne średnice kabli w mm.
+        catalog (CatalogSnapshot): Migawka katalogu.
+        material (str | None): Wymagany materiał dławika ("PA" lub "Brass").
+    """
+    return get_gland_selector(catalog, material).select(cable_diameters)
+
+
+def get_terminal_selector(catalog: CatalogSnapshot) -> TerminalSelector[TerminalRecord]:
+    """
+    Zwraca indeks terminali dla wersji katalogu.
+    """
+    with _selectors_lock:
+        selector = _terminal_selectors.get(catalog.version)
+        if selector is None:
+            _terminal_selectors.clear()
+            selector = TerminalSelector(catalog.terminals.values())
+            _terminal_selectors[catalog.version] = selector
+
+        return selector
+
+
+def select_terminals_for_circuits(
+    circuits: Sequence[CircuitRequirement], catalog: CatalogSnapshot, strategy: str = "cheapest"
+) -> list[TerminalRecord | None]:
+    """
+    Zwraca terminal dla każdego obwodu (None, gdy żaden nie spełnia wymagań).
+
+    Parametry:
+        circuits (Sequence[CircuitRequirement]): Wymagany prąd (A), napięcie (V) i kolor.
+        catalog (CatalogSnapshot): Migawka katalogu.
+        strategy (str): "cheapest" (najtańszy) lub "narrowest" (najwęższy na szynie).
+    """
+    return get_terminal_selector(catalog).select_many(circuits, strategy)
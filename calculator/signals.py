@@ -0,0 +1,24 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+
+from calculator.infrastructure.sqlite import configure_sqlite_connection
+from calculator.models import Enclosure, Gland, Terminal
+from calculator.services.catalog_snapshot import invalidate_catalog_snapshot
+
+
+def connect_signals() -> None:
+    """
+    Podłącza odbiorniki sygnałów aplikacji kalkulatora.
+    """
+    for model in (Enclosure, Gland, Terminal):
+        post_save.connect(
+            invalidate_catalog_snapshot, sender=model,
+            dispatch_uid=f"invalidate_catalog_snapshot_save_{model.__name__}",
+        )
+        post_delete.connect(
+            invalidate_catalog_snapshot, sender=model,
+            dispatch_uid=f"invalidate_catalog_snapshot_delete_{model.__name__}",
+        )
+    connection_created.connect(
+        configure_sqlite_connection, dispatch_uid="configure_sqlite_connection",
+    )
@@ -1,3 +1,1749 @@
-from django.test import TestCase
+import csv
+import datetime
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from dataclasses import FrozenInstanceError, replace
+from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
+from types import ModuleType
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core import mail
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail.backends.locmem import EmailBackend
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, router
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from django.db.models import F
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.utils import timezone
+from rest_framework.decorators import api_view
+from rest_framework.exceptions import ParseError
+from rest_framework.response import Response
+
+from calculator import fields
+from calculator.benchmarks import BENCHMARKS, BenchmarkReport
+from calculator.domain.order import CurrentConfig, OrderData, SaveBox, TerminalItem
+from calculator.domain.services.enclosure_index import EnclosureIndex
+from calculator.domain.services.gland_layout_validator import GlandLayoutValidator, MountingArea
+from calculator.domain.services.spatial_hash import SpatialHash
+from calculator.domain.services.terminal_capacity_validator import validate_terminal_capacity
+from calculator.domain.services.terminal_selector import (
+    STRATEGY_KEYS,
+    CircuitRequirement,
+    TerminalSelector,
+)
+from calculator.infrastructure.api import fast_json
+from calculator.infrastructure.api.fast_json import FastJSONParser, FastJSONRenderer
+from calculator.infrastructure.profiling import list_profiles, profile_request
+from calculator.infrastructure.sqlite import DEFAULT_SQLITE_SETTINGS, sqlite_pragmas
+from calculator.models import (
+    Gland,
+    OrderEmailOutbox,
+    OrderItemIndex,
+    PriceListVersion,
+    SimpleOrder,
+)
+from calculator.services import catalog_snapshot
+from calculator.services.catalog_file import (
+    CatalogFileError,
+    encode_catalog,
+    load_catalog_file,
+    write_catalog_file,
+)
+from calculator.services.catalog_import import apply_catalog_import, plan_catalog_import
+from calculator.services import cnc_generator, geometry_pool, price_lists
+from calculator.services.catalog_snapshot import (
+    EnclosureRecord,
+    GlandRecord,
+    TerminalRecord,
+    build_catalog_snapshot,
+    load_catalog_snapshot,
+)
+from calculator.services.geometry import (
+    gland_layout_validator,
+    glands_data_from_catalog,
+    validate_box_geometry,
+    validate_order_geometry,
+)
+from calculator.services.cnc_generator import CNCProgramGenerator
+from calculator.services.enclosure_recommendation import recommend_enclosures
+from calculator.services.email_service import OrderEmailService, enqueue_order_confirmations
+from calculator.services.order_archive import order_history
+from calculator.services.order_export import (
+    EXPORT_COLUMNS,
+    OrderExportFilter,
+    export_order_rows,
+    iter_csv,
+    iter_xlsx,
+)
+from calculator.services.order_item_index import (
+    explain_query_plan,
+    filter_orders_by_items,
+    index_order_items,
+)
+from calculator.services.order_quote import quote_order
+from calculator.services.price_lists import (
+    PriceListNotFound,
+    PriceListTimeline,
+    price_list_catalog,
+    price_order_as_of,
+    record_price_list,
+)
+from calculator.services.product_selection import select_glands_for_cables
+from calculator.services.order_writer import OrderWriter
+from mysite.db_router import ReadYourWritesMiddleware, is_pinned_to_primary
+
+
+class RecordingEmailBackend(EmailBackend):
+    """
+    Backend locmem, który zapisuje wywołania send_messages i odrzuca wybranych odbiorców.
+    """
+
+    def __init__(self, *args, rejected=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rejected = set(rejected)
+        self.calls = []
+
+    def send_messages(self, messages):
+        self.calls.append(connection.in_atomic_block)
+        for message in messages:
+            if self.rejected & set(message.to):
+                raise ConnectionError(f"Odrzucono {message.to}")
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class OrderEmailOutboxTests(TransactionTestCase):
+    """
+    Wysyłka kolejki emaili zamówień (send_pending) przez backend locmem.
+    """
+
+    def _enqueue(self, *recipients):
+        orders = [
+            SimpleOrder.objects.create(
+                customer_name="Test", customer_email=recipient, order_data={"saveBox": []}
+            )
+            for recipient in recipients
+        ]
+        return enqueue_order_confirmations(orders)
+
+    def test_batch_is_drained_over_one_connection_outside_transaction(self):
+        self._enqueue("a@example.com", "b@example.com", "c@example.com")
+        backend = RecordingEmailBackend()
+
+        result = OrderEmailService().send_pending(backend, batch_size=10)
+
+        self.assertEqual((result.sent, result.failed), (3, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(backend.calls, [False, False, False])
+        self.assertEqual(
+            OrderEmailOutbox.objects.filter(status=OrderEmailOutbox.Status.SENT).count(), 3
+        )
+        self.assertEqual(OrderEmailService().send_pending(backend).sent, 0)
+
+    def test_partial_failure_does_not_resend_delivered_emails(self):
+        self._enqueue("a@example.com", "bad@example.com", "c@example.com")
+        backend = RecordingEmailBackend(rejected={"bad@example.com"})
+
+        result = OrderEmailService().send_pending(backend, batch_size=10)
+
+        self.assertEqual((result.sent, result.failed), (2, 1))
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox),
+                         ["a@example.com", "c@example.com"])
+        failed = OrderEmailOutbox.objects.get(recipient="bad@example.com")
+        self.assertEqual(failed.status, OrderEmailOutbox.Status.PENDING)
+        self.assertEqual(failed.attempts, 1)
+        self.assertIsNone(failed.claimed_at)
+
+        # Ponowna próba wysyła tylko email, który się nie powiódł.
+        result = OrderEmailService().send_pending(RecordingEmailBackend(), batch_size=10)
+        self.assertEqual((result.sent, result.failed), (1, 0))
+        self.assertEqual(len(mail.outbox), 3)
+
+    @override_settings(CALCULATOR_ORDER_EMAILS={"MAX_ATTEMPTS": 2})
+    def test_entry_fails_after_max_attempts(self):
+        self._enqueue("bad@example.com")
+        backend = RecordingEmailBackend(rejected={"bad@example.com"})
+        service = OrderEmailService()
+
+        service.send_pending(backend)
+        entry = OrderEmailOutbox.objects.get()
+        self.assertEqual((entry.status, entry.attempts), (OrderEmailOutbox.Status.PENDING, 1))
+
+        service.send_pending(backend)
+        entry.refresh_from_db()
+        self.assertEqual((entry.status, entry.attempts), (OrderEmailOutbox.Status.FAILED, 2))
+        self.assertIn("bad@example.com", entry.last_error)
+
+        self.assertEqual(service.send_pending(backend).failed, 0)
+        self.assertEqual(mail.outbox, [])
+
+
+class CatalogImportTests(TestCase):
+    """
+    Skróty treści i plan przyrostowego importu katalogu.
+    """
+
+    def _record(self, price):
+        return {
+            "catalog_number": "GLD-M20-PA",
+            "size": "M20",
+            "diameter_mm": "20",
+            "physical_diameter_mm": 25,
+            "cable_range_min": 6,
+            "cable_range_max": 12.0,
+            "material": "PA",
+            "price": price,
+        }
+
+    def test_number_formatting_does_not_change_hash(self):
+        apply_catalog_import(plan_catalog_import(Gland, "catalog_number", [self._record("2.50")]))
+
+        for price in (2.5, "2.5", Decimal("2.500")):
+            plan = plan_catalog_import(Gland, "catalog_number", [self._record(price)])
+            self.assertEqual((plan.unchanged, plan.changed, plan.added), (1, [], []))
+
+    def test_changed_price_is_reported_in_diff(self):
+        apply_catalog_import(plan_catalog_import(Gland, "catalog_number", [self._record("2.50")]))
+
+        plan = plan_catalog_import(Gland, "catalog_number", [self._record(2.75)])
+
+        self.assertEqual(list(plan.diff_lines()), ["~ GLD-M20-PA: price 2.50 -> 2.75"])
+
+
+class PrimaryReplicaRouterTests(TestCase):
+    """
+    Router baza główna / replika na dwóch osobnych bazach SQLite.
+    """
+    databases = {"default", "replica"}
+
+    def _gland(self, catalog_number, price="2.50"):
+        return Gland(
+            size="M20", diameter_mm=20, physical_diameter_mm=25, cable_range_min=6,
+            cable_range_max=12, material="PA", price=price, catalog_number=catalog_number,
+        )
+
+    def test_databases_are_separate_files(self):
+        self.assertNotEqual(
+            connections["default"].settings_dict["NAME"],
+            connections["replica"].settings_dict["NAME"],
+        )
+
+    def test_catalog_reads_go_to_replica(self):
+        self._gland("GLD-REPLICA").save(using="replica")
+
+        self.assertEqual(router.db_for_read(Gland), "replica")
+        self.assertEqual(Gland.objects.get().catalog_number, "GLD-REPLICA")
+        self.assertEqual(router.db_for_read(SimpleOrder), "default")
+
+    def test_writes_go_to_default_without_pinning_outside_request(self):
+        self._gland("GLD-PRIMARY").save()
+
+        self.assertTrue(
+            Gland.objects.using("default").filter(catalog_number="GLD-PRIMARY").exists()
+        )
+        self.assertFalse(Gland.objects.exists())
+        self.assertFalse(is_pinned_to_primary())
+        self.assertEqual(router.db_for_read(Gland), "replica")
+
+    def test_reads_after_write_in_request_go_to_default(self):
+        def view(request):
+            before = router.db_for_read(Gland)
+            self._gland("GLD-PRIMARY").save()
+            return before, router.db_for_read(Gland), Gland.objects.get().catalog_number
+
+        before, after, found = ReadYourWritesMiddleware(view)(object())
+
+        self.assertEqual((before, after, found), ("replica", "default", "GLD-PRIMARY"))
+        self.assertFalse(is_pinned_to_primary())
+
+
+class OrderItemIndexQueryPlanTests(TestCase):
+    """
+    Plan zapytań filter_orders_by_items - wyszukiwanie po indeksie pozycji bez skanu zamówień.
+    """
+
+    def _unique_index_name(self):
+        # SQLite tworzy ograniczenie UNIQUE jako indeks sqlite_autoindex_* - szukamy indeksu
+        # z kolumnami ograniczenia order_item_index_unique.
+        table = OrderItemIndex._meta.db_table
+        with connection.cursor() as cursor:
+            columns = connection.introspection.get_constraints(cursor, table)[
+                "order_item_index_unique"
+            ]["columns"]
+            for _, name, unique, *_ in cursor.execute(f"PRAGMA index_list({table})").fetchall():
+                info = cursor.execute(f"PRAGMA index_info({name})").fetchall()
+                if unique and [column for *_, column in info] == columns:
+                    return name
+        self.fail("Brak indeksu dla order_item_index_unique")
+
+    def test_item_filters_use_unique_index(self):
+        index_name = self._unique_index_name()
+        filters = [
+            {"enclosure": "ENC-300-200-150"},
+            {"gland": "M20"},
+            {"gland": "M20", "gland_material": "PA"},
+            {"terminal": "4mm"},
+        ]
+        for item_filter in filters:
+            with self.subTest(**item_filter):
+                plan = explain_query_plan(
+                    filter_orders_by_items(SimpleOrder.objects.all(), **item_filter)
+                )
+                self.assertTrue(any(index_name in line for line in plan), plan)
+                self.assertFalse(any("SCAN simple_orders" in line for line in plan), plan)
+
+
+class BlockingOrderWriter(OrderWriter):
+    """
+    OrderWriter bez bazy danych - zapis paczki czeka, aż test ustawi ``release``.
+    """
+
+    def __init__(self):
+        super().__init__(max_delay=0)
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.inserted = []
+
+    def _insert(self, orders):
+        self.started.set()
+        self.release.wait(5)
+        self.inserted.extend(orders)
+
+
+class OrderWriterTimeoutTests(SimpleTestCase):
+    """
+    Przekroczenie czasu oczekiwania na zapis grupowy zamówienia.
+    """
+
+    def setUp(self):
+        self.writer = BlockingOrderWriter()
+        self.addCleanup(self.writer.stop, 5)
+        self.addCleanup(self.writer.release.set)
+
+    def test_queued_order_is_cancelled_on_timeout(self):
+        first = SimpleOrder(customer_name="Pierwsze")
+        self.writer.submit(first)
+        self.assertTrue(self.writer.started.wait(5))
+
+        queued = SimpleOrder(customer_name="W kolejce")
+        with self.assertRaises(TimeoutError):
+            self.writer.write(queued, timeout=0.05)
+
+        self.writer.release.set()
+        self.writer.stop(5)
+        self.assertEqual(self.writer.inserted, [first])
+
+    def test_running_write_is_awaited_after_timeout(self):
+        order = SimpleOrder(customer_name="W trakcie zapisu")
+        threading.Timer(0.5, self.writer.release.set).start()
+
+        self.assertIs(self.writer.write(order, timeout=0.2), order)
+        self.assertEqual(self.writer.inserted, [order])
+
+
+class OrderDuplicationTests(TestCase):
+    """
+    Duplikowanie zamówienia po zmianie cen wykonanej w innym procesie.
+    """
+
+    def setUp(self):
+        for command, fixture in (
+            ("import_enclosures", "enclosures"),
+            ("import_glands", "glands"),
+            ("import_terminals", "terminals"),
+        ):
+            call_command(command, f"fixtures/{fixture}.json", stdout=StringIO())
+
+        with open("fixtures/order_example.json", encoding="utf-8") as file:
+            order_data = json.load(file)
+        catalog = load_catalog_snapshot(using="default")
+        self.source = SimpleOrder.objects.create(
+            customer_name=order_data["name"],
+            customer_email=order_data["email"],
+            order_data=order_data,
+            **quote_order(OrderData.from_dict(order_data), catalog).as_order_fields(),
+        )
+
+    def test_duplicate_reprices_after_price_change_in_other_process(self):
+        # Migawka w pamięci procesu sprzed zmiany cen (jak w procesie serwera).
+        with patch.multiple(
+            catalog_snapshot,
+            _cached_snapshot=load_catalog_snapshot("default"),
+            _cached_at=time.monotonic(),
+        ):
+            # QuerySet.update() nie wysyła sygnałów - jak import w innym procesie.
+            Gland.objects.update(price=F("price") + 1)
+
+            response = self.client.post(f"/api/recruitment/orders/{self.source.id}/duplicate/")
+
+        self.assertEqual(response.status_code, 201, response.content)
+        duplicate = response.json()["orders"][0]
+        self.assertTrue(duplicate["repriced"])
+        self.assertGreater(Decimal(duplicate["total_price"]), self.source.total_price)
+
+    def test_duplicate_reuses_prices_when_catalog_is_unchanged(self):
+        response = self.client.post(f"/api/recruitment/orders/{self.source.id}/duplicate/")
+
+        self.assertEqual(response.status_code, 201, response.content)
+        duplicate = response.json()["orders"][0]
+        self.assertFalse(duplicate["repriced"])
+        self.assertEqual(Decimal(duplicate["total_price"]), self.source.total_price)
+
+
+class CNCProgramGeneratorTests(TestCase):
+    """
+    Program CNC dla całej serii (expand_quantity).
+    """
+
+    def setUp(self):
+        for command, fixture in (
+            ("import_enclosures", "enclosures"),
+            ("import_glands", "glands"),
+            ("import_terminals", "terminals"),
+        ):
+            call_command(command, f"fixtures/{fixture}.json", stdout=StringIO())
+
+        with open("fixtures/order_example.json", encoding="utf-8") as file:
+            self.order_data = json.load(file)
+        self.catalog = load_catalog_snapshot(using="default")
+
+    def _generate(self, quantity: int) -> tuple[list[str], int]:
+        """
+        Zwraca (linie programu, liczba wywołań optimize_drill_path) dla danej ilości obudów.
+        """
+        order_data = {
+            **self.order_data,
+            "saveBox": [{**box, "quantity": quantity} for box in self.order_data["saveBox"]],
+        }
+        with patch.object(
+            cnc_generator, "optimize_drill_path", wraps=cnc_generator.optimize_drill_path
+        ) as optimize:
+            lines = list(CNCProgramGenerator().generate_order_gcode(
+                OrderData.from_dict(order_data), self.catalog, expand_quantity=True
+            ))
+        return lines, optimize.call_count
+
+    def test_drill_order_is_not_recomputed_for_each_unit(self):
+        lines, calls = self._generate(quantity=3)
+        more_lines, more_calls = self._generate(quantity=8)
+
+        self.assertEqual(more_calls, calls)
+        holes = sum(line.startswith("(Hole") for line in lines)
+        self.assertEqual(sum(line.startswith("(Hole") for line in more_lines), holes * 8 // 3)
+
+
+@api_view(["POST"])
+@profile_request
+def profiled_view(request):
+    return Response({"ok": True})
+
+
+class ProfilingRingBufferTests(SimpleTestCase):
+    """
+    Zapisywanie profili żądań w buforze cyklicznym i komenda list_profiles.
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.order = {"saveBox": [{
+            "quantity": 2,
+            "currentConfig": {
+                "glands": [{"side": "top", "items": [{"quantity": 3}, {"quantity": "x"}]}],
+                "terminals": [{"quantity": 4}],
+            },
+        }]}
+
+    def _post(self, count, **profiling):
+        profiling_settings = {
+            "ENABLED": True, "SAMPLE_RATE": 1, "DIRECTORY": self.directory, **profiling
+        }
+        with override_settings(CALCULATOR_PROFILING=profiling_settings):
+            for _ in range(count):
+                request = RequestFactory().post(
+                    "/api/test/", self.order, content_type="application/json"
+                )
+                self.assertEqual(profiled_view(request).status_code, 200)
+
+    def test_buffer_keeps_newest_profiles_with_order_counts(self):
+        self._post(5, MAX_PROFILES=3)
+
+        profiles = list_profiles(Path(self.directory))
+        self.assertEqual(len(profiles), 3)
+        self.assertEqual(len(list(Path(self.directory).glob("*.prof"))), 3)
+        self.assertEqual(
+            [profile["profile_id"] for profile in profiles],
+            sorted((profile["profile_id"] for profile in profiles), reverse=True),
+        )
+        self.assertEqual(profiles[0]["reason"], "sampled")
+        self.assertEqual(profiles[0]["counts"], {"boxes": 2, "glands": 3, "terminals": 4})
+
+    def test_requests_are_not_profiled_outside_sample_without_threshold(self):
+        self._post(3, SAMPLE_RATE=0)
+
+        self.assertEqual(list_profiles(Path(self.directory)), [])
+
+    def test_list_profiles_command_lists_and_summarizes_profiles(self):
+        self._post(2)
+        profile_id = list_profiles(Path(self.directory))[0]["profile_id"]
+
+        with override_settings(CALCULATOR_PROFILING={"DIRECTORY": self.directory}):
+            listing = StringIO()
+            call_command("list_profiles", stdout=listing)
+            summary = StringIO()
+            call_command("list_profiles", profile_id, "--limit", "5", stdout=summary)
+            with self.assertRaises(CommandError):
+                call_command("list_profiles", "missing", stdout=StringIO())
+
+        self.assertIn("Zapisane profile (2)", listing.getvalue())
+        self.assertIn("obudowy=2 dławiki=3 terminale=4", listing.getvalue())
+        self.assertIn("POST /api/test/", summary.getvalue())
+        self.assertIn("function calls", summary.getvalue())
+
+
+def import_catalog_fixtures():
+    """
+    Importuje obudowy, dławiki i terminale z katalogu fixtures do bazy 'default'.
+    """
+    for command, fixture in (
+        ("import_enclosures", "enclosures"),
+        ("import_glands", "glands"),
+        ("import_terminals", "terminals"),
+    ):
+        call_command(command, f"fixtures/{fixture}.json", stdout=StringIO())
+
+
+def load_order_example():
+    with open("fixtures/order_example.json", encoding="utf-8") as file:
+        return json.load(file)
+
+
+@override_settings(DATABASE_ROUTERS=[])
+class RepriceOrdersTests(TestCase):
+    """
+    Komenda reprice_orders: podgląd (--dry-run) i zapis nowych cen z wersją katalogu.
+    """
+
+    def setUp(self):
+        import_catalog_fixtures()
+        order_data = load_order_example()
+        self.order = SimpleOrder.objects.create(
+            customer_name=order_data["name"],
+            customer_email=order_data["email"],
+            order_data=order_data,
+            **quote_order(
+                OrderData.from_dict(order_data), load_catalog_snapshot()
+            ).as_order_fields(),
+        )
+        Gland.objects.update(price=F("price") + 1)
+        self.catalog = load_catalog_snapshot()
+
+    def _reprice(self, *args):
+        stdout = StringIO()
+        call_command("reprice_orders", "--workers", "1", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_dry_run_reports_changes_without_saving(self):
+        output = self._reprice("--dry-run")
+
+        self.assertIn(f"{self.order.id}: {self.order.total_price} -> ", output)
+        self.assertIn("Sprawdzono zamówień: 1, do zmiany: 1, błędów: 0.", output)
+        stored = SimpleOrder.objects.get()
+        self.assertEqual(stored.total_price, self.order.total_price)
+        self.assertNotEqual(stored.catalog_version, self.catalog.version)
+
+    def test_apply_saves_prices_and_catalog_version(self):
+        output = self._reprice()
+
+        self.assertIn("zmienionych: 1", output)
+        stored = SimpleOrder.objects.get()
+        expected = quote_order(OrderData.from_dict(stored.order_data), self.catalog)
+        self.assertEqual(stored.total_price, expected.breakdown.total_price)
+        self.assertGreater(stored.glands_price, self.order.glands_price)
+        self.assertEqual(stored.enclosures_price, self.order.enclosures_price)
+        self.assertEqual(stored.catalog_version, self.catalog.version)
+
+        self.assertIn("zmienionych: 0", self._reprice())
+
+    def test_stale_catalog_version_is_updated_when_prices_are_unchanged(self):
+        self._reprice()
+        SimpleOrder.objects.update(catalog_version="stale")
+
+        output = self._reprice()
+
+        self.assertIn("zmienionych: 1", output)
+        self.assertEqual(SimpleOrder.objects.get().catalog_version, self.catalog.version)
+
+    def test_pool_gives_the_same_prices(self):
+        call_command("reprice_orders", "--workers", "2", "--chunk-size", "1", stdout=StringIO())
+
+        stored = SimpleOrder.objects.get()
+        expected = quote_order(OrderData.from_dict(stored.order_data), self.catalog)
+        self.assertEqual(stored.total_price, expected.breakdown.total_price)
+        self.assertEqual(stored.catalog_version, self.catalog.version)
+
+
+class EnclosureRecommendationTests(TestCase):
+    """
+    Rekomendacja obudów - odrzucanie kandydatów po ograniczeniach nie zmienia wyniku.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        import_catalog_fixtures()
+
+    def setUp(self):
+        self.catalog = load_catalog_snapshot("default")
+
+    def _config(self, glands=(), terminals=()):
+        return CurrentConfig.from_dict({
+            "glands": [
+                {"side": side, "items": [
+                    {"size": size, "quantity": quantity, "material": "PA"}
+                    for size, quantity in items
+                ]}
+                for side, items in glands
+            ],
+            "terminals": [
+                {"size": size, "quantity": quantity, "color": "blue"}
+                for size, quantity in terminals
+            ],
+        })
+
+    def _cheapest_by_full_layout(self, config, limit):
+        """
+        Najtańsze obudowy z pełnym rozmieszczeniem każdej obudowy katalogu (bez odrzucania).
+        """
+        glands_data = glands_data_from_catalog(self.catalog)
+        box = SaveBox(code="", quantity=1, current_config=config)
+        validator = gland_layout_validator()
+        fitting = [
+            enclosure.code
+            for enclosure in sorted(self.catalog.enclosures.values(), key=lambda e: e.price)
+            if validate_box_geometry(0, box, enclosure, glands_data, validator).is_valid
+        ]
+        return fitting[:limit]
+
+    def test_recommendations_match_full_layout_of_every_enclosure(self):
+        configs = [
+            self._config(glands=[("top", [("M20", 3), ("M16", 2)])], terminals=[("4mm", 5)]),
+            self._config(glands=[("top", [("M40", 12)]), ("left", [("M25", 6)])]),
+            self._config(terminals=[("50mm", 3)]),
+        ]
+        for config in configs:
+            with self.subTest(config=config):
+                result = recommend_enclosures(config, self.catalog, limit=3)
+
+                self.assertTrue(result.recommendations)
+                self.assertEqual(
+                    [geometry.code for geometry in result.recommendations],
+                    self._cheapest_by_full_layout(config, 3),
+                )
+
+    def test_bounds_prune_enclosures_before_layout(self):
+        config = self._config(glands=[("top", [("M40", 12)])], terminals=[("50mm", 3)])
+
+        result = recommend_enclosures(config, self.catalog, limit=len(self.catalog.enclosures))
+
+        self.assertGreater(result.pruned, 0)
+        self.assertEqual(result.laid_out, result.candidates - result.pruned)
+        self.assertEqual(
+            [geometry.code for geometry in result.recommendations],
+            self._cheapest_by_full_layout(config, len(self.catalog.enclosures)),
+        )
+
+    def test_endpoint_returns_cheapest_enclosures_and_rejects_unknown_gland(self):
+        with patch.multiple(
+            catalog_snapshot, _cached_snapshot=self.catalog, _cached_at=time.monotonic()
+        ):
+            response = self.client.post(
+                "/api/recruitment/enclosures/recommend/",
+                {"currentConfig": {"glands": [], "terminals": [
+                    {"size": "50mm", "quantity": 3, "color": "blue"}
+                ]}, "limit": 2},
+                content_type="application/json",
+            )
+            unknown = self.client.post(
+                "/api/recruitment/enclosures/recommend/",
+                {"currentConfig": {"glands": [
+                    {"side": "top", "items": [{"size": "M99", "quantity": 1, "material": "PA"}]}
+                ], "terminals": []}},
+                content_type="application/json",
+            )
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(
+            [item["code"] for item in response.json()["recommendations"]],
+            ["ENC-600-400-200", "ENC-600-500-250"],
+        )
+        self.assertEqual(unknown.status_code, 400, unknown.content)
+
+
+class EnclosureIndexTests(SimpleTestCase):
+    """
+    Zapytania indeksu obudów w porównaniu z filtrowaniem wszystkich obudów.
+    """
+
+    def setUp(self):
+        rng = random.Random(0)
+        self.enclosures = [
+            EnclosureRecord(
+                code=f"ENC-{number}",
+                name=f"Obudowa {number}",
+                price=Decimal(rng.randrange(50, 500)),
+                dimension_width=rng.randrange(100, 1000, 50),
+                dimension_height=rng.randrange(100, 1000, 50),
+                dimension_depth=rng.randrange(100, 400, 50),
+                mounting_areas={
+                    side: (float(rng.randrange(50, 900)), float(rng.randrange(50, 900)))
+                    for side in ("top", "down", "left", "right")
+                    if rng.random() < 0.8
+                },
+                terminal_capacity={},
+            )
+            for number in range(200)
+        ]
+        self.index = EnclosureIndex(self.enclosures)
+
+    def _scan(self, min_width=None, min_height=None, min_depth=None, mounting_areas=None):
+        def fits(enclosure):
+            dimensions = (
+                (enclosure.dimension_width, min_width),
+                (enclosure.dimension_height, min_height),
+                (enclosure.dimension_depth, min_depth),
+            )
+            if any(minimum is not None and value < minimum for value, minimum in dimensions):
+                return False
+            return all(
+                side in enclosure.mounting_areas
+                and enclosure.mounting_areas[side][0] >= min_x
+                and enclosure.mounting_areas[side][1] >= min_y
+                for side, (min_x, min_y) in (mounting_areas or {}).items()
+            )
+
+        return sorted(
+            (enclosure for enclosure in self.enclosures if fits(enclosure)),
+            key=lambda enclosure: (enclosure.price, enclosure.code),
+        )
+
+    def test_queries_match_full_scan_in_price_order(self):
+        queries = [
+            {},
+            {"min_width": 500},
+            {"min_width": 300, "min_height": 600, "min_depth": 250},
+            {"mounting_areas": {"top": (400.0, 200.0)}},
+            {"min_depth": 200, "mounting_areas": {"left": (100.0, 100.0), "right": (300.0, 50.0)}},
+            {"min_width": 2000},
+        ]
+        for query in queries:
+            with self.subTest(**query):
+                self.assertEqual(self.index.query(**query), self._scan(**query))
+
+    def test_missing_mounting_area_excludes_enclosure(self):
+        enclosure = EnclosureRecord(
+            code="ENC-TOP", name="Tylko góra", price=Decimal("10"), dimension_width=100,
+            dimension_height=100, dimension_depth=100, mounting_areas={"top": (80.0, 80.0)},
+            terminal_capacity={},
+        )
+        index = EnclosureIndex([enclosure])
+
+        self.assertEqual(index.query(mounting_areas={"top": (80.0, 80.0)}), [enclosure])
+        self.assertEqual(index.query(mounting_areas={"left": (1.0, 1.0)}), [])
+
+
+class GlandSelectionTests(TestCase):
+    """
+    Dobór najtańszego dławika do średnic kabli.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        import_catalog_fixtures()
+
+    def setUp(self):
+        self.catalog = load_catalog_snapshot("default")
+
+    def _cheapest(self, diameter, material=None):
+        matching = [
+            gland for gland in self.catalog.glands.values()
+            if gland.cable_range_min <= diameter <= gland.cable_range_max
+            and material in (None, gland.material)
+        ]
+        return min(
+            matching,
+            key=lambda gland: (gland.price, gland.physical_diameter_mm, gland.catalog_number),
+            default=None,
+        )
+
+    def test_batch_selection_matches_cheapest_matching_gland(self):
+        rng = random.Random(0)
+        cables = [round(rng.uniform(0, 60), 1) for _ in range(300)] + [3, 6.5, 13, 53, 53.1]
+        for material in (None, "PA", "Brass"):
+            with self.subTest(material=material):
+                self.assertEqual(
+                    select_glands_for_cables(cables, self.catalog, material),
+                    [self._cheapest(cable, material) for cable in cables],
+                )
+
+    def test_endpoint_groups_selected_glands_into_items(self):
+        with patch.multiple(
+            catalog_snapshot, _cached_snapshot=self.catalog, _cached_at=time.monotonic()
+        ):
+            response = self.client.post(
+                "/api/recruitment/glands/select/",
+                {"cables": [8, 20, 9.5, 100], "material": "Brass"},
+                content_type="application/json",
+            )
+
+        self.assertEqual(response.status_code, 200, response.content)
+        body = response.json()
+        self.assertEqual(
+            [gland and gland["size"] for gland in body["glands"]], ["M16", "M32", "M16", None]
+        )
+        self.assertEqual(body["items"], [
+            {"size": "M16", "material": "Brass", "quantity": 2},
+            {"size": "M32", "material": "Brass", "quantity": 1},
+        ])
+        self.assertEqual(body["unmatched"], [3])
+
+
+class TerminalSelectionTests(TestCase):
+    """
+    Dobór terminali do prądu, napięcia i koloru obwodów.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        import_catalog_fixtures()
+
+    def test_selection_matches_best_eligible_terminal_for_each_strategy(self):
+        rng = random.Random(0)
+        terminals = [
+            TerminalRecord(
+                wire_cross_section=f"{number}mm",
+                color=rng.choice(["blue", "red", "gray"]),
+                price=Decimal(rng.randrange(50, 500)) / 100,
+                width_mm=rng.choice([5.2, 6.2, 8.2, 10.2]),
+                voltage=rng.choice([250, 400, 690, 800, 1000]),
+                current=float(rng.randrange(10, 200)),
+                catalog_number=f"TERM-{number}",
+            )
+            for number in range(150)
+        ]
+        selector = TerminalSelector(terminals)
+        requirements = [
+            CircuitRequirement(
+                current=float(rng.randrange(0, 220)),
+                voltage=rng.choice([0, 230, 400, 800, 1000, 1200]),
+                color=rng.choice([None, "blue", "red", "gray", "green"]),
+            )
+            for _ in range(300)
+        ]
+
+        for strategy, key in STRATEGY_KEYS.items():
+            expected = [
+                min(
+                    (
+                        terminal for terminal in terminals
+                        if terminal.current >= requirement.current
+                        and terminal.voltage >= requirement.voltage
+                        and requirement.color in (None, terminal.color)
+                    ),
+                    key=key,
+                    default=None,
+                )
+                for requirement in requirements
+            ]
+            with self.subTest(strategy=strategy):
+                self.assertEqual(selector.select_many(requirements, strategy), expected)
+
+    def test_unknown_strategy_is_rejected(self):
+        with self.assertRaises(ValueError):
+            TerminalSelector([]).select(CircuitRequirement(current=1), "widest")
+
+    def test_endpoint_checks_enclosure_terminal_capacity(self):
+        with patch.multiple(
+            catalog_snapshot,
+            _cached_snapshot=load_catalog_snapshot("default"),
+            _cached_at=time.monotonic(),
+        ):
+            response = self.client.post(
+                "/api/recruitment/terminals/select/",
+                {
+                    "circuits": [
+                        {"current": 30, "voltage": 400, "color": "blue", "quantity": 5},
+                        {"current": 500, "quantity": 1},
+                    ],
+                    "enclosure_code": "ENC-200-150-100",
+                },
+                content_type="application/json",
+            )
+            missing = self.client.post(
+                "/api/recruitment/terminals/select/",
+                {"circuits": [{"current": 10}], "enclosure_code": "ENC-NOPE"},
+                content_type="application/json",
+            )
+
+        self.assertEqual(response.status_code, 200, response.content)
+        body = response.json()
+        self.assertEqual(body["terminals"][0]["size"], "4mm")
+        self.assertIsNone(body["terminals"][1])
+        self.assertEqual(body["items"], [{"size": "4mm", "color": "blue", "quantity": 5}])
+        self.assertEqual(body["unmatched"], [1])
+        self.assertFalse(body["capacity"]["valid"])
+        self.assertEqual(missing.status_code, 404)
+
+
+GLANDS_DATA = {
+    "M25": {"physical_diameter_mm": 30, "diameter_mm": 25},
+    "M32": {"physical_diameter_mm": 37, "diameter_mm": 32},
+    "M40": {"physical_diameter_mm": 46, "diameter_mm": 40},
+    "M50": {"physical_diameter_mm": 56, "diameter_mm": 50},
+}
+
+
+class GlandLayoutAssertions:
+    """
+    Sprawdzenie, że otwory układu leżą w obszarze (z marginesem) i zachowują odstępy.
+    """
+
+    # Współrzędne otworów są zaokrąglane do 0,001 mm.
+    TOLERANCE = 1e-2
+
+    def assertLayoutFits(self, layout, area, hole_count):
+        margin = GlandLayoutValidator.EDGE_MARGIN
+        tolerance = self.TOLERANCE
+        positions = layout.positions
+        self.assertEqual(len(positions), hole_count)
+        for position in positions:
+            radius = position.diameter / 2
+            self.assertGreaterEqual(position.x - radius, margin - tolerance, position)
+            self.assertLessEqual(position.x + radius, area.width - margin + tolerance, position)
+            self.assertGreaterEqual(position.y - radius, margin - tolerance, position)
+            self.assertLessEqual(position.y + radius, area.height - margin + tolerance, position)
+        for index, first in enumerate(positions):
+            for second in positions[index + 1:]:
+                self.assertGreaterEqual(
+                    math.dist((first.x, first.y), (second.x, second.y)),
+                    (first.diameter + second.diameter) / 2
+                    + GlandLayoutValidator.MIN_SPACING - tolerance,
+                    (first, second),
+                )
+
+
+class OptimalGlandLayoutTests(GlandLayoutAssertions, SimpleTestCase):
+    """
+    Tryb "optimal" - przeszukiwanie z ograniczeniami, gdy FFD odrzuca układ.
+    """
+
+    glands = [{"size": "M25", "quantity": 5}, {"size": "M32", "quantity": 3}]
+    area = MountingArea(width=190, height=120, side="top")
+
+    def test_branch_and_bound_finds_layout_rejected_by_ffd(self):
+        ffd = GlandLayoutValidator().compute_layout(self.glands, self.area, GLANDS_DATA)
+        optimal = GlandLayoutValidator(mode="optimal", time_budget=1).compute_layout(
+            self.glands, self.area, GLANDS_DATA
+        )
+
+        self.assertFalse(ffd.is_valid)
+        self.assertTrue(optimal.is_valid, optimal.message)
+        self.assertEqual(optimal.algorithm, GlandLayoutValidator.ALGORITHM_BRANCH_AND_BOUND)
+        self.assertLayoutFits(optimal, self.area, 8)
+
+    def test_exhausted_time_budget_falls_back_to_ffd_result(self):
+        # Przeszukiwanie sprawdza limit czasu co 64 węzły - układ wymaga dłuższego przeszukiwania.
+        glands = [
+            {"size": "M25", "quantity": 1},
+            {"size": "M40", "quantity": 6},
+            {"size": "M50", "quantity": 3},
+        ]
+        area = MountingArea(width=220, height=230, side="top")
+
+        layout = GlandLayoutValidator(mode="optimal", time_budget=0).compute_layout(
+            glands, area, GLANDS_DATA
+        )
+
+        self.assertFalse(layout.is_valid)
+        self.assertEqual(layout.algorithm, GlandLayoutValidator.ALGORITHM_FFD_TIMEOUT)
+
+    def test_layout_accepted_by_ffd_is_not_searched(self):
+        area = MountingArea(width=400, height=300, side="top")
+
+        layout = GlandLayoutValidator(mode="optimal").compute_layout(
+            self.glands, area, GLANDS_DATA
+        )
+
+        self.assertTrue(layout.is_valid)
+        self.assertEqual(layout.algorithm, GlandLayoutValidator.ALGORITHM_FFD)
+        self.assertLayoutFits(layout, area, 8)
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            GlandLayoutValidator(mode="random")
+
+
+class StaggeredGlandLayoutTests(GlandLayoutAssertions, SimpleTestCase):
+    """
+    Tryb "staggered" - przesunięte rzędy, gdy FFD odrzuca układ.
+    """
+
+    def test_staggered_rows_fit_layout_rejected_by_ffd(self):
+        cases = [
+            ([{"size": "M32", "quantity": 2}], MountingArea(width=100, height=110, side="top")),
+            (
+                [{"size": "M50", "quantity": 1}, {"size": "M40", "quantity": 2}],
+                MountingArea(width=110, height=180, side="left"),
+            ),
+        ]
+        for glands, area in cases:
+            with self.subTest(glands=glands, area=area):
+                ffd = GlandLayoutValidator().compute_layout(glands, area, GLANDS_DATA)
+                staggered = GlandLayoutValidator(mode="staggered").compute_layout(
+                    glands, area, GLANDS_DATA
+                )
+
+                self.assertFalse(ffd.is_valid)
+                self.assertTrue(staggered.is_valid, staggered.message)
+                self.assertEqual(staggered.algorithm, GlandLayoutValidator.ALGORITHM_STAGGERED)
+                self.assertLayoutFits(
+                    staggered, area, sum(gland["quantity"] for gland in glands)
+                )
+
+    def test_equal_glands_pack_more_densely_than_ffd_rows(self):
+        area = MountingArea(width=300, height=1000, side="top")
+        glands = [{"size": "M25", "quantity": 120}]
+
+        ffd = GlandLayoutValidator().compute_layout(glands, area, GLANDS_DATA)
+        # Obszar o 1 mm niższy niż wymagają rzędy FFD.
+        lower_area = MountingArea(
+            width=300, height=ffd.required_height + 2 * GlandLayoutValidator.EDGE_MARGIN - 1,
+            side="top",
+        )
+        staggered = GlandLayoutValidator(mode="staggered").compute_layout(
+            glands, lower_area, GLANDS_DATA
+        )
+
+        self.assertTrue(ffd.is_valid)
+        self.assertTrue(staggered.is_valid, staggered.message)
+        self.assertEqual(staggered.algorithm, GlandLayoutValidator.ALGORITHM_STAGGERED)
+        self.assertLayoutFits(staggered, lower_area, 120)
+        self.assertLess(staggered.required_height, ffd.required_height)
+
+    def test_spatial_hash_returns_bands_from_top_within_columns(self):
+        grid = SpatialHash(cell_size=10)
+        for circle in [(5, 5, 2), (25, 5, 2), (5, 35, 3), (45, 35, 1)]:
+            grid.insert(*circle)
+
+        bands = list(grid.bands_from_top(0, 29))
+
+        self.assertEqual([bottom for bottom, _ in bands], [30, 20, 10, 0])
+        self.assertEqual(bands[0][1], [(5, 35, 3)])
+        self.assertEqual(sorted(bands[3][1]), [(5, 5, 2), (25, 5, 2)])
+        self.assertEqual(grid.max_radius, 3)
+        with self.assertRaises(ValueError):
+            SpatialHash(0)
+
+
+class GeometryPoolTests(TestCase):
+    """
+    Walidacja geometryczna dużych zamówień w puli procesów.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        import_catalog_fixtures()
+
+    def setUp(self):
+        self.catalog = load_catalog_snapshot("default")
+        boxes = load_order_example()["saveBox"] * 10
+        boxes.insert(3, {**boxes[0], "code": "ENC-NOPE"})
+        self.order = OrderData.from_dict({"saveBox": boxes})
+        self.addCleanup(geometry_pool.shutdown_geometry_pool)
+
+    def test_pool_is_disabled_by_default(self):
+        with override_settings(CALCULATOR_GEOMETRY_POOL={}):
+            self.assertFalse(geometry_pool.should_use_pool(10_000))
+
+    @override_settings(CALCULATOR_GEOMETRY_POOL={
+        "ENABLED": True, "WORKERS": 2, "MIN_BOXES": 4, "CHUNK_SIZE": 3,
+    })
+    def test_pool_results_match_validation_in_process(self):
+        self.assertTrue(geometry_pool.should_use_pool(len(self.order.save_box)))
+        pooled = validate_order_geometry(self.order, self.catalog)
+
+        with override_settings(CALCULATOR_GEOMETRY_POOL={"ENABLED": False}):
+            inline = validate_order_geometry(self.order, self.catalog)
+
+        self.assertEqual(pooled, inline)
+        self.assertEqual(
+            [result.box_index for result in pooled], list(range(len(self.order.save_box)))
+        )
+        self.assertFalse(pooled[3].is_valid)
+
+    @override_settings(CALCULATOR_GEOMETRY_POOL={"ENABLED": True, "WORKERS": 2})
+    def test_replaced_pool_finishes_submitted_chunks(self):
+        old_pool = geometry_pool.get_geometry_pool(self.catalog)
+        boxes = list(enumerate(self.order.save_box[:3]))
+        future = old_pool.submit(geometry_pool.validate_boxes_chunk, boxes)
+
+        new_catalog = replace(self.catalog, version="new")
+        new_pool = geometry_pool.get_geometry_pool(new_catalog)
+        # Zamknięcie starej (już zastąpionej) puli nie dotyczy nowej.
+        geometry_pool.shutdown_geometry_pool(old_pool)
+
+        self.assertIsNot(new_pool, old_pool)
+        self.assertEqual(len(future.result(timeout=30)), 3)
+        self.assertIs(geometry_pool.get_geometry_pool(new_catalog), new_pool)
+
+
+class OrderDataTests(SimpleTestCase):
+    """
+    Zamiana JSON zamówienia na niemutowalne obiekty domenowe.
+    """
+
+    def setUp(self):
+        self.data = load_order_example()
+
+    def test_from_dict_keeps_every_field_of_the_order(self):
+        order = OrderData.from_dict(self.data)
+
+        self.assertEqual(order.name, self.data["name"])
+        self.assertEqual(order.user_information, self.data["userInformation"])
+        self.assertEqual(len(order.save_box), len(self.data["saveBox"]))
+        for box, box_data in zip(order.save_box, self.data["saveBox"]):
+            config = box_data["currentConfig"]
+            self.assertEqual((box.code, box.quantity, box.id, box.name), (
+                box_data["code"], box_data["quantity"], box_data["id"], box_data["name"]
+            ))
+            self.assertEqual(box.current_config.box_type, config.get("box_type", ""))
+            self.assertEqual(
+                [(side.side, [(item.size, item.quantity, item.material) for item in side.items])
+                 for side in box.current_config.glands],
+                [(side["side"], [(item["size"], item["quantity"], item["material"])
+                                 for item in side["items"]])
+                 for side in config["glands"]],
+            )
+            self.assertEqual(
+                [(item.size, item.quantity, item.color) for item in box.current_config.terminals],
+                [(item["size"], item["quantity"], item.get("color"))
+                 for item in config["terminals"]],
+            )
+
+    def test_objects_are_frozen_slotted_and_share_interned_strings(self):
+        first = OrderData.from_dict(json.loads(json.dumps(self.data)))
+        second = OrderData.from_dict(json.loads(json.dumps(self.data)))
+
+        self.assertEqual(first, second)
+        self.assertIs(first.save_box[0].code, second.save_box[0].code)
+        self.assertIs(
+            first.save_box[0].current_config.glands[0].items[0].material,
+            second.save_box[0].current_config.glands[0].items[0].material,
+        )
+        self.assertFalse(hasattr(first.save_box[0], "__dict__"))
+        with self.assertRaises(FrozenInstanceError):
+            first.save_box[0].quantity = 3
+
+    def test_missing_required_key_raises_key_error(self):
+        del self.data["saveBox"][0]["currentConfig"]
+
+        with self.assertRaises(KeyError):
+            OrderData.from_dict(self.data)
+
+    def test_terminal_capacity_accepts_domain_items_and_dicts(self):
+        capacity = {"2,5mm": 9, "4mm": 8}
+        items = [TerminalItem("2,5mm", 6, "blue"), TerminalItem("2,5mm", 4), TerminalItem("4mm", 2)]
+        dicts = [{"size": item.size, "quantity": item.quantity} for item in items]
+
+        for terminals in (items, dicts):
+            is_valid, message, details = validate_terminal_capacity(terminals, capacity)
+            self.assertFalse(is_valid)
+            self.assertIn("terminale 2,5mm: wymagane 10, pojemność 9", message)
+            self.assertEqual(details["4mm"], {"required": 2, "capacity": 8, "fits": True})
+
+
+class CatalogFileTests(SimpleTestCase):
+    """
+    Zapis i odczyt binarnego pliku migawki katalogu.
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "catalog.bin"
+        self.catalog = build_catalog_snapshot(
+            [
+                EnclosureRecord(
+                    code="ENC-300-200-150", name="Skrzynka 300x200x150 – ŻÓŁTA",
+                    price=Decimal("125.50"), dimension_width=300, dimension_height=200,
+                    dimension_depth=150,
+                    mounting_areas={"top": (280.0, 180.0), "left": (180.5, 130.25)},
+                    terminal_capacity={"2,5mm": 9, "4mm": 8},
+                ),
+                EnclosureRecord(
+                    code="ENC-EMPTY", name="", price=Decimal("0.01"), dimension_width=1,
+                    dimension_height=1, dimension_depth=1, mounting_areas={},
+                    terminal_capacity={},
+                ),
+            ],
+            [
+                GlandRecord(
+                    size="M20", material="PA", price=Decimal("4.10"), diameter_mm=20,
+                    physical_diameter_mm=25, cable_range_min=6.0, cable_range_max=13.0,
+                    catalog_number="GLD-M20-PA",
+                ),
+            ],
+            [
+                TerminalRecord(
+                    wire_cross_section="2,5mm", color="blue", price=Decimal("1.20"),
+                    width_mm=6.2, voltage=800, current=24.0, catalog_number="TERM-2.5-BL",
+                ),
+            ],
+        )
+
+    def test_round_trip_gives_equal_snapshot_and_version(self):
+        size = write_catalog_file(self.catalog, self.path)
+
+        loaded = load_catalog_file(self.path)
+
+        self.assertEqual(size, self.path.stat().st_size)
+        self.assertEqual(loaded, self.catalog)
+        self.assertEqual(loaded.version, self.catalog.version)
+        self.assertEqual(
+            loaded.enclosure_index.query(mounting_areas={"left": (100.0, 100.0)}),
+            [self.catalog.enclosures["ENC-300-200-150"]],
+        )
+
+    def test_encoding_is_deterministic(self):
+        self.assertEqual(encode_catalog(self.catalog), encode_catalog(self.catalog))
+
+    def test_prices_with_fractional_grosze_are_rejected(self):
+        catalog = replace(self.catalog, glands={
+            key: replace(gland, price=Decimal("4.105"))
+            for key, gland in self.catalog.glands.items()
+        })
+
+        with self.assertRaises(CatalogFileError):
+            encode_catalog(catalog)
+
+    def test_catalog_file_setting_reloads_replaced_file(self):
+        write_catalog_file(self.catalog, self.path)
+        changed = replace(self.catalog, version="changed")
+
+        with override_settings(CALCULATOR_CATALOG_FILE=str(self.path)), patch.multiple(
+            catalog_snapshot, _cached_snapshot=None, _cached_file_mtime=None
+        ):
+            first = catalog_snapshot.get_catalog_snapshot()
+            self.assertIs(catalog_snapshot.get_catalog_snapshot(), first)
+
+            write_catalog_file(changed, self.path)
+            stat = self.path.stat()
+            os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            reloaded = catalog_snapshot.get_catalog_snapshot()
+
+        self.assertEqual(first.version, self.catalog.version)
+        self.assertEqual(reloaded.version, "changed")
+
+    def test_damaged_files_are_rejected(self):
+        data = encode_catalog(self.catalog)
+        for name, damaged in (
+            ("too short", data[:10]),
+            ("magic", b"XCAT" + data[4:]),
+            ("truncated column", data[:-16]),
+        ):
+            with self.subTest(name):
+                self.path.write_bytes(damaged)
+                with self.assertRaises(CatalogFileError):
+                    load_catalog_file(self.path)
+
+
+class RunBenchmarkCommandTests(SimpleTestCase):
+    """
+    Komenda run_benchmark importuje i parsuje opcje tylko wybranego benchmarku.
+    """
+
+    def setUp(self):
+        self.benchmark = ModuleType("fake_benchmark", "Testowy benchmark.")
+        self.benchmark.add_arguments = lambda parser: parser.add_argument(
+            "--repeat", type=int, default=1
+        )
+        self.runs = []
+
+        def run(repeat, **options):
+            self.runs.append(repeat)
+            return BenchmarkReport(
+                title="Test", columns=["n"], rows=[[repeat]],
+                failures=["za wolno"] if repeat > 5 else [],
+            )
+
+        self.benchmark.run = run
+        self.loaded = []
+
+        def get_benchmark(name):
+            self.loaded.append(name)
+            return self.benchmark
+
+        patcher = patch(
+            "calculator.management.commands.run_benchmark.get_benchmark", get_benchmark
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        benchmarks = patch.dict(BENCHMARKS, {"fake": "fake_benchmark"})
+        benchmarks.start()
+        self.addCleanup(benchmarks.stop)
+
+    def test_only_selected_benchmark_is_loaded_with_its_options(self):
+        stdout = StringIO()
+        call_command("run_benchmark", "fake", "--repeat", "3", stdout=stdout)
+
+        self.assertEqual(self.loaded, ["fake"])
+        self.assertEqual(self.runs, [3])
+        self.assertIn("Test", stdout.getvalue())
+
+    def test_unknown_option_and_failures_raise_command_error(self):
+        with self.assertRaises(CommandError):
+            call_command("run_benchmark", "fake", "--bogus", stdout=StringIO())
+        with self.assertRaisesMessage(CommandError, "za wolno"):
+            call_command("run_benchmark", "fake", "--repeat", "6", stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command("run_benchmark", "missing", stdout=StringIO())
+
+
+class LazyViewImportsTests(SimpleTestCase):
+    """
+    Import URLconf nie importuje ciężkich modułów używanych tylko przez część widoków.
+    """
+
+    def test_urlconf_import_skips_heavy_services(self):
+        lazy_modules = [
+            "calculator.services.cnc_generator",
+            "calculator.services.email_service",
+            "calculator.services.enclosure_recommendation",
+            "calculator.services.geometry",
+            "calculator.services.order_duplication",
+            "calculator.services.order_quote",
+        ]
+        script = (
+            "import json, sys, django\n"
+            "django.setup()\n"
+            f"import {settings.ROOT_URLCONF}\n"
+            f"print(json.dumps([name for name in {lazy_modules!r} if name in sys.modules]))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True, text=True, cwd=settings.BASE_DIR, timeout=60,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE},
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(json.loads(result.stdout), [])
+
+
+class SQLiteConnectionSettingsTests(SimpleTestCase):
+    """
+    PRAGMA ustawiane przy każdym nowym połączeniu SQLite (CALCULATOR_SQLITE).
+    """
+
+    def _pragmas_of_new_connection(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        wrapper = SQLiteDatabaseWrapper({
+            **connection.settings_dict,
+            "NAME": str(Path(directory.name) / "db.sqlite3"),
+            "OPTIONS": {},
+        }, alias="sqlite_settings_test")
+        self.addCleanup(wrapper.close)
+        with wrapper.cursor() as cursor:
+            return {
+                name: cursor.execute(f"PRAGMA {name}").fetchone()[0]
+                for name in ("journal_mode", "synchronous", "busy_timeout", "mmap_size")
+            }
+
+    @override_settings(CALCULATOR_SQLITE={"ENABLED": True, "MMAP_SIZE": 1024 * 1024})
+    def test_new_connection_gets_configured_pragmas(self):
+        self.assertEqual(self._pragmas_of_new_connection(), {
+            "journal_mode": "wal",
+            "synchronous": 1,  # NORMAL
+            "busy_timeout": DEFAULT_SQLITE_SETTINGS["BUSY_TIMEOUT_MS"],
+            "mmap_size": 1024 * 1024,
+        })
+
+    @override_settings(CALCULATOR_SQLITE={"ENABLED": False})
+    def test_disabled_settings_leave_sqlite_defaults(self):
+        self.assertEqual(self._pragmas_of_new_connection()["journal_mode"], "delete")
+
+    def test_none_values_are_skipped(self):
+        pragmas = sqlite_pragmas({**DEFAULT_SQLITE_SETTINGS, "MMAP_SIZE": None})
+
+        self.assertEqual(pragmas, [
+            "PRAGMA busy_timeout=5000",
+            "PRAGMA journal_mode=wal",
+            "PRAGMA synchronous=normal",
+        ])
+
+
+class FastJSONTests(SimpleTestCase):
+    """
+    Renderer i parser orjson dają ten sam JSON co ścieżka stdlib json.
+    """
+
+    data = {
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "created_at": datetime.datetime(2026, 3, 1, 12, 30, tzinfo=datetime.timezone.utc),
+        "date": datetime.date(2026, 3, 1),
+        "total_price": Decimal("1234.50"),
+        "items": [{"size": "M20", "quantity": 3, "ratio": 0.25, "note": "Żółty – ¼"}],
+        "valid": True,
+        "missing": None,
+    }
+
+    def _render(self, data, **context):
+        return FastJSONRenderer().render(data, "application/json", context)
+
+    def test_orjson_output_matches_stdlib_output(self):
+        self.assertIsNotNone(fast_json.orjson, "orjson is not installed")
+        rendered = self._render(self.data)
+        with patch.object(fast_json, "orjson", None):
+            fallback = self._render(self.data)
+
+        self.assertEqual(json.loads(rendered), json.loads(fallback))
+        self.assertEqual(json.loads(rendered)["total_price"], "1234.50")
+        self.assertEqual(json.loads(rendered)["created_at"], "2026-03-01T12:30:00Z")
+
+    def test_line_separators_are_escaped_and_big_ints_fall_back_to_stdlib(self):
+        rendered = self._render({"text": "a\u2028b\u2029c", "big": 2 ** 70})
+
+        self.assertIn(b"a\\u2028b\\u2029c", rendered)
+        self.assertEqual(json.loads(rendered), {"text": "a\u2028b\u2029c", "big": 2 ** 70})
+
+    def test_parser_decodes_utf8_and_other_encodings(self):
+        body = json.dumps({"name": "Łódź", "quantity": 2}, ensure_ascii=False)
+        parser = FastJSONParser()
+
+        self.assertEqual(
+            parser.parse(BytesIO(body.encode("utf-8"))), {"name": "Łódź", "quantity": 2}
+        )
+        self.assertEqual(
+            parser.parse(
+                BytesIO(body.encode("iso-8859-2")), parser_context={"encoding": "iso-8859-2"}
+            ),
+            {"name": "Łódź", "quantity": 2},
+        )
+        with self.assertRaises(ParseError):
+            parser.parse(BytesIO(b"{not json"))
+
+    def test_api_request_round_trip(self):
+        request = RequestFactory().post(
+            "/api/test/", json.dumps({"saveBox": []}), content_type="application/json"
+        )
+
+        response = profiled_view(request)
+        response.render()
+
+        self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
+        self.assertEqual(json.loads(response.content), {"ok": True})
+
+
+class CompressedJSONFieldTests(TestCase):
+    """
+    CompressedJSONField: kompresja od progu, odczyt starych wierszy tekstowych.
+    """
+
+    def setUp(self):
+        self.small = {"saveBox": [], "note": "Żółw"}
+        self.large = load_order_example()
+        self.large["saveBox"] = self.large["saveBox"] * 10
+
+    def _stored(self, order):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT order_data FROM simple_orders WHERE id = %s", [order.pk.hex]
+            )
+            return bytes(cursor.fetchone()[0])
+
+    def _create(self, order_data):
+        return SimpleOrder.objects.create(customer_name="Test", order_data=order_data)
+
+    @override_settings(CALCULATOR_COMPRESSED_JSON={"ALGORITHM": "zlib", "THRESHOLD_BYTES": 512})
+    def test_zlib_round_trip_compresses_only_values_over_threshold(self):
+        small = self._create(self.small)
+        large = self._create(self.large)
+
+        self.assertEqual(json.loads(self._stored(small)), self.small)
+        stored = self._stored(large)
+        self.assertEqual(stored[:1], fields.ZLIB_MARKER)
+        self.assertLess(len(stored), len(json.dumps(self.large)) / 3)
+        self.assertEqual(SimpleOrder.objects.get(pk=small.pk).order_data, self.small)
+        self.assertEqual(SimpleOrder.objects.get(pk=large.pk).order_data, self.large)
+
+    @skipUnless(fields._zstd is not None, "zstd is not available")
+    @override_settings(CALCULATOR_COMPRESSED_JSON={"ALGORITHM": "zstd", "THRESHOLD_BYTES": 512})
+    def test_zstd_round_trip(self):
+        order = self._create(self.large)
+
+        self.assertEqual(self._stored(order)[:1], fields.ZSTD_MARKER)
+        self.assertEqual(SimpleOrder.objects.get(pk=order.pk).order_data, self.large)
+
+    @override_settings(CALCULATOR_COMPRESSED_JSON={"ALGORITHM": "zstd", "THRESHOLD_BYTES": 512})
+    def test_zstd_falls_back_to_zlib_without_zstd_module(self):
+        with patch.object(fields, "_zstd", None):
+            order = self._create(self.large)
+            self.assertEqual(self._stored(order)[:1], fields.ZLIB_MARKER)
+            with self.assertRaises(ImproperlyConfigured):
+                fields.decompress_json(fields.ZSTD_MARKER + b"data")
+
+        self.assertEqual(SimpleOrder.objects.get(pk=order.pk).order_data, self.large)
+
+    @override_settings(CALCULATOR_COMPRESSED_JSON={"ALGORITHM": "zlib", "THRESHOLD_BYTES": 512})
+    def test_legacy_text_rows_are_read_and_rewritten_by_command(self):
+        order = self._create(self.small)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE simple_orders SET order_data = %s WHERE id = %s",
+                [json.dumps(self.large), order.pk.hex],
+            )
+
+        self.assertEqual(SimpleOrder.objects.get(pk=order.pk).order_data, self.large)
+
+        call_command("compress_order_json", stdout=StringIO())
+
+        self.assertEqual(self._stored(order)[:1], fields.ZLIB_MARKER)
+        self.assertEqual(SimpleOrder.objects.get(pk=order.pk).order_data, self.large)
+
+
+class OrderExportTests(TestCase):
+    """
+    Eksport zamówień: wiersze pozycji, filtry, ochrona przed formułami, plik XLSX.
+    """
+
+    def setUp(self):
+        self.order_data = load_order_example()
+        self.old = self._create("=HYPERLINK(\"http://example.com\")", datetime.date(2024, 1, 10))
+        other = load_order_example()
+        other["saveBox"][0]["code"] = "ENC-OTHER"
+        self.new = self._create("Anna Nowak", datetime.date(2024, 3, 5), other)
+
+    def _create(self, customer_name, created, order_data=None):
+        order = SimpleOrder.objects.create(
+            customer_name=customer_name,
+            customer_email="test@example.com",
+            order_data=order_data or self.order_data,
+            total_price=Decimal("100.00"),
+        )
+        created_at = timezone.make_aware(datetime.datetime.combine(created, datetime.time(12)))
+        SimpleOrder.objects.filter(pk=order.pk).update(created_at=created_at)
+        index_order_items([order])
+        return order
+
+    def test_rows_cover_enclosure_glands_and_terminals(self):
+        rows = list(export_order_rows(OrderExportFilter(date_to=datetime.date(2024, 1, 31))))
+
+        line_types = [row[EXPORT_COLUMNS.index("line_type")] for row in rows]
+        self.assertEqual(line_types, ["enclosure"] + ["gland"] * 3 + ["terminal"] * 2)
+        self.assertTrue(all(row[0] == str(self.old.pk) for row in rows))
+        gland = rows[1]
+        self.assertEqual(
+            gland[EXPORT_COLUMNS.index("side"):],
+            ("top", "M20", "PA", 3),
+        )
+
+    def test_date_and_enclosure_filters(self):
+        by_date = export_order_rows(OrderExportFilter(date_from=datetime.date(2024, 2, 1)))
+        by_code = export_order_rows(OrderExportFilter(enclosure_code="ENC-300-200-150"))
+
+        self.assertEqual({row[0] for row in by_date}, {str(self.new.pk)})
+        self.assertEqual({row[0] for row in by_code}, {str(self.old.pk)})
+
+    def test_csv_escapes_formula_prefixes(self):
+        rows = export_order_rows(OrderExportFilter(date_to=datetime.date(2024, 1, 31)))
+
+        reader = csv.reader(StringIO("".join(iter_csv(rows))))
+
+        self.assertEqual(tuple(next(reader)), EXPORT_COLUMNS)
+        record = next(reader)
+        self.assertEqual(
+            record[EXPORT_COLUMNS.index("customer_name")], "'=HYPERLINK(\"http://example.com\")"
+        )
+        self.assertEqual(record[EXPORT_COLUMNS.index("total_price")], "100.00")
+
+    def test_xlsx_is_zip_with_sheet_rows(self):
+        rows = export_order_rows(OrderExportFilter())
+
+        with zipfile.ZipFile(BytesIO(b"".join(iter_xlsx(rows)))) as archive:
+            self.assertIn("xl/workbook.xml", archive.namelist())
+            sheet = archive.read("xl/worksheets/sheet1.xml").decode()
+
+        self.assertEqual(sheet.count("<row>"), 1 + 2 * 6)
+        self.assertIn("<t xml:space=\"preserve\">'=HYPERLINK(", sheet)
+        self.assertIn("<c><v>100.00</v></c>", sheet)
+
+
+class OrderArchiveTests(TestCase):
+    """
+    Archiwum zamówień: archive_orders i order_history obejmujące obie bazy.
+    """
+    databases = {"default", "archive"}
+
+    def setUp(self):
+        now = timezone.now()
+        self.old = self._create("Stare", now - datetime.timedelta(days=800))
+        self.recent = self._create("Nowe", now - datetime.timedelta(days=5))
+        self.waiting = self._create("Stare z emailem", now - datetime.timedelta(days=800))
+        OrderEmailOutbox.objects.create(
+            order=self.old, recipient="test@example.com", status=OrderEmailOutbox.Status.SENT
+        )
+        OrderEmailOutbox.objects.create(
+            order=self.waiting, recipient="test@example.com",
+            status=OrderEmailOutbox.Status.PENDING,
+        )
+
+    def _create(self, customer_name, created_at):
+        order = SimpleOrder.objects.create(
+            customer_name=customer_name,
+            customer_email="test@example.com",
+            order_data=load_order_example(),
+        )
+        SimpleOrder.objects.filter(pk=order.pk).update(created_at=created_at)
+        index_order_items([order])
+        return SimpleOrder.objects.get(pk=order.pk)
+
+    def test_archive_orders_moves_old_orders_with_items_and_emails(self):
+        call_command("archive_orders", months=12, chunk_size=1, stdout=StringIO())
+
+        self.assertEqual(
+            set(SimpleOrder.objects.values_list("pk", flat=True)),
+            {self.recent.pk, self.waiting.pk},
+        )
+        archived = SimpleOrder.objects.using("archive").get()
+        self.assertEqual(archived.pk, self.old.pk)
+        self.assertEqual(archived.created_at, self.old.created_at)
+        self.assertEqual(archived.order_data, self.old.order_data)
+        self.assertTrue(OrderEmailOutbox.objects.using("archive").filter(order=archived).exists())
+        self.assertTrue(OrderItemIndex.objects.using("archive").filter(order=archived).exists())
+        self.assertFalse(OrderItemIndex.objects.filter(order_id=self.old.pk).exists())
+
+    def test_dry_run_keeps_orders(self):
+        call_command("archive_orders", dry_run=True, stdout=StringIO())
+
+        self.assertEqual(SimpleOrder.objects.count(), 3)
+        self.assertFalse(SimpleOrder.objects.using("archive").exists())
+
+    def test_order_history_includes_archive_on_request(self):
+        call_command("archive_orders", months=12, stdout=StringIO())
+
+        self.assertEqual(order_history().count(), 2)
+        history = order_history(include_archived=True).order_by("created_at")
+        self.assertEqual(history.count(), 3)
+        self.assertEqual([order.pk for order in history][0], self.old.pk)
+        self.assertEqual(history[1:3], [self.waiting, self.recent])
+        self.assertEqual(history.get(pk=self.old.pk).customer_name, "Stare")
+
+    def test_unmigrated_archive_is_treated_as_empty(self):
+        with patch.object(connections["archive"].introspection, "table_names", return_value=[]):
+            self.assertEqual(order_history(include_archived=True).count(), 3)
+            with self.assertRaisesMessage(CommandError, "migrate --database archive"):
+                call_command("archive_orders", stdout=StringIO())
+
+
+@override_settings(DATABASE_ROUTERS=[])
+class PriceListTests(TestCase):
+    """
+    Wersje cenników: wyszukiwanie wersji na dzień i wycena zamówień cenami z dnia utworzenia.
+    """
+
+    def setUp(self):
+        price_lists._cached_catalogs.clear()
+        import_catalog_fixtures()
+        catalog_cache = patch.multiple(
+            catalog_snapshot, _cached_snapshot=load_catalog_snapshot(), _cached_at=time.monotonic()
+        )
+        catalog_cache.start()
+        self.addCleanup(catalog_cache.stop)
+        self.order_data = load_order_example()
+        self.january = timezone.make_aware(datetime.datetime(2024, 1, 1))
+        self.march = timezone.make_aware(datetime.datetime(2024, 3, 1))
+
+    def _record_price_change(self):
+        old = record_price_list(self.january, source="test")
+        Gland.objects.update(price=F("price") + 1)
+        new = record_price_list(self.march, source="test")
+        return old, new
+
+    def test_timeline_version_at_and_versions_between(self):
+        timeline = PriceListTimeline([(1, self.january), (2, self.march)])
+        february = self.january + datetime.timedelta(days=40)
+
+        with self.assertRaises(PriceListNotFound):
+            timeline.version_at(self.january - datetime.timedelta(seconds=1))
+        self.assertEqual(timeline.version_at(self.january), 1)
+        self.assertEqual(timeline.version_at(february), 1)
+        self.assertEqual(timeline.version_at(self.march), 2)
+        self.assertEqual(timeline.versions_between(february, february), [1])
+        self.assertEqual(timeline.versions_between(february, self.march), [1, 2])
+        self.assertEqual(
+            timeline.versions_between(self.january - datetime.timedelta(days=1), self.january),
+            [1],
+        )
+
+    def test_record_price_list_skips_unchanged_prices(self):
+        imported = PriceListVersion.objects.count()
+        old, new = self._record_price_change()
+
+        self.assertIsNotNone(old)
+        self.assertIsNotNone(new)
+        self.assertIsNone(record_price_list(self.march + datetime.timedelta(days=1)))
+        self.assertEqual(PriceListVersion.objects.count(), imported + 2)
+        self.assertEqual(
+            PriceListTimeline().versions[:2], [(old.pk, self.january), (new.pk, self.march)]
+        )
+
+    def test_price_order_as_of_uses_prices_of_that_day(self):
+        self._record_price_change()
+        order = OrderData.from_dict(self.order_data)
+        february = self.january + datetime.timedelta(days=40)
+
+        before = price_order_as_of(order, february)
+        after = price_order_as_of(order, self.march)
+
+        self.assertGreater(after.glands_price, before.glands_price)
+        self.assertEqual(after.enclosures_price, before.enclosures_price)
+        with self.assertRaises(PriceListNotFound):
+            price_order_as_of(order, self.january - datetime.timedelta(days=1))
+
+    def test_reprice_as_of_created_uses_price_list_of_creation_day(self):
+        old, _ = self._record_price_change()
+        order = SimpleOrder.objects.create(
+            customer_name="Test", customer_email="test@example.com", order_data=self.order_data
+        )
+        february = self.january + datetime.timedelta(days=40)
+        SimpleOrder.objects.filter(pk=order.pk).update(created_at=february)
+
+        call_command(
+            "reprice_orders", "--workers", "1", "--as-of-created", stdout=StringIO()
+        )
+
+        stored = SimpleOrder.objects.get()
+        expected = price_order_as_of(OrderData.from_dict(self.order_data), february)
+        self.assertEqual(stored.total_price, expected.total_price)
+        self.assertEqual(stored.glands_price, expected.glands_price)
+        self.assertEqual(stored.catalog_version, price_list_catalog(old.pk).version)
@@ -0,0 +1,123 @@
+"""
+Router baz danych: odczyty katalogu i raportów z repliki, zapisy do bazy głównej.
+
+- Odczyty tabel produktów (obudowy, dławiki, terminale) idą do aliasu "replica".
+- Zapytania raportowe (np. agregaty dashboardu) wykonane w bloku
+  ``with reporting_reads():`` idą do repliki także dla zamówień.
+- Pozostałe odczyty (zamówienia, kolejka emaili) i wszystkie zapisy idą do "default".
+- Po pierwszym zapisie w żądaniu wszystkie kolejne odczyty tego żądania idą do
+  bazy głównej ("read-your-writes") - replika może jeszcze nie mieć tego zapisu.
+  Przypięcie działa tylko w obrębie żądania (ReadYourWritesMiddleware) i jest
+  zdejmowane na jego końcu. Zapisy poza żądaniem (komendy zarządzania, wątek
+  OrderWriter, procesy robocze) nie przypinają wątku na stałe.
+
+Bez aliasu "replica" w DATABASES wszystko trafia do "default".
+
+Baza "archive" (calculator.services.order_archive) jest używana tylko jawnie
+(``.using()``); migracje tworzą w niej wyłącznie tabele zamówień, ich indeksu
+pozycji i kolejki emaili.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+REPLICA_DB_ALIAS = "replica"
+ARCHIVE_DB_ALIAS = "archive"
+
+REPLICA_READ_MODELS = {
+    ("calculator", "enclosure"),
+    ("calculator", "gland"),
+    ("calculator", "terminal"),
+}
+
+ARCHIVE_MODELS = {
+    ("calculator", "simpleorder"),
+    ("calculator", "orderemailoutbox"),
+    ("calculator", "orderitemindex"),
+}
+
+# None - poza żądaniem (przypięcie nie jest możliwe), False/True - w żądaniu.
+_pinned_to_primary: ContextVar[bool | None] = ContextVar("pinned_to_primary", default=None)
+_reporting: ContextVar[bool] = ContextVar("reporting_reads", default=False)
+
+
+def replica_alias() -> str:
+    """
+    Zwraca alias repliki lub "default", jeśli replika nie jest skonfigurowana.
+    """
+    return REPLICA_DB_ALIAS if REPLICA_DB_ALIAS in settings.DATABASES else DEFAULT_DB_ALIAS
+
+
+def pin_to_primary() -> None:
+    """
+    Kieruje pozostałe odczyty bieżącego żądania do bazy głównej (poza żądaniem nic nie robi).
+    """
+    if _pinned_to_primary.get() is not None:
+        _pinned_to_primary.set(True)
+
+
+def is_pinned_to_primary() -> bool:
+    return bool(_pinned_to_primary.get())
+
+
+@contextmanager
+def reporting_reads() -> Iterator[None]:
+    """
+    Kieruje odczyty wszystkich modeli w bloku do repliki (o ile żądanie nie jest przypięte).
+    """
+    token = _reporting.set(True)
+    try:
+        yield
+    finally:
+        _reporting.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Router Django (DATABASE_ROUTERS) dla bazy głównej i repliki tylko do odczytu.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _pinned_to_primary.get():
+            return DEFAULT_DB_ALIAS
+        if _reporting.get():
+            return replica_alias()
+        if (model._meta.app_label, model._meta.model_name) in REPLICA_READ_MODELS:
+            return replica_alias()
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replika zawiera te same dane co baza główna.
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == ARCHIVE_DB_ALIAS:
+            return (app_label, model_name) in ARCHIVE_MODELS
+        return None
+
+
+class ReadYourWritesMiddleware:
+    """
+    Zaczyna każde żądanie bez przypięcia do bazy głównej i zdejmuje je po odpowiedzi.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _pinned_to_primary.set(False)
+        try:
+            return self.get_response(request)
+        finally:
+            _pinned_to_primary.reset(token)
@@ -44,6 +44,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'mysite.db_router.ReadYourWritesMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -73,6 +74,21 @@ TEMPLATES = [
 WSGI_APPLICATION = 'mysite.wsgi.application'
 
 
+# Kalkulator - połączenia SQLite
+# PRAGMA ustawiane dla każdego nowego połączenia (calculator.infrastructure.sqlite):
+# dziennik WAL, synchronous=NORMAL, mmap i czas oczekiwania na blokadę zapisu.
+# ENABLED włącza też ustawienia połączeń bazy głównej (DATABASES niżej).
+# Wpływ na równoległe zapisy: python manage.py run_benchmark db_concurrency
+
+CALCULATOR_SQLITE = {
+    'ENABLED': True,
+    'JOURNAL_MODE': 'wal',
+    'SYNCHRONOUS': 'normal',
+    'MMAP_SIZE': 256 * 1024 * 1024,
+    'BUSY_TIMEOUT_MS': 5000,
+}
+
+
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
@@ -83,6 +99,57 @@ DATABASES = {
     }
 }
 
+if CALCULATOR_SQLITE['ENABLED']:
+    DATABASES['default'].update({
+        # Połączenia utrzymywane między żądaniami (sprawdzane przed ponownym użyciem).
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # BEGIN IMMEDIATE - transakcja od razu czeka na blokadę zapisu (busy_timeout),
+            # zamiast dostać "database is locked" przy przejściu z odczytu do zapisu.
+            'transaction_mode': 'IMMEDIATE',
+        },
+    })
+
+# Replika tylko do odczytu (mysite.db_router): katalog produktów i zapytania raportowe.
+# Lokalnie wskazuje na ten sam plik co 'default'. Osobny plik repliki: ustaw NAME
+# i kopiuj do niego bazę główną poleceniem python manage.py sync_replica.
+# Replika tylko czyta, więc nie dziedziczy ustawień zapisu bazy głównej (transaction_mode,
+# CONN_MAX_AGE). W testach replika to osobna baza, do której zapisy 'default' nie trafiają.
+DATABASES['replica'] = {
+    'ENGINE': DATABASES['default']['ENGINE'],
+    'NAME': DATABASES['default']['NAME'],
+}
+
+# Archiwum starych zamówień (python manage.py archive_orders) w osobnym pliku SQLite.
+# Tabele archiwum: python manage.py migrate --database archive
+DATABASES['archive'] = {
+    **DATABASES['default'],
+    'NAME': BASE_DIR / 'archive.sqlite3',
+}
+
+DATABASE_ROUTERS = ['mysite.db_router.PrimaryReplicaRouter']
+
+
+# Kalkulator - archiwum zamówień
+# archive_orders przenosi zamówienia starsze niż MONTHS pełnych miesięcy do bazy DATABASE
+# paczkami po CHUNK_SIZE (calculator.services.order_archive).
+
+CALCULATOR_ORDER_ARCHIVE = {
+    'DATABASE': 'archive',
+    'MONTHS': 12,
+    'CHUNK_SIZE': 500,
+}
+
+
+# Kalkulator - wersje cennika
+# Importy produktów dopisują wersję cennika przy każdej zmianie cen; wycena "na dzień"
+# (calculator.services.price_lists) trzyma w pamięci migawki CACHE_SIZE ostatnich wersji.
+
+CALCULATOR_PRICE_LISTS = {
+    'CACHE_SIZE': 32,
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -119,3 +186,127 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
 STATIC_URL = 'static/'
+
+
+# Django REST Framework
+# Szybki JSON (orjson, jeśli zainstalowany - w przeciwnym razie stdlib json).
+# Porównanie: python manage.py run_benchmark json_codec
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'calculator.infrastructure.api.fast_json.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'calculator.infrastructure.api.fast_json.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+
+# Kalkulator - profilowanie żądań API
+# Profil zapisywany jest dla co SAMPLE_RATE-tego żądania lub dla żądań dłuższych
+# niż SLOW_THRESHOLD_MS (None - wyłączone). BACKEND: "cprofile" lub "pyinstrument".
+# Podgląd zapisanych profili: python manage.py list_profiles
+
+CALCULATOR_PROFILING = {
+    'ENABLED': False,
+    'SAMPLE_RATE': 100,
+    'SLOW_THRESHOLD_MS': None,
+    'DIRECTORY': BASE_DIR / 'profiles',
+    'MAX_PROFILES': 50,
+    'BACKEND': 'cprofile',
+}
+
+
+# Kalkulator - migawka katalogu produktów
+# Maksymalny wiek (w sekundach) migawki katalogu przechowywanej w pamięci procesu.
+# Zapisy produktów przez ORM unieważniają ją od razu, ale tylko w bieżącym procesie.
+
+CALCULATOR_CATALOG_CACHE_SECONDS = 60
+
+# Plik binarnej migawki katalogu (python manage.py export_catalog). Gdy jest ustawiony,
+# procesy czytają katalog z pliku zamiast z bazy - po zmianach w katalogu plik
+# trzeba wyeksportować ponownie (podmiana pliku jest wykrywana automatycznie).
+
+CALCULATOR_CATALOG_FILE = None
+
+
+# Kalkulator - import katalogu produktów
+# Komendy import_* pomijają produkty z niezmienionym skrótem treści, a nowe i zmienione
+# zapisują paczkami po BATCH_SIZE wierszy (bulk_create / bulk_update).
+
+CALCULATOR_CATALOG_IMPORT = {
+    'BATCH_SIZE': 500,
+}
+
+
+# Kalkulator - kompresja JSON zamówień
+# SimpleOrder.order_data i geometry_validation_errors (CompressedJSONField) są
+# kompresowane od THRESHOLD_BYTES bajtów. ALGORITHM: "zstd" (Python 3.14+ lub pakiet
+# zstandard; bez nich zlib) lub "zlib". Zmiana ustawień dotyczy nowych zapisów -
+# istniejące zamówienia przepisuje: python manage.py compress_order_json
+
+CALCULATOR_COMPRESSED_JSON = {
+    'ENABLED': True,
+    'ALGORITHM': 'zstd',
+    'THRESHOLD_BYTES': 1024,
+    'LEVEL': 6,
+}
+
+
+# Kalkulator - rozmieszczenie dławików
+# MODE: "ffd" (rzędy, First Fit Decreasing), "optimal" (przeszukiwanie przydziału
+# do rzędów, gdy FFD odrzuca układ; po przekroczeniu TIME_BUDGET_MS na ściankę - wynik FFD)
+# lub "staggered" (przesunięte rzędy, gdy FFD odrzuca układ)
+
+CALCULATOR_GLAND_LAYOUT = {
+    'MODE': 'ffd',
+    'TIME_BUDGET_MS': 50,
+}
+
+
+# Kalkulator - równoległa walidacja geometryczna
+# Zamówienia z co najmniej MIN_BOXES obudowami są walidowane w trwałej puli
+# WORKERS procesów (None - liczba procesorów), paczkami po CHUNK_SIZE obudów.
+# Domyślnie wyłączona - każdy proces serwera ma własną pulę, więc przed włączeniem
+# trzeba dobrać WORKERS do liczby procesów serwera.
+# Próg warto dobrać wynikiem: python manage.py run_benchmark geometry_pool
+
+CALCULATOR_GEOMETRY_POOL = {
+    'ENABLED': False,
+    'WORKERS': None,
+    'MIN_BOXES': 64,
+    'CHUNK_SIZE': 16,
+}
+
+
+# Kalkulator - emaile z potwierdzeniem zamówienia
+# Emaile trafiają do kolejki (OrderEmailOutbox) razem z zamówieniem i są wysyłane
+# przez proces roboczy: python manage.py send_order_emails --loop
+# Wpisy pobrane do wysyłki (sending) dłużej niż CLAIM_TIMEOUT_SECONDS (np. po awarii
+# procesu) wracają do kolejki.
+
+DEFAULT_FROM_EMAIL = 'zamowienia@grupa-wolff.com'
+
+CALCULATOR_ORDER_EMAILS = {
+    'ENABLED': True,
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'CLAIM_TIMEOUT_SECONDS': 600,
+}
+
+
+# Kalkulator - zapis grupowy zamówień
+# Gdy ENABLED, create_order przekazuje zamówienia do wątku zapisującego, który
+# zatwierdza je paczkami (do MAX_BATCH zamówień, najpóźniej po MAX_DELAY_MS).
+# Żądanie czeka na zatwierdzenie swojej paczki najwyżej TIMEOUT_SECONDS.
+# Wpływ na przepustowość: python manage.py run_benchmark order_writer
+
+CALCULATOR_ORDER_WRITER = {
+    'ENABLED': False,
+    'MAX_BATCH': 100,
+    'MAX_DELAY_MS': 5,
+    'TIMEOUT_SECONDS': 30,
+}